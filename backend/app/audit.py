@@ -1,18 +1,204 @@
-
 from __future__ import annotations
-import os, json, time
+import os, time, queue, atexit, threading
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+try:
+    import msgpack  # type: ignore
+except Exception:  # pragma: no cover
+    msgpack = None  # type: ignore
+
+# json: one JSON object per line (default) | msgpack: concatenated msgpack records
+AUDIT_FORMAT = os.getenv("AUDIT_FORMAT", "json").strip().lower()
+if AUDIT_FORMAT == "msgpack" and msgpack is None:
+    AUDIT_FORMAT = "json"
+AUDIT_FILE = Path(os.getenv(
+    "AUDIT_FILE",
+    "state/logs/audit.mpk" if AUDIT_FORMAT == "msgpack" else "state/logs/audit.log",
+))
+AUDIT_MAX_QUEUE = int(os.getenv("AUDIT_MAX_QUEUE", "10000"))
+
+# Writer coalesces up to BATCH_MAX records or BATCH_WINDOW_S seconds per write()
+BATCH_MAX = 128
+BATCH_WINDOW_S = 0.05
+
+_STOP: Any = object()  # shutdown sentinel
+_audit_q: "queue.Queue[Any]" = queue.Queue(maxsize=AUDIT_MAX_QUEUE)
+_writer_thread: Optional[threading.Thread] = None
+_start_lock = threading.Lock()
+_listeners: List[Callable[[], None]] = []  # called on the writer thread after each write
+
+def add_listener(fn: Callable[[], None]) -> None:
+    """Register fn to be called (from the writer thread) after each batch hits the file."""
+    _listeners.append(fn)
+
+def remove_listener(fn: Callable[[], None]) -> None:
+    try:
+        _listeners.remove(fn)
+    except ValueError:
+        pass
+
+def _notify() -> None:
+    for fn in list(_listeners):
+        try:
+            fn()
+        except Exception:
+            pass
+
+def _drain(first: bytes) -> List[bytes]:
+    batch = [first]
+    deadline = time.monotonic() + BATCH_WINDOW_S
+    while len(batch) < BATCH_MAX and batch[-1] is not _STOP:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_audit_q.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+def _open_fd() -> int:
+    AUDIT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    return os.open(str(AUDIT_FILE), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+def _write_all(fd: int, pending: List[memoryview]) -> None:
+    # O_APPEND positions every write at EOF, so copytruncate rotation is safe.
+    # pending[0] is advanced after each write, so a retry after an OSError
+    # resumes with the bytes that never reached the file.
+    while pending[0]:
+        pending[0] = pending[0][os.write(fd, pending[0]):]
+
+def _close_fd(fd: int) -> None:
+    try:
+        os.close(fd)
+    except OSError:
+        pass
 
-AUDIT_FILE = Path(os.getenv("AUDIT_FILE", "state/logs/audit.log"))
+def _writer() -> None:
+    fd = -1
+    while True:
+        batch = _drain(_audit_q.get())
+        stop = batch[-1] is _STOP
+        pending = [memoryview(b"".join(batch[:-1] if stop else batch))]
+        for _ in range(2):
+            try:
+                if fd < 0:
+                    fd = _open_fd()
+                _write_all(fd, pending)
+                _notify()
+                break
+            except OSError:
+                # EBADF/ENOSPC/unlinked dir: reopen and retry the unwritten tail once, then drop it
+                if fd >= 0:
+                    _close_fd(fd)
+                fd = -1
+        if stop:
+            if fd >= 0:
+                os.fsync(fd)
+                _close_fd(fd)
+            return
+
+def _ensure_writer() -> None:
+    global _writer_thread
+    if _writer_thread is not None:
+        return
+    with _start_lock:
+        if _writer_thread is None:
+            t = threading.Thread(target=_writer, name="audit-writer", daemon=True)
+            t.start()
+            _writer_thread = t
+
+def _enqueue(line: bytes) -> None:
+    try:
+        _audit_q.put_nowait(line)
+    except queue.Full:
+        # drop-oldest backpressure: keep the most recent events
+        try:
+            _audit_q.get_nowait()
+        except queue.Empty:
+            pass
+        _audit_q.put_nowait(line)
+
+def _encode(rec: Dict[str, Any]) -> bytes:
+    if AUDIT_FORMAT == "msgpack":
+        # msgpack records are self-delimiting, so no framing is needed
+        return msgpack.packb(rec, use_bin_type=True)
+    # orjson emits UTF-8 bytes directly (non-ASCII kept as-is)
+    return orjson.dumps(rec, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+def read_records(path: Path | None = None) -> List[Dict[str, Any]]:
+    """Decode every record in a msgpack audit file (json files are read line-wise by callers)."""
+    path = path or AUDIT_FILE
+    if not path.exists():
+        return []
+    with path.open("rb") as f:
+        return list(msgpack.Unpacker(f, raw=False))
+
+def record_unpacker() -> "msgpack.Unpacker":
+    """Incremental msgpack decoder for followers: feed() appended bytes, iterate whole
+    records; a partially written record stays buffered until the rest arrives."""
+    return msgpack.Unpacker(raw=False)
+
+TAIL_BLOCK = 64 * 1024
+TAIL_MAX_WINDOW = 64 * 1024 * 1024
+
+def tail_lines(n: int, path: Path | None = None) -> List[str]:
+    """Last n lines of a JSON-lines audit file, read backwards from EOF in a growing window."""
+    path = path or AUDIT_FILE
+    if n <= 0 or not path.exists():
+        return []
+    with path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        window = TAIL_BLOCK
+        while True:
+            start = max(0, size - window)
+            f.seek(start)
+            data = f.read(size - start)
+            # > n newlines guarantees n whole lines after the (possibly partial) first one
+            if start == 0 or data.count(b"\n") > n:
+                break
+            window *= 2
+            if window > TAIL_MAX_WINDOW:
+                # pathological line lengths: stream the file keeping only n lines
+                f.seek(0)
+                return [ln.rstrip(b"\r\n").decode("utf-8", "replace") for ln in deque(f, maxlen=n)]
+    lines = data.splitlines()
+    if start > 0:
+        lines = lines[1:]
+    return [ln.decode("utf-8", "replace") for ln in lines[-n:]]
 
 def write_event(kind: str, payload: Dict[str, Any] | None = None) -> None:
-    """Best-effort JSONL audit; never crash the app."""
+    """Best-effort audit (JSONL or msgpack); never crash the app. I/O happens on a background writer."""
     try:
-        AUDIT_FILE.parent.mkdir(parents=True, exist_ok=True)
         rec = {"ts": time.time(), "kind": kind, "payload": payload or {}}
-        with AUDIT_FILE.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        _ensure_writer()
+        _enqueue(_encode(rec))
+    except Exception:
+        pass
+
+def write_events(events: Iterable[Tuple[float, str, Dict[str, Any]]]) -> None:
+    """Bulk write_event: (ts, kind, payload) records encoded together and queued as one
+    contiguous write, so a burst from one request costs a single queue hand-off."""
+    try:
+        blob = b"".join(_encode({"ts": ts, "kind": kind, "payload": payload or {}}) for ts, kind, payload in events)
+        if blob:
+            _ensure_writer()
+            _enqueue(blob)
+    except Exception:
+        pass
+
+@atexit.register
+def _shutdown(timeout: float = 2.0) -> None:
+    """Flush pending records and fsync the audit file on interpreter exit."""
+    t = _writer_thread
+    if t is None or not t.is_alive():
+        return
+    try:
+        _audit_q.put(_STOP, timeout=timeout)
+        t.join(timeout)
     except Exception:
-    
         pass
@@ -42,44 +42,147 @@
 
 
 from dotenv import load_dotenv
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import FrozenSet, Tuple
 import os
 
 load_dotenv()
 
+def _csv_set(raw: str) -> FrozenSet[str]:
+    return frozenset(s.strip() for s in raw.split(",") if s.strip())
+
+@dataclass(frozen=True)
+class Settings:
+    """Immutable snapshot of every env tunable; read once, then plain attribute access."""
+    # -------- Core --------
+    PORT: int
+    VECTOR_DB_DIR: str
+    KB_MIN_DOCS: int
+    ENV_NAME: str
+    POLICY_ENV_ALLOWLIST: FrozenSet[str]
+    POLICY_REQUIRE_APPROVAL_FOR: FrozenSet[str]
+    ALLOWED_ORIGINS: Tuple[str, ...]
+    LOG_LEVEL: str
+    COLLECTION_NAME: str
+    API_KEY: str
+    STATE_DIR: str
+    RESULTS_MAX: int            # pipeline results kept in memory (LRU)
+    RESULTS_TTL_S: float        # ...and for at most this long
+    # -------- Notifications --------
+    SLACK_WEBHOOK_URL: str
+    SLACK_SIGNING_SECRET: str
+    JIRA_BASE_URL: str
+    JIRA_API_TOKEN: str
+    JIRA_PROJECT_KEY: str
+    # -------- Auth --------
+    AUTH_MODE: str
+    DEMO_MODE: bool
+    JWT_SECRET: str
+    JWT_AUDIENCE: str
+    JWT_ISSUER: str
+    # -------- Detector thresholds --------
+    DETECT_ERR_HIGH: float      # %
+    DETECT_ERR_MED: float       # %
+    DETECT_P95_HIGH: float      # ms
+    DETECT_P95_MED: float       # ms
+    DETECT_MIN_WINDOW_S: int
+    # -------- RAG (defaults aligned with the seeder, not the core block) --------
+    RAG_VECTOR_DB_DIR: str
+    RAG_COLLECTION_NAME: str
+    CHROMA_EMBED_MODEL: str
+    CHROMA_EMBED_BACKEND: str   # sentence_transformers | onnx
+    CHROMA_ONNX_DIR: str        # exported + int8-quantized model (scripts/export_onnx.py)
+    RAG_TOP_K: int
+    RAG_MIN_SCORE: float        # cosine similarity (1 - distance)
+    KB_MAX_URL_BYTES: int       # cap on fetched page size for /kb/ingest/url
+    # -------- Executor --------
+    EXEC_SIMULATE_MS: int       # artificial per-step latency for demos; 0 = off
+    # -------- Reports --------
+    PDF_WORKERS: int            # PDF render processes; 0 = min(4, CPUs)
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    g = os.getenv
+    return Settings(
+        PORT=int(g("PORT", "8000")),
+        VECTOR_DB_DIR=g("VECTOR_DB_DIR", ".chroma"),
+        KB_MIN_DOCS=int(g("KB_MIN_DOCS", "8")),
+        ENV_NAME=g("ENV_NAME", "staging"),
+        POLICY_ENV_ALLOWLIST=_csv_set(g("POLICY_ENV_ALLOWLIST", "staging,dev")),
+        POLICY_REQUIRE_APPROVAL_FOR=_csv_set(g("POLICY_REQUIRE_APPROVAL_FOR", "write,config_change")),
+        ALLOWED_ORIGINS=tuple(s.strip() for s in g("ALLOWED_ORIGINS", "*").split(",")),
+        LOG_LEVEL=g("LOG_LEVEL", "info"),
+        COLLECTION_NAME=g("COLLECTION_NAME", "knowledge_base"),  # must be 3–63 chars
+        API_KEY=g("API_KEY", "").strip(),
+        STATE_DIR=g("STATE_DIR", "state"),
+        RESULTS_MAX=int(g("RESULTS_MAX", "1024")),
+        RESULTS_TTL_S=float(g("RESULTS_TTL_S", "3600")),
+        SLACK_WEBHOOK_URL=g("SLACK_WEBHOOK_URL", "").strip(),
+        SLACK_SIGNING_SECRET=g("SLACK_SIGNING_SECRET", "").strip(),
+        JIRA_BASE_URL=g("JIRA_BASE_URL", "").strip(),
+        JIRA_API_TOKEN=g("JIRA_API_TOKEN", "").strip(),
+        JIRA_PROJECT_KEY=g("JIRA_PROJECT_KEY", "").strip(),
+        AUTH_MODE=g("AUTH_MODE", "api_key").strip(),          # api_key | scoped_jwt
+        DEMO_MODE=g("DEMO_MODE", "false").lower() in ("1", "true", "yes"),
+        JWT_SECRET=g("JWT_SECRET", "please-change").strip(),
+        JWT_AUDIENCE=g("JWT_AUDIENCE", "incident-copilot").strip(),
+        JWT_ISSUER=g("JWT_ISSUER", "").strip(),
+        DETECT_ERR_HIGH=float(g("DETECT_ERR_HIGH", "1.0")),
+        DETECT_ERR_MED=float(g("DETECT_ERR_MED", "0.5")),
+        DETECT_P95_HIGH=float(g("DETECT_P95_HIGH", "1000")),
+        DETECT_P95_MED=float(g("DETECT_P95_MED", "800")),
+        DETECT_MIN_WINDOW_S=int(g("DETECT_MIN_WINDOW_S", "30")),
+        RAG_VECTOR_DB_DIR=g("VECTOR_DB_DIR", "/var/lib/chroma"),
+        RAG_COLLECTION_NAME=g("COLLECTION_NAME", "knowledge_base_384"),
+        CHROMA_EMBED_MODEL=g("CHROMA_EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
+        CHROMA_EMBED_BACKEND=g("CHROMA_EMBED_BACKEND", "sentence_transformers").strip().lower(),
+        CHROMA_ONNX_DIR=g("CHROMA_ONNX_DIR", "models/all-MiniLM-L6-v2-int8"),
+        RAG_TOP_K=int(g("RAG_TOP_K", "5")),
+        RAG_MIN_SCORE=float(g("RAG_MIN_SCORE", "0.30")),
+        KB_MAX_URL_BYTES=int(g("KB_MAX_URL_BYTES", str(2 * 1024 * 1024))),
+        EXEC_SIMULATE_MS=int(g("EXEC_SIMULATE_MS", "0")),
+        PDF_WORKERS=int(g("PDF_WORKERS", "0")),
+    )
+
+settings = get_settings()
+
 # -------- Core --------
-PORT = int(os.getenv("PORT", "8000"))
-VECTOR_DB_DIR = os.getenv("VECTOR_DB_DIR", ".chroma")
-KB_MIN_DOCS = int(os.getenv("KB_MIN_DOCS", "8"))
-ENV_NAME = os.getenv("ENV_NAME", "staging")
+PORT = settings.PORT
+VECTOR_DB_DIR = settings.VECTOR_DB_DIR
+KB_MIN_DOCS = settings.KB_MIN_DOCS
+ENV_NAME = settings.ENV_NAME
 
-POLICY_ENV_ALLOWLIST = set([s.strip() for s in os.getenv("POLICY_ENV_ALLOWLIST", "staging,dev").split(",") if s.strip()])
-POLICY_REQUIRE_APPROVAL_FOR = set([s.strip() for s in os.getenv("POLICY_REQUIRE_APPROVAL_FOR", "write,config_change").split(",") if s.strip()])
+POLICY_ENV_ALLOWLIST = settings.POLICY_ENV_ALLOWLIST
+POLICY_REQUIRE_APPROVAL_FOR = settings.POLICY_REQUIRE_APPROVAL_FOR
 
-ALLOWED_ORIGINS = [s.strip() for s in os.getenv("ALLOWED_ORIGINS", "*").split(",")]
-LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+ALLOWED_ORIGINS = list(settings.ALLOWED_ORIGINS)
+LOG_LEVEL = settings.LOG_LEVEL
 
 # Chroma collection name (must be 3–63 chars)
-COLLECTION_NAME = os.getenv("COLLECTION_NAME", "knowledge_base")
+COLLECTION_NAME = settings.COLLECTION_NAME
 
 # 🔐 Base API key (full-access / ops)
-API_KEY = os.getenv("API_KEY", "").strip()
+API_KEY = settings.API_KEY
 
 # 💾 On-disk persistence (mounted volume-friendly)
-STATE_DIR = os.getenv("STATE_DIR", "state")
+STATE_DIR = settings.STATE_DIR
 os.makedirs(STATE_DIR, exist_ok=True)
+RESULTS_MAX = settings.RESULTS_MAX
+RESULTS_TTL_S = settings.RESULTS_TTL_S
 
 # Notifications (stubs; wire later)
-SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL", "").strip()
-SLACK_SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET", "").strip()
-JIRA_BASE_URL = os.getenv("JIRA_BASE_URL", "").strip()
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN", "").strip()
-JIRA_PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY", "").strip()
+SLACK_WEBHOOK_URL = settings.SLACK_WEBHOOK_URL
+SLACK_SIGNING_SECRET = settings.SLACK_SIGNING_SECRET
+JIRA_BASE_URL = settings.JIRA_BASE_URL
+JIRA_API_TOKEN = settings.JIRA_API_TOKEN
+JIRA_PROJECT_KEY = settings.JIRA_PROJECT_KEY
 
 # -------- Auth switches (NEW) --------
-AUTH_MODE = os.getenv("AUTH_MODE", "api_key").strip()          # api_key | scoped_jwt
-DEMO_MODE = os.getenv("DEMO_MODE", "false").lower() in ("1", "true", "yes")
+AUTH_MODE = settings.AUTH_MODE          # api_key | scoped_jwt
+DEMO_MODE = settings.DEMO_MODE
 
 # JWT (used if AUTH_MODE=scoped_jwt)
-JWT_SECRET   = os.getenv("JWT_SECRET", "please-change").strip()
-JWT_AUDIENCE = os.getenv("JWT_AUDIENCE", "incident-copilot").strip()
-JWT_ISSUER   = os.getenv("JWT_ISSUER", "").strip()
+JWT_SECRET   = settings.JWT_SECRET
+JWT_AUDIENCE = settings.JWT_AUDIENCE
+JWT_ISSUER   = settings.JWT_ISSUER
@@ -26,17 +26,22 @@
 
 # backend/app/detectors/detector.py
 from __future__ import annotations
-import os
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-# ---------- Tunables (env; sensible defaults) ----------
-ERR_HIGH_PCT = float(os.getenv("DETECT_ERR_HIGH", "1.0"))      # %
-ERR_MED_PCT  = float(os.getenv("DETECT_ERR_MED",  "0.5"))      # %
-P95_HIGH_MS  = float(os.getenv("DETECT_P95_HIGH", "1000"))     # ms
-P95_MED_MS   = float(os.getenv("DETECT_P95_MED",  "800"))      # ms
+from ..config import settings
+
+# ---------- Tunables (env snapshot; sensible defaults) ----------
+ERR_HIGH_PCT = settings.DETECT_ERR_HIGH      # %
+ERR_MED_PCT  = settings.DETECT_ERR_MED       # %
+P95_HIGH_MS  = settings.DETECT_P95_HIGH      # ms
+P95_MED_MS   = settings.DETECT_P95_MED       # ms
 
 # Optionally use the time window to dampen noise (seconds)
-MIN_WINDOW_S = int(os.getenv("DETECT_MIN_WINDOW_S", "30"))
+MIN_WINDOW_S = settings.DETECT_MIN_WINDOW_S
+
+# Signal-name aliases (lower-case) read by infer_severity
+ALIASES_ERR = frozenset({"5xx_rate", "5xx", "error_rate", "http_5xx_rate"})
+ALIASES_P95 = frozenset({"latency_p95", "latency_p95_ms", "p95_latency", "latency"})
 
 def _coerce_float(x: Any, default: float = 0.0) -> float:
     try:
@@ -44,38 +49,58 @@ def _coerce_float(x: Any, default: float = 0.0) -> float:
     except Exception:
         return default
 
+# ---------- Unit conversion (built once) ----------
+_PCT_UNITS   = frozenset({"ratio", "fraction"})
+_SEC_UNITS   = frozenset({"s", "sec", "secs", "second", "seconds"})
+_MICRO_UNITS = frozenset({"us", "µs"})
+
+def _identity(value: float, unit: str) -> float:
+    return value
+
+def _conv_err(value: float, unit: str) -> float:
+    # Error rate in %; if an absolute fraction slipped in, convert to %
+    return value * 100.0 if unit in _PCT_UNITS else value
+
+def _conv_lat(value: float, unit: str) -> float:
+    # Latency to ms
+    if unit in _SEC_UNITS:
+        return value * 1000.0
+    if unit in _MICRO_UNITS:
+        return value / 1000.0
+    return value
+
+_CONVERTER: Dict[str, Callable[[float, str], float]] = {
+    **{n: _conv_err for n in ALIASES_ERR},
+    **{n: _conv_lat for n in ALIASES_P95},
+}
+
 def _norm_unit(name: str, value: float, unit: str | None) -> float:
     """Normalize common metrics to base units:
        - 5xx_rate/error_rate: percent -> percent (keep % scale here)
        - latency_p95: ms
+       Unknown metrics are returned as-is.
     """
-    n = (name or "").lower()
-    u = (unit or "").lower().strip()
-
-    # Error rate in %
-    if n in {"5xx", "5xx_rate", "error_rate", "http_5xx_rate"}:
-        if u in {"", "%", "percent", "pct"}:
-            return value
-        # If an absolute fraction slipped in, convert to %
-        if u in {"ratio", "fraction"} or (0 <= value <= 1 and u == ""):
-            return value * 100.0
-        return value
-
-    # Latency to ms
-    if n in {"latency_p95", "latency_p95_ms", "p95_latency", "latency"}:
-        if u in {"ms", "millisecond", "milliseconds", ""}:
-            return value
-        if u in {"s", "sec", "secs", "second", "seconds"}:
-            return value * 1000.0
-        if u in {"us", "µs"}:
-            return value / 1000.0
-        return value
-
-    # Default: return as-is
-    return value
+    return _CONVERTER.get((name or "").lower(), _identity)(value, (unit or "").lower().strip())
+
+_CANON_KEYS = frozenset({"name", "value", "unit", "window_s"})
+
+def _is_canonical(s: Dict[str, Any]) -> bool:
+    """True if normalize() would rebuild `s` with identical keys and values."""
+    if not isinstance(s, dict) or s.keys() != _CANON_KEYS:
+        return False
+    name, value, win = s["name"], s["value"], s["window_s"]
+    if not isinstance(name, str) or name != name.strip() or type(value) is not float:
+        return False
+    if win is not None and (type(win) is not int or win == 0):
+        return False
+    conv = _CONVERTER.get(name.lower(), _identity)
+    return conv is _identity or conv(value, (s["unit"] or "").lower().strip()) == value
 
 def normalize(signals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Normalize incoming signals to consistent units & keys."""
+    """Normalize incoming signals to consistent units & keys.
+    Already-canonical input (e.g. a second pass) is returned as-is, without copying."""
+    if signals and all(_is_canonical(s) for s in signals):
+        return signals
     out: List[Dict[str, Any]] = []
     for s in signals or []:
         name = (s.get("name") or "").strip()
@@ -94,13 +119,19 @@ def normalize(signals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         })
     return out
 
-def _get(signals: List[Dict[str, Any]], *names: str, default: float = 0.0) -> float:
-    names_lc = {n.lower() for n in names}
+def _pick(signals: List[Dict[str, Any]]) -> Tuple[float, float]:
+    """Single pass: first error-rate and first p95 signal (in input order) win."""
+    err_pct: Optional[float] = None
+    p95_ms: Optional[float] = None
     for s in signals:
         n = (s.get("name") or "").lower()
-        if n in names_lc:
-            return _coerce_float(s.get("value"), default)
-    return default
+        if err_pct is None and n in ALIASES_ERR:
+            err_pct = _coerce_float(s.get("value"))
+        elif p95_ms is None and n in ALIASES_P95:
+            p95_ms = _coerce_float(s.get("value"))
+        if err_pct is not None and p95_ms is not None:
+            break
+    return err_pct or 0.0, p95_ms or 0.0
 
 def infer_severity(signals: List[Dict[str, Any]]) -> str:
     """Rule-based severity:
@@ -111,8 +142,7 @@ def infer_severity(signals: List[Dict[str, Any]]) -> str:
     """
     sigs = normalize(signals)
 
-    err_pct = _get(sigs, "5xx_rate", "5xx", "error_rate", "http_5xx_rate", default=0.0)
-    p95_ms  = _get(sigs, "latency_p95", "latency_p95_ms", "p95_latency", "latency", default=0.0)
+    err_pct, p95_ms = _pick(sigs)
 
     # High rules (joint or extreme single-signal)
     if (err_pct >= ERR_HIGH_PCT and p95_ms >= P95_HIGH_MS) \
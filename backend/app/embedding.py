@@ -1,20 +1,22 @@
 from typing import List
-import hashlib
+import mmh3
+import numpy as np
 
-def _hash_token(token: str, dim: int) -> int:
-    h = hashlib.sha1(token.encode("utf-8")).hexdigest()
-    return int(h[:8], 16) % dim
+def _hash_tokens(tokens: List[str], dim: int) -> np.ndarray:
+    # non-cryptographic 32-bit mixer; seed pinned so buckets are stable across runs
+    idx = np.fromiter((mmh3.hash(tok, 0, signed=False) for tok in tokens), dtype=np.int64, count=len(tokens))
+    return idx % dim
 
 def embed_texts(texts: List[str], dim: int = 256) -> List[List[float]]:
-    vecs = []
-    for t in texts:
-        v = [0.0] * dim
-        tokens = [tok for tok in t.lower().split() if tok.strip()]
-        for tok in tokens:
-            idx = _hash_token(tok, dim)
-            v[idx] += 1.0
-        # L2 normalize
-        norm = sum(x*x for x in v) ** 0.5 or 1.0
-        v = [x / norm for x in v]
-        vecs.append(v)
-    return vecs
+    rows: List[int] = []
+    tokens: List[str] = []
+    for i, t in enumerate(texts):
+        toks = t.lower().split()
+        tokens.extend(toks)
+        rows.extend([i] * len(toks))
+    n = len(texts)
+    flat = np.asarray(rows, dtype=np.int64) * dim + _hash_tokens(tokens, dim)
+    mat = np.bincount(flat, minlength=n * dim).astype(np.float32).reshape(n, dim)
+    # L2 normalize (token counts are integers, so non-zero norms are >= 1)
+    mat /= np.linalg.norm(mat, axis=1, keepdims=True).clip(min=1.0)
+    return mat.tolist()
@@ -5,13 +5,19 @@
 
 
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
-from datetime import datetime
-import time
-
-from .policy.policy_guard import evaluate_plan
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from enum import IntEnum
+from time import gmtime as _gmtime, strftime as _strftime, time as _time
+import asyncio
+import secrets
+
+from .config import settings
+from .policy.policy_guard import evaluate_plan_cached
 from .audit import write_event
 
+# Per-step simulated latency (ms) for UI demos; 0 disables it
+EXEC_SIMULATE_MS = settings.EXEC_SIMULATE_MS
+
 
 HARD_BLOCKS = {
     "env_not_allowlisted",
@@ -22,12 +28,16 @@ HARD_BLOCKS = {
     "backup_required",
 }
 
+def _iso(t: float) -> str:
+    """Epoch seconds -> 'YYYY-MM-DDTHH:MM:SS.ffffffZ' without building datetime objects."""
+    return f"{_strftime('%Y-%m-%dT%H:%M:%S', _gmtime(t))}.{int((t % 1) * 1e6):06d}Z"
+
 def _utcnow_iso() -> str:
-    return datetime.utcnow().isoformat() + "Z"
+    return _iso(_time())
 
-def _sleep_ms(ms: int):
+async def _sleep_ms(ms: int):
 
-    time.sleep(min(ms, 50) / 1000.0)
+    await asyncio.sleep(min(ms, 50) / 1000.0)
 
 def _ok(msg: str, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     out = {"ok": True, "message": msg}
@@ -105,28 +115,82 @@ def _exec_rollback(step: Dict[str, Any], dry_run: bool) -> Dict[str, Any]:
         return _ok(f"would rollback {target} to previous version")
     return _ok(f"rolled back {target} to previous version")
 
-STEP_HANDLERS = {
-    "read": _exec_read,
-    "observe": _exec_read,
-    "config_change": _exec_config_change,
-    "restart": _exec_restart,
-    "deploy": _exec_deploy,
-    "feature_flag": _exec_feature_flag,
-    "db_schema": _exec_db_schema,
-    "scale": _exec_scale,
-    "rollback": _exec_rollback,
-}
+class Action(IntEnum):
+    """Known action types; the value indexes HANDLERS (aliases share a slot)."""
+    READ = 0
+    OBSERVE = 0
+    CONFIG_CHANGE = 1
+    RESTART = 2
+    DEPLOY = 3
+    FEATURE_FLAG = 4
+    DB_SCHEMA = 5
+    SCALE = 6
+    ROLLBACK = 7
+
+HANDLERS: Tuple[Callable[..., Dict[str, Any]], ...] = (
+    _exec_read,
+    _exec_config_change,
+    _exec_restart,
+    _exec_deploy,
+    _exec_feature_flag,
+    _exec_db_schema,
+    _exec_scale,
+    _exec_rollback,
+)
+
+ACTION_INDEX: Dict[str, int] = {name.lower(): int(a) for name, a in Action.__members__.items()}
+STEP_HANDLERS = {name: HANDLERS[i] for name, i in ACTION_INDEX.items()}
+
+def _normalize_plan(steps: List[Dict[str, Any]]) -> List[Tuple[str, int]]:
+    """Resolve each step's action_type to (action, handler index) once; -1 = unsupported."""
+    out: List[Tuple[str, int]] = []
+    for step in steps:
+        action = (step.get("action_type") or "read").lower()
+        out.append((action, ACTION_INDEX.get(action, -1)))
+    return out
+
+# Steps that may share a wave with neighbours; everything else is a write and serialized
+PARALLEL_SAFE = {"read", "observe"}
 
-def _execute_step(idx: int, step: Dict[str, Any], dry_run: bool) -> Dict[str, Any]:
-    started = _utcnow_iso()
-    action = (step.get("action_type") or "read").lower()
-    handler = STEP_HANDLERS.get(action)
-    if not handler:
+def _plan_waves(steps: List[Dict[str, Any]], resolved: List[Tuple[str, int]]) -> List[List[int]]:
+    """
+    Group step indices into waves that may run concurrently.
+    - explicit `depends_on: [idx, ...]` (earlier indices) is honoured as given
+    - otherwise read-only steps wait only for earlier writes, writes for every earlier step
+    - writes never share a wave with (or overtake) another write
+    """
+    levels: List[int] = []
+    last_write_level = -1
+    for i, step in enumerate(steps):
+        is_read = resolved[i][0] in PARALLEL_SAFE
+        deps = step.get("depends_on")
+        if isinstance(deps, list):
+            deps = [d for d in deps if isinstance(d, int) and 0 <= d < i]
+        elif is_read:
+            deps = [j for j in range(i) if resolved[j][0] not in PARALLEL_SAFE]
+        else:
+            deps = list(range(i))
+        lvl = 1 + max(levels[d] for d in deps) if deps else 0
+        if not is_read:
+            lvl = max(lvl, last_write_level + 1)
+            last_write_level = lvl
+        levels.append(lvl)
+
+    waves: Dict[int, List[int]] = {}
+    for i, lvl in enumerate(levels):
+        waves.setdefault(lvl, []).append(i)
+    return [waves[k] for k in sorted(waves)]
+
+async def _execute_step(idx: int, step: Dict[str, Any], action: str, action_idx: int, dry_run: bool) -> Dict[str, Any]:
+    now = _utcnow_iso
+    started = now()
+    if action_idx < 0:
         res = _err(f"unsupported action_type '{action}'")
     else:
-        _sleep_ms(20)
-        res = handler(step, dry_run=dry_run)
-    ended = _utcnow_iso()
+        if EXEC_SIMULATE_MS:
+            await _sleep_ms(EXEC_SIMULATE_MS)
+        res = HANDLERS[action_idx](step, dry_run=dry_run)
+    ended = now()
     res.update({
         "step_index": idx,
         "action_type": action,
@@ -135,59 +199,64 @@ def _execute_step(idx: int, step: Dict[str, Any], dry_run: bool) -> Dict[str, An
     })
     return res
 
-def execute_plan(incident, plan: Dict[str, Any], approved: bool, dry_run: bool = True) -> Dict[str, Any]:
+async def execute_plan(incident, plan: Dict[str, Any], approved: bool, dry_run: bool = True) -> Dict[str, Any]:
     """
-    Execute a remediation plan step-by-step.
+    Execute a remediation plan wave-by-wave (independent read-only steps run concurrently).
     - Re-evaluates policy at execution time.
     - If violations contain hard blocks, refuse to execute.
     - If write actions but not approved, refuse to execute.
-    - Returns a structured result with per-step details.
+    - Stops after the first wave containing a failed step.
+    - Returns a structured result with per-step details (ordered by step index).
     """
-    exec_id = f"exec-{getattr(incident, 'id', 'inc')[:8]}-{(plan.get('id') or 'plan')[:12]}"
-    started = _utcnow_iso()
+    # bound once; the step loop below emits two audit events per step
+    _we, _now, _step = write_event, _utcnow_iso, _execute_step
+    incident_id = getattr(incident, "id", None)
+    plan_id = plan.get("id")
+    exec_id = f"exec-{(incident_id or 'inc')[:8]}-{secrets.token_hex(6)}"
+    started = _now()
 
     # Re-evaluate policy snapshot
-    pol = evaluate_plan(plan, approved=approved)
+    pol = evaluate_plan_cached(plan, approved=approved)
     violations: List[Dict[str, str]] = pol.get("policy_violations") or []
     hard = [v for v in violations if v.get("code") in HARD_BLOCKS]
 
     if hard:
-        write_event("execute_blocked", {
-            "incident_id": getattr(incident, "id", None),
-            "plan_id": plan.get("id"),
+        _we("execute_blocked", {
+            "incident_id": incident_id,
+            "plan_id": plan_id,
             "reason": "hard_policy_block",
             "violations": hard,
         })
         return {
             "execution_id": exec_id,
-            "incident_id": getattr(incident, "id", None),
-            "plan_id": plan.get("id"),
+            "incident_id": incident_id,
+            "plan_id": plan_id,
             "status": "blocked",
             "blocked_by": [v.get("code") for v in hard],
             "policy_snapshot": pol,
             "dry_run": dry_run,
             "started_at": started,
-            "ended_at": _utcnow_iso(),
+            "ended_at": _now(),
             "steps": [],
         }
 
     if not pol.get("policy_ok") and not approved:
-        write_event("execute_blocked", {
-            "incident_id": getattr(incident, "id", None),
-            "plan_id": plan.get("id"),
+        _we("execute_blocked", {
+            "incident_id": incident_id,
+            "plan_id": plan_id,
             "reason": "approval_required",
             "violations": violations,
         })
         return {
             "execution_id": exec_id,
-            "incident_id": getattr(incident, "id", None),
-            "plan_id": plan.get("id"),
+            "incident_id": incident_id,
+            "plan_id": plan_id,
             "status": "blocked",
             "blocked_by": [v.get("code") for v in violations],
             "policy_snapshot": pol,
             "dry_run": dry_run,
             "started_at": started,
-            "ended_at": _utcnow_iso(),
+            "ended_at": _now(),
             "steps": [],
         }
 
@@ -195,47 +264,54 @@ def execute_plan(incident, plan: Dict[str, Any], approved: bool, dry_run: bool =
     step_results: List[Dict[str, Any]] = []
     overall_ok = True
 
-    write_event("execute_start", {
-        "incident_id": getattr(incident, "id", None),
-        "plan_id": plan.get("id"),
+    _we("execute_start", {
+        "incident_id": incident_id,
+        "plan_id": plan_id,
         "dry_run": dry_run,
         "step_count": len(steps),
     })
 
-    for i, step in enumerate(steps):
-        write_event("execute_step_begin", {
-            "incident_id": getattr(incident, "id", None),
-            "plan_id": plan.get("id"),
+    resolved = _normalize_plan(steps)
+
+    async def _run(i: int) -> Dict[str, Any]:
+        action, action_idx = resolved[i]
+        _we("execute_step_begin", {
+            "incident_id": incident_id,
+            "plan_id": plan_id,
             "index": i,
-            "action_type": step.get("action_type"),
+            "action_type": steps[i].get("action_type"),
         })
-        res = _execute_step(i, step, dry_run=dry_run)
-        step_results.append(res)
-        write_event("execute_step_end", {
-            "incident_id": getattr(incident, "id", None),
-            "plan_id": plan.get("id"),
+        res = await _step(i, steps[i], action, action_idx, dry_run=dry_run)
+        _we("execute_step_end", {
+            "incident_id": incident_id,
+            "plan_id": plan_id,
             "index": i,
             "ok": bool(res.get("ok")),
             "message": res.get("message"),
         })
-        if not res.get("ok"):
+        return res
+
+    for wave in _plan_waves(steps, resolved):
+        results = await asyncio.gather(*(_run(i) for i in wave))
+        step_results.extend(results)
+        if not all(r.get("ok") for r in results):
             overall_ok = False
- 
             break
+    step_results.sort(key=lambda r: r["step_index"])
 
-    ended = _utcnow_iso()
+    ended = _now()
     status = "success" if overall_ok else "failed"
 
-    write_event("execute_end", {
-        "incident_id": getattr(incident, "id", None),
-        "plan_id": plan.get("id"),
+    _we("execute_end", {
+        "incident_id": incident_id,
+        "plan_id": plan_id,
         "status": status,
     })
 
     return {
         "execution_id": exec_id,
-        "incident_id": getattr(incident, "id", None),
-        "plan_id": plan.get("id"),
+        "incident_id": incident_id,
+        "plan_id": plan_id,
         "status": status,
         "dry_run": dry_run,
         "policy_snapshot": pol,
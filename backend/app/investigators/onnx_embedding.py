@@ -0,0 +1,71 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+# Export + quantize once with scripts/export_onnx.py; the directory must hold
+# tokenizer.json and the quantized graph (model.int8.onnx by default).
+DEFAULT_MODEL_FILE = "model.int8.onnx"
+MAX_SEQ_LEN = 256  # all-MiniLM-L6-v2 was trained with 256 word pieces
+BATCH_SIZE = 32    # rows per session.run; inputs are length-sorted so each batch pads little
+
+class ORTEmbedding(EmbeddingFunction[Documents]):
+    """Sentence-transformer compatible embeddings (mean pooling + L2 norm) served by ONNX Runtime.
+
+    Produces the same 384-dim space as SentenceTransformerEmbeddingFunction for
+    all-MiniLM-L6-v2, up to int8 quantization error.
+    """
+
+    def __init__(self, model_dir: str, model_file: str = DEFAULT_MODEL_FILE, threads: int = 0,
+                 batch_size: int = BATCH_SIZE):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        root = Path(model_dir)
+        self._tok = Tokenizer.from_file(str(root / "tokenizer.json"))
+        self._tok.enable_truncation(max_length=MAX_SEQ_LEN)
+        self.batch_size = batch_size
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            opts.intra_op_num_threads = threads
+        self._sess = ort.InferenceSession(
+            str(root / model_file), sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = {i.name for i in self._sess.get_inputs()}
+
+    def _embed(self, ids: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self._inputs:
+            feeds["token_type_ids"] = np.zeros_like(ids)
+        hidden = self._sess.run(None, {k: v for k, v in feeds.items() if k in self._inputs})[0]
+        # mean pooling over real tokens, then L2 normalize (matches sentence-transformers)
+        m = mask[..., None].astype(np.float32)
+        pooled = (hidden * m).sum(axis=1) / np.clip(m.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        if not input:
+            return []
+        enc = self._tok.encode_batch(list(input))
+        # Bulk callers (seeding) pass hundreds of docs of very different lengths: padding
+        # them all to the longest wastes most of the forward pass, so run similar lengths
+        # together and pad each batch only to its own longest row.
+        order = sorted(range(len(enc)), key=lambda i: len(enc[i].ids))
+        out: List[np.ndarray] = [None] * len(enc)  # type: ignore[list-item]
+        for k in range(0, len(order), max(1, self.batch_size)):
+            rows = order[k:k + self.batch_size]
+            width = len(enc[rows[-1]].ids)
+            ids = np.zeros((len(rows), width), dtype=np.int64)   # pad id 0 ([PAD]); masked out
+            mask = np.zeros((len(rows), width), dtype=np.int64)
+            for r, i in enumerate(rows):
+                n = len(enc[i].ids)
+                ids[r, :n] = enc[i].ids
+                mask[r, :n] = enc[i].attention_mask
+            for i, vec in zip(rows, self._embed(ids, mask)):
+                out[i] = vec
+        vecs: List[List[float]] = np.stack(out).tolist()
+        return vecs
@@ -146,17 +146,26 @@
 
 # backend/app/investigators/rag.py
 from __future__ import annotations
-import os
-from typing import Any, Dict, List, Optional
+import atexit
+import heapq
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import chromadb
 from chromadb.utils import embedding_functions
 
+from ..config import settings
+
 # ---- Config (single source of truth; align with seeder) ----
-VECTOR_DB_DIR   = os.getenv("VECTOR_DB_DIR", "/var/lib/chroma")
-COLLECTION_NAME = os.getenv("COLLECTION_NAME", "knowledge_base_384")
-EMBED_MODEL     = os.getenv("CHROMA_EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-DEFAULT_TOP_K   = int(os.getenv("RAG_TOP_K", "5"))
-MIN_SCORE       = float(os.getenv("RAG_MIN_SCORE", "0.30"))  # cosine similarity (1 - distance)
+VECTOR_DB_DIR   = settings.RAG_VECTOR_DB_DIR
+COLLECTION_NAME = settings.RAG_COLLECTION_NAME
+EMBED_MODEL     = settings.CHROMA_EMBED_MODEL
+EMBED_BACKEND   = settings.CHROMA_EMBED_BACKEND
+ONNX_DIR        = settings.CHROMA_ONNX_DIR
+DEFAULT_TOP_K   = settings.RAG_TOP_K
+MIN_SCORE       = settings.RAG_MIN_SCORE  # cosine similarity (1 - distance)
 
 # ---- Models (graceful shims for import-time failures) ----
 try:
@@ -177,44 +186,134 @@ except Exception:
         uri: str
         source: Optional[str] = None
 
+@dataclass(slots=True)
+class _EvRaw:
+    """Unvalidated hit used inside the ranking loop; converted to Evidence on return."""
+    title: str
+    score: float
+    snippet: str
+    uri: str
+    source: Optional[str] = None
+
+_EMPTY_META: Dict[str, Any] = {}
+
 def _score_from_distance(distance: Optional[float]) -> float:
     if distance is None:
         return 0.0
     s = 1.0 - float(distance)
     return max(0.0, min(1.0, s))
 
-def _build_query(incident: Incident) -> str:
-    parts: List[str] = []
-    if getattr(incident, "suspected_cause", None):
-        parts.append(str(incident.suspected_cause))
+_SigKey = Tuple[Any, Any, Any]
+
+def _query_key(incident: Incident) -> Tuple[Any, Any, Tuple[_SigKey, ...]]:
+    # the id is deliberately left out: identical incident shapes share one query
     sigs = getattr(incident, "signals", None) or []
-    def val(x: Dict[str, Any]) -> float:
-        try: return float(x.get("value", 0))
+    return (
+        getattr(incident, "suspected_cause", None),
+        getattr(incident, "service", None),
+        tuple((s.get("name"), s.get("value"), s.get("unit", "")) for s in sigs),
+    )
+
+@lru_cache(maxsize=2048)
+def _build_query_cached(key: Tuple[Any, Any, Tuple[_SigKey, ...]]) -> str:
+    cause, service, sigs = key
+    parts: List[str] = []
+    if cause:
+        parts.append(str(cause))
+    def val(x: _SigKey) -> float:
+        try: return float(x[1])
         except Exception: return 0.0
-    for s in sorted(sigs, key=val, reverse=True)[:2]:
-        n = s.get("name"); v = s.get("value"); u = s.get("unit","")
+    for n, v, u in sorted(sigs, key=val, reverse=True)[:2]:
         if n is not None and v is not None:
             parts.append(f"{n}:{v}{u}")
-    if getattr(incident, "service", None):
-        parts.append(f"service:{incident.service}")
+    if service:
+        parts.append(f"service:{service}")
     return " | ".join(parts) or "site reliability incident remediation"
 
-def _uniq_by_uri(rows: List[Evidence]) -> List[Evidence]:
-    seen, out = set(), []
-    for e in rows:
-        k = getattr(e, "uri", None) or getattr(e, "source", None) or getattr(e, "title", "")
-        if k and k not in seen:
-            seen.add(k); out.append(e)
-    return out
+def _build_query(incident: Incident) -> str:
+    key = _query_key(incident)
+    try:
+        return _build_query_cached(key)
+    except TypeError:  # unhashable signal value (list/dict); build uncached
+        return _build_query_cached.__wrapped__(key)
+
+def _dedup_key(e: Any) -> str:
+    # uri, else source, else title; rows with none of them are dropped
+    return getattr(e, "uri", None) or getattr(e, "source", None) or getattr(e, "title", "")
+
+def _top_unique(rows: List[Any], top_k: int) -> List[Any]:
+    """Best row per _dedup_key, then a heap-based top-k.
+    Ties keep input order, matching a stable sort."""
+    best: Dict[str, Tuple[float, int, Any]] = {}
+    for i, e in enumerate(rows):
+        k = _dedup_key(e)
+        score = getattr(e, "score", 0.0)
+        if k and (k not in best or score > best[k][0]):
+            best[k] = (score, -i, e)
+    return [t[2] for t in heapq.nlargest(top_k, best.values(), key=lambda t: (t[0], t[1]))]
+
+_HIT_FIELDS = itemgetter("documents", "metadatas", "distances")
+
+def _iter_hits(res: Dict[str, Any], min_score: float) -> Iterator[Tuple[Optional[str], Optional[Dict[str, Any]], float]]:
+    """Yield (doc, meta, score) for the single query in `res`, dropping hits below min_score."""
+    docs, metas, dists = (f[0] if f else () for f in _HIT_FIELDS(res))
+    for doc, meta, dist in zip(docs, metas, dists):
+        score = _score_from_distance(dist)
+        if score >= min_score:
+            yield doc, meta, score
+
+_EF = None
+_COLL = None
+_COLL_LOCK = threading.Lock()
+
+def _get_embedding_function():
+    """Process-wide embedder; shared by the collection and query encoding.
+    CHROMA_EMBED_BACKEND=onnx serves the int8-quantized export through ONNX Runtime
+    (use a separate COLLECTION_NAME, e.g. knowledge_base_384_q8, for its vectors)."""
+    global _EF
+    if _EF is None:
+        with _COLL_LOCK:
+            if _EF is None:
+                if EMBED_BACKEND == "onnx":
+                    from .onnx_embedding import ORTEmbedding
+                    _EF = ORTEmbedding(ONNX_DIR)
+                else:
+                    _EF = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=EMBED_MODEL)
+    return _EF
 
 def _get_collection():
-    client = chromadb.PersistentClient(path=VECTOR_DB_DIR)
-    ef = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=EMBED_MODEL)
-    return client.get_or_create_collection(
-        COLLECTION_NAME,
-        metadata={"hnsw:space": "cosine"},
-        embedding_function=ef,
-    )
+    """Process-wide collection handle; the client and embedding model load once."""
+    global _COLL
+    if _COLL is None:
+        ef = _get_embedding_function()
+        with _COLL_LOCK:
+            if _COLL is None:
+                client = chromadb.PersistentClient(path=VECTOR_DB_DIR)
+                _COLL = client.get_or_create_collection(
+                    COLLECTION_NAME,
+                    metadata={"hnsw:space": "cosine"},
+                    embedding_function=ef,
+                )
+    return _COLL
+
+@atexit.register
+def reset_collection() -> None:
+    """Drop the cached collection and release Chroma's shared client (SQLite/HNSW handles).
+    The next _get_collection() reopens it; the embedding model is kept."""
+    global _COLL
+    with _COLL_LOCK:
+        _COLL = None
+        try:
+            from chromadb.api.client import SharedSystemClient
+            SharedSystemClient.clear_system_cache()
+        except Exception:
+            pass
+
+@lru_cache(maxsize=1024)
+def _embed_query(query: str) -> Tuple[float, ...]:
+    """Encode a query once; repeat investigations of the same incident shape hit the cache."""
+    vec = _get_embedding_function()([query])[0]
+    return tuple(float(x) for x in vec)
 
 def retrieve_evidence(
     incident: Incident,
@@ -233,28 +332,22 @@ def retrieve_evidence(
         where = {**where, "service": svc}
 
     res = coll.query(
-        query_texts=[query],
+        query_embeddings=[list(_embed_query(query))],
         n_results=max(5, top_k * 2),
         where=where or None,
         include=["documents", "metadatas", "distances"],
     )
 
-    docs = (res.get("documents") or [[]])[0]
-    metas = (res.get("metadatas") or [[]])[0]
-    dists = (res.get("distances") or [[]])[0]
-
-    rows: List[Evidence] = []
-    for doc, meta, dist in zip(docs, metas, dists):
-        score = _score_from_distance(dist)
-        if score < min_score:
-            continue
-        title = (meta or {}).get("title") or (meta or {}).get("filename") or "KB Note"
-        uri = (meta or {}).get("uri") or (meta or {}).get("path") or (meta or {}).get("filename") or ""
-        snippet = (doc or "")[:500]
-        if HAVE_MODELS:
-            rows.append(Evidence(title=title, score=score, snippet=snippet, uri=uri, source=uri))
-        else:
-            rows.append(Evidence(title=title, score=score, snippet=snippet, uri=uri, source=uri))  # type: ignore
-
-    rows = _uniq_by_uri(sorted(rows, key=lambda e: getattr(e, "score", 0.0), reverse=True))
-    return rows[:top_k]
+    rows: List[_EvRaw] = []
+    for doc, meta, score in _iter_hits(res, min_score):
+        meta = meta or _EMPTY_META
+        filename = meta.get("filename")
+        title = meta.get("title") or filename or "KB Note"
+        uri = meta.get("uri") or meta.get("path") or filename or ""
+        rows.append(_EvRaw(title, score, (doc or "")[:500], uri, uri))
+
+    # rows are built from our own Chroma metadata, so skip re-validation
+    return [
+        Evidence.model_construct(title=e.title, score=e.score, snippet=e.snippet, uri=e.uri, source=e.source)
+        for e in _top_unique(rows, top_k)
+    ]
@@ -3,17 +3,55 @@ from __future__ import annotations
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 import hashlib
-import requests
+import httpx
 
 # Reuse the exact same collection + embedding function as RAG
+from ..config import settings
 from ..investigators.rag import _get_collection
 
+KB_MAX_URL_BYTES = settings.KB_MAX_URL_BYTES
+_URL_CHUNK = 64 * 1024
+_TEXT_TYPES = ("application/json", "application/xml")
+
 def _now_iso() -> str:
     return datetime.utcnow().isoformat() + "Z"
 
+_SEP = b"::"
+
 def _mk_id(title: str, text: str, service: Optional[str] = None) -> str:
-    base = f"{title}::{service or ''}::{text[:256]}"
-    return hashlib.sha1(base.encode("utf-8")).hexdigest()
+    # == sha1(f"{title}::{service or ''}::{text[:256]}") without building the joined string;
+    # the prefix stays 256 *characters* so ids of already-ingested docs don't change
+    h = hashlib.sha1(title.encode("utf-8"))
+    h.update(_SEP)
+    h.update((service or "").encode("utf-8"))
+    h.update(_SEP)
+    h.update(text[:256].encode("utf-8"))
+    return h.hexdigest()
+
+def _mk_ids_bulk(titles: List[str], texts: List[str], services: List[Optional[str]]) -> List[str]:
+    """_mk_id over parallel lists; delegates so bulk and single ingest can't drift apart."""
+    return [_mk_id(t, x, s) for t, x, s in zip(titles, texts, services)]
+
+KB_BATCH_SIZE = 100  # upserts per Chroma call (one SQLite transaction each)
+SNIPPET_CHARS = 400  # stored in metadata so list_docs never reads document bodies
+
+def _mk_meta(
+    title: str,
+    service: Optional[str],
+    uri: Optional[str],
+    tags: Optional[List[str]],
+    created_at: str,
+    text: str,
+) -> Dict[str, Any]:
+    return {
+        "title": title,
+        "service": service,
+        "uri": uri,
+        "tags": tags or [],
+        "created_at": created_at,
+        "kind": "kb_manual",
+        "snippet": text[:SNIPPET_CHARS],
+    }
 
 def add_text_doc(
     title: str,
@@ -25,45 +63,89 @@ def add_text_doc(
 ) -> Dict[str, Any]:
     col = _get_collection()
     doc_id = _mk_id(title, text, service)
-    meta = {
-        "title": title,
-        "service": service,
-        "uri": uri,
-        "tags": tags or [],
-        "created_at": _now_iso(),
-        "kind": "kb_manual",
-    }
+    meta = _mk_meta(title, service, uri, tags, _now_iso(), text)
+    created = not col.get(ids=[doc_id], include=[])["ids"]  # re-ingest overwrites in place
     col.upsert(ids=[doc_id], documents=[text], metadatas=[meta])
-    return {"id": doc_id, "title": title, "service": service, "uri": uri}
+    return {"id": doc_id, "title": title, "service": service, "uri": uri, "created": created}
 
-def add_url_doc(
+def add_text_docs(items: List[Dict[str, Any]], batch_size: int = KB_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """Bulk add_text_doc: items carry title/text and optional service/uri/tags.
+    Upserts in slices of batch_size, so N docs cost ceil(N/batch_size) transactions.
+    Items that map to the same id collapse to the last one (Chroma rejects
+    duplicate ids within a single upsert)."""
+    col = _get_collection()
+    now = _now_iso()
+    all_ids = _mk_ids_bulk(
+        [it["title"] for it in items], [it["text"] for it in items], [it.get("service") for it in items]
+    )
+    last = {doc_id: i for i, doc_id in enumerate(all_ids)}
+    keep = sorted(last.values())
+    ids = [all_ids[i] for i in keep]
+    docs = [items[i]["text"] for i in keep]
+    metas: List[Dict[str, Any]] = []
+    out: List[Dict[str, Any]] = []
+    for i, doc_id in zip(keep, ids):
+        it = items[i]
+        title, service, uri = it["title"], it.get("service"), it.get("uri")
+        metas.append(_mk_meta(title, service, uri, it.get("tags"), now, it["text"]))
+        out.append({"id": doc_id, "title": title, "service": service, "uri": uri})
+    step = max(1, batch_size)
+    for i in range(0, len(ids), step):
+        existing = set(col.get(ids=ids[i:i + step], include=[])["ids"])
+        for o in out[i:i + step]:
+            o["created"] = o["id"] not in existing
+        col.upsert(ids=ids[i:i + step], documents=docs[i:i + step], metadatas=metas[i:i + step])
+    return out
+
+def _check_headers(headers: Any, max_bytes: int) -> None:
+    ctype = (headers.get("Content-Type") or "text/plain").split(";")[0].strip().lower()
+    if not (ctype.startswith("text/") or ctype in _TEXT_TYPES):
+        raise ValueError(f"unsupported content type: {ctype}")
+    declared = headers.get("Content-Length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise ValueError(f"document exceeds {max_bytes} bytes")
+
+async def fetch_text_async(
+    client: httpx.AsyncClient,
     url: str,
-    *,
-    title: Optional[str] = None,
-    service: Optional[str] = None,
     timeout: float = 10.0,
-) -> Dict[str, Any]:
-    resp = requests.get(url, timeout=timeout)
-    resp.raise_for_status()
-    content = resp.text
-    t = title or url
-    return add_text_doc(t, content, service=service, uri=url, tags=["url"])
+    max_bytes: int = KB_MAX_URL_BYTES,
+) -> str:
+    """Stream a text page over a pooled httpx client, aborting once it exceeds max_bytes
+    or isn't text (ValueError). Redirects are followed (httpx defaults to not following)."""
+    async with client.stream("GET", url, timeout=timeout, follow_redirects=True) as resp:
+        resp.raise_for_status()
+        _check_headers(resp.headers, max_bytes)
+        buf = bytearray()
+        async for chunk in resp.aiter_bytes(_URL_CHUNK):
+            buf += chunk
+            if len(buf) > max_bytes:
+                raise ValueError(f"document exceeds {max_bytes} bytes")
+        return buf.decode(resp.encoding or "utf-8", errors="replace")
 
 def list_docs(limit: int = 50, offset: int = 0) -> Dict[str, Any]:
     col = _get_collection()
-    # fetch a window of docs (Chroma returns in arbitrary order)
-    res = col.get(include=["metadatas", "documents"], limit=limit, offset=offset)
+    # fetch a window of docs (Chroma returns in arbitrary order); metadata only
+    res = col.get(include=["metadatas"], limit=limit, offset=offset)
+    ids = res["ids"]
+    metas = [m or {} for m in res.get("metadatas") or []]
+    # docs ingested before snippets lived in metadata (e.g. seeded) need their bodies
+    missing = [ids[i] for i, m in enumerate(metas) if "snippet" not in m]
+    legacy: Dict[str, str] = {}
+    if missing:
+        old = col.get(ids=missing, include=["documents"])
+        legacy = {k: (d or "")[:SNIPPET_CHARS] for k, d in zip(old["ids"], old.get("documents") or [])}
     items = []
-    for i, meta in enumerate(res.get("metadatas", [])):
+    for doc_id, meta in zip(ids, metas):
         items.append({
-            "id": res["ids"][i],
-            "title": (meta or {}).get("title"),
-            "service": (meta or {}).get("service"),
-            "uri": (meta or {}).get("uri"),
-            "tags": (meta or {}).get("tags"),
-            "created_at": (meta or {}).get("created_at"),
-            "kind": (meta or {}).get("kind", "kb"),
-            "snippet": (res.get("documents") or [""])[i][:400],
+            "id": doc_id,
+            "title": meta.get("title"),
+            "service": meta.get("service"),
+            "uri": meta.get("uri"),
+            "tags": meta.get("tags"),
+            "created_at": meta.get("created_at"),
+            "kind": meta.get("kind", "kb"),
+            "snippet": meta["snippet"] if "snippet" in meta else legacy.get(doc_id, ""),
         })
     return {
         "total": col.count(),
@@ -73,9 +155,12 @@ def list_docs(limit: int = 50, offset: int = 0) -> Dict[str, Any]:
     }
 
 def delete_doc(doc_id: str) -> Dict[str, Any]:
+    """"deleted" lists only ids that existed, so callers can keep counts exact."""
     col = _get_collection()
-    col.delete(ids=[doc_id])
-    return {"deleted": [doc_id]}
+    found = col.get(ids=[doc_id], include=[])["ids"]
+    if found:
+        col.delete(ids=found)
+    return {"deleted": found}
 
 def kb_stats() -> Dict[str, Any]:
     col = _get_collection()
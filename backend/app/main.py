@@ -3,21 +3,34 @@
 from __future__ import annotations
 
 import os
-import json
+import asyncio
 import time
 import hmac
 import httpx
 import hashlib
+import bisect
+import pickle
 import urllib.parse
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import groupby, islice
+from functools import lru_cache, partial
+from operator import attrgetter, methodcaller
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 import anyio
-from fastapi import Body, Depends, FastAPI, HTTPException, Request
+import orjson
+from fastapi import BackgroundTasks, Body, Depends, FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import (
     HTMLResponse,
+    ORJSONResponse,
     PlainTextResponse,
     Response,
     StreamingResponse,
@@ -29,17 +42,32 @@ from prometheus_client import (
 # ------------------------------- Optional deps -------------------------------
 # Notify (Slack/Jira)
 try:
-    from .notify import notify_slack, notify_slack_blocks, create_jira_ticket  # type: ignore
+    from .notify import notify_slack, notify_slack_blocks, create_jira_ticket, aclose_clients, slack_batcher  # type: ignore
 except Exception:  # pragma: no cover
     async def notify_slack(*_a, **_k): return None  # type: ignore
     async def notify_slack_blocks(*_a, **_k): return None  # type: ignore
     async def create_jira_ticket(*_a, **_k): return None  # type: ignore
+    async def aclose_clients(): return None  # type: ignore
+    class _NoBatcher:  # type: ignore
+        def start(self): pass
+        async def enqueue(self, *_a, **_k): return None
+        async def stop(self): pass
+    slack_batcher = _NoBatcher()  # type: ignore
 
 # Audit (best-effort)
 try:
-    from .audit import AUDIT_FILE, write_event  # type: ignore
+    from .audit import (  # type: ignore
+        AUDIT_FILE, AUDIT_FORMAT, add_listener, read_records, record_unpacker, remove_listener,
+        tail_lines, write_event,
+    )
 except Exception:  # pragma: no cover
     AUDIT_FILE = Path("state/logs/audit.log")  # type: ignore
+    AUDIT_FORMAT = "json"  # type: ignore
+    def read_records(*_a, **_k): return []  # type: ignore
+    def record_unpacker(*_a, **_k): return None  # type: ignore
+    def tail_lines(*_a, **_k): return []  # type: ignore
+    def add_listener(*_a, **_k): return None  # type: ignore
+    def remove_listener(*_a, **_k): return None  # type: ignore
     def write_event(*_a, **_k): return None  # type: ignore
 
 # Chroma optional
@@ -51,23 +79,25 @@ except Exception:
 # ------------------------------- Local modules -------------------------------
 from .config import (
     VECTOR_DB_DIR, KB_MIN_DOCS, ALLOWED_ORIGINS, LOG_LEVEL,
-    COLLECTION_NAME, SLACK_SIGNING_SECRET,
+    SLACK_SIGNING_SECRET, settings,
 )
 from .detectors.detector import infer_severity, normalize
-from .kb.ingest import add_text_doc, add_url_doc, list_docs, delete_doc, kb_stats
+from .investigators.rag import _get_collection
+from .kb.ingest import add_text_doc, add_text_docs, fetch_text_async, list_docs, delete_doc, kb_stats
 from .logging_setup import configure
 from .models import DetectRequest, Incident
-from .reporter.html import render_report
-from .reporter.pdf import build_pdf
+from .reporter.html import render_report_stream
+from .reporter import pdf as pdf_reporter
 from .reporter.reporter import to_markdown
 from .security import require_scopes
-from .store import APPROVALS, INCIDENTS, RESULTS, load_state, save_state
+from .validator import validator
+from .store import APPROVALS, INCIDENTS, RESULTS, aload_state, mark_dirty, flush_state
 
 # Executor (with safe fallback)
 try:
     from .executor import execute_plan  # real engine
 except Exception:
-    def execute_plan(inc, plan, approved: bool, dry_run: bool = True):
+    async def execute_plan(inc, plan, approved: bool, dry_run: bool = True):
         return {
             "status": "executor_unavailable",
             "incident_id": getattr(inc, "id", None),
@@ -79,17 +109,30 @@ except Exception:
 
 # --------------------------------- App setup ---------------------------------
 log = configure(LOG_LEVEL)
-app = FastAPI(title="Incident Copilot MVP v2")
+app = FastAPI(title="Incident Copilot MVP v2", default_response_class=ORJSONResponse)
 
 VERSION = {"version": "2.1.0", "build": "local"}
 started_at = time.time()
 
+KB_GAUGE_REFRESH_S = 30
+AUDIT_STREAM_POLL_S = 5.0  # fallback wake-up for audit lines written by other processes
+AUDIT_STREAM_CHUNK = 64 * 1024  # msgpack follower read size
+_kb_refresher: Optional["asyncio.Task[None]"] = None
+
+# One pooled client for Slack response_url callbacks (keep-alive instead of a TLS handshake per post)
+HTTP = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    timeout=30.0,
+)
+
 REGISTRY = CollectorRegistry()
 INCIDENTS_TOTAL     = Counter("incidents_total", "Incidents created", registry=REGISTRY)
 PIPELINE_RUNS_TOTAL = Counter("pipeline_runs_total", "Pipeline runs", registry=REGISTRY)
 APPROVALS_TOTAL     = Counter("approvals_total", "Approvals toggled", registry=REGISTRY)
 KB_DOCS_GAUGE       = Gauge("kb_docs", "Knowledge base document count", registry=REGISTRY)
 EXECUTIONS_TOTAL    = Counter("executions_total", "Plan executions", registry=REGISTRY)
+RESULTS_GAUGE       = Gauge("pipeline_results_cached", "Pipeline results held in memory", registry=REGISTRY)
+RESULTS_GAUGE.set_function(lambda: len(RESULTS))
 
 app.add_middleware(
     CORSMiddleware,
@@ -100,7 +143,6 @@ app.add_middleware(
 )
 
 # ------------------------------- Auth deps -----------------------------------
-from fastapi import Depends
 RUN = Depends(require_scopes(["run"]))
 EXEC = Depends(require_scopes(["run"]))      # change to ["execute"] if you want stricter
 KB   = Depends(require_scopes(["kb"]))
@@ -108,59 +150,252 @@ AUD  = Depends(require_scopes(["audit"]))
 ADM  = Depends(require_scopes(["admin"]))
 
 # ---------------------------------- Helpers ----------------------------------
-def _try_save_state():
+async def _notify_quietly(fn: Callable[..., Any], *args: Any) -> None:
+    # background notifications are best-effort, like the inline sends they replace
+    try:
+        await fn(*args)
+    except Exception as e:
+        log.warning("notification failed: %s", e)
+
+# Cross-request notifications (Slack interactive replies): at most NOTIFY_MAX_IN_FLIGHT
+# sends at once, and a (incident_id, kind) already queued or sending is not sent twice
+# (Slack re-delivers an action it didn't see acknowledged within 3s).
+NOTIFY_MAX_IN_FLIGHT = 8
+_NOTIFY_SEM: Optional[asyncio.Semaphore] = None
+_NOTIFY_PENDING: Set[Tuple[str, str]] = set()
+_NOTIFY_TASKS: Set["asyncio.Task[None]"] = set()  # strong refs until done
+
+def _notify_later(key: Tuple[str, str], fn: Callable[..., Any], *args: Any) -> bool:
+    """Schedule fn(*args) off the request path; False if an identical send is pending."""
+    global _NOTIFY_SEM
+    if key in _NOTIFY_PENDING:
+        return False
+    if _NOTIFY_SEM is None:
+        _NOTIFY_SEM = asyncio.Semaphore(NOTIFY_MAX_IN_FLIGHT)
+    _NOTIFY_PENDING.add(key)
+
+    async def _send() -> None:
+        try:
+            async with _NOTIFY_SEM:
+                await _notify_quietly(fn, *args)
+        finally:
+            _NOTIFY_PENDING.discard(key)
+
+    task = asyncio.create_task(_send())
+    _NOTIFY_TASKS.add(task)
+    task.add_done_callback(_NOTIFY_TASKS.discard)
+    return True
+
+async def _slack_reply(response_url: str, text: str) -> None:
+    body = orjson.dumps({"replace_original": False, "response_type": "ephemeral", "text": text})
+    await HTTP.post(response_url, timeout=5, content=body, headers={"Content-Type": "application/json"})
+
+def _state_changed(which: str, *ids: str) -> None:
+    # debounced: the store's flusher thread rewrites only these shards ("inc"/"res" ids, or "app")
+    mark_dirty(which, *ids)
+
+def _try_flush_state():
     try:
-        save_state()
+        flush_state()
     except Exception as e:
-        log.warning("save_state failed: %s", e)
+        log.warning("flush_state failed: %s", e)
+
+# Last known KB size, mirrored into KB_DOCS_GAUGE (read back here, never from the gauge)
+_KB_DOCS = 0
+
+def _set_kb_docs(n: int) -> None:
+    global _KB_DOCS
+    _KB_DOCS = n
+    KB_DOCS_GAUGE.set(n)
+
+def _add_kb_docs(delta: int) -> None:
+    global _KB_DOCS
+    _KB_DOCS += delta
+    KB_DOCS_GAUGE.inc(delta)
+
+KB_COUNT_TTL_S = 5.0
+_KB_COUNT_CACHE = (0, float("-inf"))  # (count, monotonic ts)
 
 def kb_count() -> int:
+    """Doc count from the process-wide RAG collection, at most one Chroma count() per KB_COUNT_TTL_S."""
+    global _KB_COUNT_CACHE
+    count, ts = _KB_COUNT_CACHE
+    now = time.monotonic()
+    if now - ts <= KB_COUNT_TTL_S:
+        return count
     try:
         if chromadb is None:
-            KB_DOCS_GAUGE.set(0)
+            _set_kb_docs(0)
             return 0
-        client = chromadb.PersistentClient(path=VECTOR_DB_DIR)
-        col = client.get_or_create_collection(
-            name=COLLECTION_NAME, metadata={"hnsw:space": "cosine"}
-        )
-        count = col.count()
-        KB_DOCS_GAUGE.set(count)
+        count = kb_stats()["count"]
+        _set_kb_docs(count)
+        _KB_COUNT_CACHE = (count, now)
         return count
     except Exception as e:
         log.warning("KB count failed: %s", e)
+        _KB_COUNT_CACHE = (0, now)  # don't retry a broken store on every call
         return 0
 
+def _kb_docs() -> int:
+    """Last known KB size (kept current by mutations + the background refresher)."""
+    return _KB_DOCS
+
+async def _kb_gauge_refresher() -> None:
+    # authoritative reconcile; per-request inc/dec can drift on upsert-of-existing
+    while True:
+        await anyio.sleep(KB_GAUGE_REFRESH_S)
+        await anyio.to_thread.run_sync(kb_count)
+
+@lru_cache(maxsize=10_000)
+def _parse_iso(x: str) -> datetime:
+    s = x.strip()
+    if s.endswith("Z"): s = s[:-1] + "+00:00"
+    try: return datetime.fromisoformat(s)
+    except Exception: return datetime.min
+
 def _as_dt(x: Any) -> datetime:
     if isinstance(x, datetime): return x
-    if isinstance(x, str):
-        s = x.strip()
-        if s.endswith("Z"): s = s[:-1] + "+00:00"
-        try: return datetime.fromisoformat(s)
-        except Exception: return datetime.min
+    if isinstance(x, str): return _parse_iso(x)
     return datetime.min
 
-def _created_at_of(obj: Any) -> datetime:
-    if isinstance(obj, dict): return _as_dt(obj.get("created_at"))
-    if hasattr(obj, "created_at"): return _as_dt(getattr(obj, "created_at"))
-    return datetime.min
+@lru_cache(maxsize=None)
+def _accessor(typ: type, name: str) -> Callable[[Any], Any]:
+    """C-level getter for one field of one type (None when absent), chosen once."""
+    if issubclass(typ, dict):
+        return methodcaller("get", name)
+    if name in (getattr(typ, "model_fields", None) or {}):
+        return attrgetter(name)  # declared pydantic field: always present
+    return lambda o: getattr(o, name, None)
 
 def _field_of(obj: Any, name: str) -> Any:
-    if isinstance(obj, dict): return obj.get(name)
-    return getattr(obj, name, None)
+    return _accessor(type(obj), name)(obj)
+
+def _created_at_of(obj: Any) -> datetime:
+    return _as_dt(_accessor(type(obj), "created_at")(obj))
+
+@lru_cache(maxsize=None)
+def _serializer_for(typ: type) -> Callable[[Any], Dict[str, Any]]:
+    """Pick the dump strategy once per type instead of probing every object.
+    datetimes are left as-is; ORJSONResponse/jsonable_encoder render them as ISO-8601."""
+    if issubclass(typ, dict):
+        return dict
+    if hasattr(typ, "model_dump"):
+        return typ.model_dump
+    if hasattr(typ, "dict"):
+        return typ.dict
+    return lambda o: dict(getattr(o, "__dict__", {}))
 
 def _to_jsonable(obj: Any) -> Dict[str, Any]:
-    if isinstance(obj, dict):
-        d = dict(obj)
-    elif hasattr(obj, "model_dump"):
-        d = obj.model_dump()
-    elif hasattr(obj, "dict"):
-        d = obj.dict()
-    else:
-        d = getattr(obj, "__dict__", {})
-    ca = d.get("created_at")
-    if isinstance(ca, datetime):
-        d["created_at"] = ca.isoformat()
-    return d
+    return _serializer_for(type(obj))(obj)
+
+# id -> (incident object, encoded body). Incidents are not mutated after detect(),
+# so an entry stays valid while INCIDENTS still holds the same object.
+_JSON_CACHE: Dict[str, Tuple[Any, bytes]] = {}
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY  # what ORJSONResponse uses
+
+def _incident_json(iid: str, inc: Any) -> bytes:
+    hit = _JSON_CACHE.get(iid)
+    if hit is not None and hit[0] is inc:
+        return hit[1]
+    body = orjson.dumps(_to_jsonable(inc), option=_ORJSON_OPTS)
+    _JSON_CACHE[iid] = (inc, body)
+    return body
+
+# ---------------------------- Incident search index ---------------------------
+# Secondary indexes over INCIDENTS, maintained at detect()/load time; search
+# rebuilds them if INCIDENTS was changed behind their back.
+INCIDENTS_BY_SERVICE: Dict[str, Set[str]] = {}
+INCIDENTS_BY_SEVERITY: Dict[str, Set[str]] = {}
+_INC_BY_CREATED: List[Tuple[datetime, int, str]] = []   # ascending (created_at, insertion seq, id)
+_INC_ROW: Dict[str, int] = {}                            # id -> row in the text columns below
+# text columns for q search, one lowercased list per field (row == insertion seq);
+# each column is packed lazily into one NUL-joined UTF-8 blob so a search is a
+# few bytes.find calls (C memchr/two-way scan) instead of a per-row loop
+_COL_IDS: List[str] = []
+_COL_TEXT: Tuple[List[str], List[str], List[str]] = ([], [], [])  # id, service, cause
+_COL_BLOB: Optional[List[Tuple[bytes, List[int]]]] = None      # (blob, row start offsets)
+_COL_SEP = b"\0"
+_inc_seq = 0
+# detect() runs in worker threads (anyio.to_thread) and sync routes search/reindex
+# concurrently: every index mutation and read, plus INCIDENTS inserts, hold this
+# (re-entrant: _reindex_incidents -> _index_incident)
+_INDEX_LOCK = threading.RLock()
+
+def _index_incident(iid: str, inc: Any) -> None:
+    global _inc_seq, _COL_BLOB
+    svc = _field_of(inc, "service")
+    with _INDEX_LOCK:
+        INCIDENTS_BY_SERVICE.setdefault(str(svc or "").lower(), set()).add(iid)
+        INCIDENTS_BY_SEVERITY.setdefault(str(_field_of(inc, "severity") or "").upper(), set()).add(iid)
+        bisect.insort(_INC_BY_CREATED, (_created_at_of(inc), _inc_seq, iid))
+        _INC_ROW[iid] = _inc_seq
+        _inc_seq += 1
+        _COL_IDS.append(iid)
+        sid_col, svc_col, cause_col = _COL_TEXT
+        sid_col.append(str(_field_of(inc, "id") or "").lower())
+        svc_col.append(str(svc or "").lower())
+        cause_col.append(str(_field_of(inc, "suspected_cause") or "").lower())
+        _COL_BLOB = None
+
+def _reindex_incidents() -> None:
+    global _inc_seq, _COL_BLOB
+    with _INDEX_LOCK:
+        INCIDENTS_BY_SERVICE.clear()
+        INCIDENTS_BY_SEVERITY.clear()
+        _INC_BY_CREATED.clear()
+        _INC_ROW.clear()
+        _COL_IDS.clear()
+        for col in _COL_TEXT:
+            col.clear()
+        _COL_BLOB = None
+        _inc_seq = 0
+        for gone in _JSON_CACHE.keys() - INCIDENTS.keys():
+            del _JSON_CACHE[gone]
+        for iid, inc in INCIDENTS.items():
+            _index_incident(iid, inc)
+
+def _ensure_incident_index() -> None:
+    with _INDEX_LOCK:
+        if _INC_ROW.keys() != INCIDENTS.keys():  # C-level set compare; cheap next to a scan
+            _reindex_incidents()
+
+def _pack_column(col: List[str]) -> Tuple[bytes, List[int]]:
+    parts = [v.encode("utf-8") for v in col]
+    starts, pos = [], 0
+    for b in parts:
+        starts.append(pos)
+        pos += len(b) + 1
+    return _COL_SEP.join(parts), starts
+
+def _text_matches(ql: str) -> Set[str]:
+    """Ids whose lowercased id, service or cause contains ql."""
+    global _COL_BLOB
+    qb = ql.encode("utf-8")  # UTF-8 substring match == str substring match
+    with _INDEX_LOCK:
+        if not _COL_IDS:
+            return set()
+        if _COL_SEP in qb:
+            return {_COL_IDS[r] for col in _COL_TEXT for r, v in enumerate(col) if ql in v}
+        if _COL_BLOB is None:
+            _COL_BLOB = [_pack_column(col) for col in _COL_TEXT]
+        rows: Set[int] = set()
+        n = len(_COL_IDS)
+        for blob, starts in _COL_BLOB:
+            i = blob.find(qb)
+            while i >= 0:
+                r = bisect.bisect_right(starts, i) - 1
+                rows.add(r)
+                if r + 1 >= n:
+                    break
+                i = blob.find(qb, starts[r + 1])  # at most one hit per row
+        return {_COL_IDS[r] for r in rows}
+
+def _ids_by_created(newest_first: bool) -> Iterator[str]:
+    # ties keep insertion order in both directions (same as a stable sort)
+    if not newest_first:
+        return (iid for _, _, iid in _INC_BY_CREATED)
+    return (iid for _, grp in groupby(reversed(_INC_BY_CREATED), key=lambda t: t[0])
+            for _, _, iid in reversed(list(grp)))
 
 def _as_plain_signal(s: Any) -> Dict[str, Any]:
     if isinstance(s, dict): return s
@@ -174,7 +409,7 @@ def _as_plain_signal(s: Any) -> Dict[str, Any]:
     }
 
 # -------------------------------- KB endpoints -------------------------------
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 class KBTextIn(BaseModel):
     title: str
@@ -188,55 +423,125 @@ class KBUrlIn(BaseModel):
     title: Optional[str] = None
     service: Optional[str] = None
 
+# Validators compiled once and fed raw bytes (validate_json), skipping the
+# json.loads -> dict -> model round trip FastAPI does for declared bodies.
+DETECT_ADAPTER = TypeAdapter(DetectRequest)
+KB_TEXT_ADAPTER = TypeAdapter(KBTextIn)
+KB_URL_ADAPTER = TypeAdapter(KBUrlIn)
+
+def _json_body(model: type) -> Dict[str, Any]:
+    # keep the request schema in OpenAPI for routes that read the body themselves
+    return {"requestBody": {"required": True, "content": {
+        "application/json": {"schema": model.model_json_schema()}}}}
+
+async def _parse_body(adapter: TypeAdapter, request: Request) -> Any:
+    try:
+        return adapter.validate_json(await request.body())
+    except ValidationError as e:
+        # same error shape FastAPI produces for declared bodies
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)])
+
+def _kb_changed() -> None:
+    # evidence cached by the pipeline may no longer match the KB
+    from .pipeline import clear_evidence_cache
+    clear_evidence_cache()
+
 @app.get("/kb/stats", dependencies=[KB])   # gate stats too; relax if you want it open
-def kb_stats_route():
-    s = kb_stats()
-    KB_DOCS_GAUGE.set(s["count"])
+async def kb_stats_route():
+    s = await anyio.to_thread.run_sync(kb_stats)
+    _set_kb_docs(s["count"])
     return s
 
 @app.get("/kb/docs", dependencies=[KB])
-def kb_list(limit: int = 50, offset: int = 0):
-    return list_docs(limit=limit, offset=offset)
-
-@app.post("/kb/ingest/text", dependencies=[KB])
-def kb_ingest_text(payload: KBTextIn):
-    out = add_text_doc(
+async def kb_list(limit: int = 50, offset: int = 0):
+    return await anyio.to_thread.run_sync(partial(list_docs, limit=limit, offset=offset))
+
+@app.post("/kb/ingest/text", dependencies=[KB], openapi_extra=_json_body(KBTextIn))
+async def kb_ingest_text(request: Request):
+    payload = await _parse_body(KB_TEXT_ADAPTER, request)
+    out = await anyio.to_thread.run_sync(partial(
+        add_text_doc,
         title=payload.title,
         text=payload.text,
         service=payload.service,
         uri=payload.uri,
         tags=payload.tags,
-    )
-    KB_DOCS_GAUGE.set(kb_stats()["count"])
+    ))
+    _add_kb_docs(int(out["created"]))
+    _kb_changed()
     return out
 
-@app.post("/kb/ingest/url", dependencies=[KB])
-def kb_ingest_url(payload: KBUrlIn):
-    out = add_url_doc(
-        url=payload.url,
-        title=payload.title,
+@app.post("/kb/ingest/bulk", dependencies=[KB])
+async def kb_ingest_bulk(payload: List[KBTextIn]):
+    out = await anyio.to_thread.run_sync(add_text_docs, [p.model_dump() for p in payload])
+    _add_kb_docs(sum(o["created"] for o in out))
+    _kb_changed()
+    return {"ingested": len(out), "items": out}
+
+@app.post("/kb/ingest/url", dependencies=[KB], openapi_extra=_json_body(KBUrlIn))
+async def kb_ingest_url(request: Request):
+    payload = await _parse_body(KB_URL_ADAPTER, request)
+    # fetch on the event loop (pooled client); only the Chroma write goes to a thread
+    try:
+        content = await fetch_text_async(HTTP, payload.url)
+    except ValueError as e:  # oversized or non-text page
+        raise HTTPException(400, str(e))
+    except (httpx.InvalidURL, httpx.UnsupportedProtocol) as e:
+        raise HTTPException(400, f"Invalid URL: {e}")
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(502, f"Fetching {payload.url} returned HTTP {e.response.status_code}")
+    except httpx.HTTPError as e:  # connect/read errors, timeouts, redirect loops
+        raise HTTPException(502, f"Fetching {payload.url} failed: {e!r}")
+    out = await anyio.to_thread.run_sync(partial(
+        add_text_doc,
+        payload.title or payload.url,
+        content,
         service=payload.service,
-    )
-    KB_DOCS_GAUGE.set(kb_stats()["count"])
+        uri=payload.url,
+        tags=["url"],
+    ))
+    _add_kb_docs(int(out["created"]))
+    _kb_changed()
     return out
 
 @app.delete("/kb/docs/{doc_id}", dependencies=[KB])
-def kb_delete(doc_id: str):
-    out = delete_doc(doc_id)
-    KB_DOCS_GAUGE.set(kb_stats()["count"])
+async def kb_delete(doc_id: str):
+    out = await anyio.to_thread.run_sync(delete_doc, doc_id)
+    if out["deleted"]:
+        _add_kb_docs(-len(out["deleted"]))
+        _kb_changed()
     return out
 
 # --------------------------------- Lifecycle ---------------------------------
 @app.on_event("startup")
-def on_startup():
-    load_state()
+async def on_startup():
+    global _kb_refresher
+    await aload_state()
+    _reindex_incidents()
+    try:
+        _get_collection()  # prime the shared client + embedding model off the first request
+    except Exception as e:
+        log.warning("KB collection warm-up failed: %s", e)
     count = kb_count()
     if count < KB_MIN_DOCS:
         log.warning("[WARN] KB has %s docs (< KB_MIN_DOCS=%s). Seed it.", count, KB_MIN_DOCS)
+    _kb_refresher = asyncio.create_task(_kb_gauge_refresher())
+    validator.start_refresher()  # metrics CSV is parsed off the request path from here on
+    slack_batcher.start()
 
 @app.on_event("shutdown")
-def on_shutdown():
-    _try_save_state()
+async def on_shutdown():
+    if _kb_refresher is not None:
+        _kb_refresher.cancel()
+    validator.stop_refresher()
+    if _NOTIFY_TASKS:
+        await asyncio.wait(list(_NOTIFY_TASKS), timeout=5)  # let queued Slack replies go out
+    _try_flush_state()  # write out anything the flusher has not picked up yet
+    await HTTP.aclose()
+    await slack_batcher.stop()  # flush batched alerts while the Slack client is still open
+    await aclose_clients()
+    if _PDF_POOL is not None:
+        _PDF_POOL.shutdown(wait=False, cancel_futures=True)
 
 # -------------------------------- Basic routes -------------------------------
 @app.get("/", response_class=HTMLResponse)
@@ -248,11 +553,10 @@ def root():
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "kb_docs": kb_count()}
+    return {"status": "ok", "kb_docs": _kb_docs()}
 
 # --------------------------------- Incidents ---------------------------------
-@app.post("/incidents/detect", dependencies=[RUN])
-def detect(req: DetectRequest):
+def _create_incident(req: DetectRequest, background: BackgroundTasks) -> Dict[str, Any]:
     try:
         raw_signals = req.signals or []
         if not isinstance(raw_signals, list):
@@ -261,12 +565,15 @@ def detect(req: DetectRequest):
         plain_signals = [_as_plain_signal(s) for s in raw_signals]
         signals = normalize(plain_signals)
         severity = infer_severity(signals)
-        incident = Incident(service=req.service, severity=severity, suspected_cause=req.suspected_cause)
+        # req was validated at the boundary and severity comes from infer_severity
+        incident = Incident.model_construct(service=req.service, severity=severity, suspected_cause=req.suspected_cause)
 
-        INCIDENTS[incident.id] = incident
+        with _INDEX_LOCK:
+            INCIDENTS[incident.id] = incident
+            _index_incident(incident.id, incident)
         write_event("detect", {"incident_id": incident.id, "service": incident.service, "severity": incident.severity})
         INCIDENTS_TOTAL.inc()
-        _try_save_state()
+        _state_changed("inc", incident.id)
 
         blocks = [
             {"type": "section", "text": {"type": "mrkdwn",
@@ -278,10 +585,7 @@ def detect(req: DetectRequest):
                  "action_id": "run", "value": incident.id},
             ]},
         ]
-        try:
-            anyio.create_task_group().start_soon(notify_slack_blocks, "Incident created", blocks)
-        except Exception:
-            pass
+        background.add_task(_notify_quietly, slack_batcher.enqueue, "Incident created", blocks)
 
         return _to_jsonable(incident)
     except HTTPException:
@@ -290,8 +594,13 @@ def detect(req: DetectRequest):
         write_event("detect_error", {"error": str(e)})
         raise HTTPException(500, f"detect failed: {e}")
 
+@app.post("/incidents/detect", dependencies=[RUN], openapi_extra=_json_body(DetectRequest))
+async def detect(request: Request, background: BackgroundTasks):
+    req = await _parse_body(DETECT_ADAPTER, request)
+    return await anyio.to_thread.run_sync(_create_incident, req, background)
+
 @app.post("/incidents/{incident_id}/execute", dependencies=[EXEC])
-def execute_selected_plan(
+async def execute_selected_plan(
     incident_id: str,
     plan_id: Optional[str] = None,
     dry_run: bool = True,
@@ -318,18 +627,23 @@ def execute_selected_plan(
         raise HTTPException(404, "Plan not found for this incident")
 
     approved = bool(APPROVALS.get(incident_id, False))
-    exec_result = execute_plan(inc, plan, approved=approved, dry_run=dry_run)
+    exec_result = await execute_plan(inc, plan, approved=approved, dry_run=dry_run)
 
     res.setdefault("executions", []).append(exec_result)
     RESULTS[incident_id] = res
     EXECUTIONS_TOTAL.inc()
-    _try_save_state()
+    _state_changed("res", incident_id)
 
     return exec_result
 
 @app.get("/incidents", dependencies=[RUN])
 def list_incidents():
-    return [_to_jsonable(i) for i in INCIDENTS.values()]
+    # dashboards poll this; splice per-incident bodies cached at first encode
+    with _INDEX_LOCK:
+        _ensure_incident_index()
+        pairs = list(INCIDENTS.items())
+    body = b"[" + b",".join([_incident_json(iid, inc) for iid, inc in pairs]) + b"]"
+    return Response(content=body, media_type="application/json")
 
 @app.get("/incidents/{incident_id}/candidates", dependencies=[RUN])
 def get_candidates(incident_id: str):
@@ -358,7 +672,7 @@ def choose_plan(incident_id: str, plan_id: str):
     if not any(c.get("id") == plan_id for c in cands):
         raise HTTPException(404, "Plan not found for this incident")
     res["chosen_plan_id"] = plan_id
-    _try_save_state()
+    _state_changed("res", incident_id)
     return {"incident_id": incident_id, "chosen_plan_id": plan_id}
 
 @app.post("/incidents/{incident_id}/approve", dependencies=[RUN])
@@ -368,20 +682,20 @@ def approve_incident(incident_id: str, approved: bool = True):
     APPROVALS[incident_id] = approved
     write_event("approve", {"incident_id": incident_id, "approved": approved})
     APPROVALS_TOTAL.inc()
-    _try_save_state()
+    _state_changed("app")
     return {"incident_id": incident_id, "approved": approved}
 
 @app.post("/incidents/{incident_id}/run", dependencies=[RUN])
-def run_pipeline_endpoint(incident_id: str):
+async def run_pipeline_endpoint(incident_id: str):
     from .pipeline import run_all
     incident = INCIDENTS.get(incident_id)
     if not incident:
         raise HTTPException(404, "Incident not found")
-    result = run_all(incident)
+    result = await run_all(incident)
     RESULTS[incident.id] = result
     write_event("run", {"incident_id": incident.id, "approved": bool(APPROVALS.get(incident_id, False))})
     PIPELINE_RUNS_TOTAL.inc()
-    _try_save_state()
+    _state_changed("res", incident.id)
     return {"message": "Pipeline finished", "incident_id": incident.id, "approved": bool(APPROVALS.get(incident_id, False))}
 
 @app.get("/incidents/{incident_id}/status", dependencies=[RUN])
@@ -422,26 +736,94 @@ def get_report_html(incident_id: str, request: Request):
     result = RESULTS.get(incident_id)
     if not result:
         raise HTTPException(400, "Run pipeline first: POST /incidents/{id}/run")
-    return render_report(request, incident, result)
+    # chunks go out as the template renders; no full HTML string in memory
+    return StreamingResponse(render_report_stream(incident, result), media_type="text/html; charset=utf-8")
+
+# --------------------------------- PDF pool ----------------------------------
+# reportlab holds the GIL for the whole render, so PDFs are built in worker
+# processes (spawned, not forked: the parent has live threads and sockets).
+PDF_WORKERS = settings.PDF_WORKERS or min(4, os.cpu_count() or 1)
+PDF_CACHE_MAX = 32
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_CACHE: "OrderedDict[bytes, bytes]" = OrderedDict()  # content hash -> pdf, LRU
+
+def _pdf_pool() -> ProcessPoolExecutor:
+    global _PDF_POOL
+    if _PDF_POOL is None:
+        _PDF_POOL = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=pdf_reporter.warm,
+        )
+    return _PDF_POOL
+
+async def _in_pdf_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    global _PDF_POOL
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_pdf_pool(), fn, *args)
+    except BrokenProcessPool:
+        # a worker died (OOM, killed); drop the pool so the next request respawns it
+        _PDF_POOL = None
+        log.warning("PDF worker pool broke; rendering in-process")
+        return await anyio.to_thread.run_sync(fn, *args)
+
+async def _render_pdf(incident: Any, result: Any) -> bytes:
+    # the pickle is needed to ship the job anyway; its digest doubles as the cache key
+    key = hashlib.blake2b(pickle.dumps((incident, result)), digest_size=16).digest()
+    pdf = _PDF_CACHE.get(key)
+    if pdf is not None:
+        _PDF_CACHE.move_to_end(key)
+        return pdf
+    pdf = await _in_pdf_pool(pdf_reporter.build_pdf, incident, result)
+    _PDF_CACHE[key] = pdf
+    if len(_PDF_CACHE) > PDF_CACHE_MAX:
+        _PDF_CACHE.popitem(last=False)
+    return pdf
 
 @app.get("/incidents/{incident_id}/report.pdf", dependencies=[RUN])
-def get_report_pdf(incident_id: str):
+async def get_report_pdf(incident_id: str):
     incident = INCIDENTS.get(incident_id)
     if not incident:
         raise HTTPException(404, "Incident not found")
     result = RESULTS.get(incident_id)
     if not result:
         raise HTTPException(400, "Run pipeline first: POST /incidents/{id}/run")
-    pdf = build_pdf(incident, result)
+    pdf = await _render_pdf(incident, result)
     return Response(content=pdf, media_type="application/pdf",
                     headers={"Content-Disposition": f'inline; filename="incident_{incident_id}.pdf"'})
 
+PDF_BUNDLE_MAX = 50
+
+@app.get("/reports/incidents.pdf", dependencies=[RUN])
+async def get_reports_bundle_pdf(ids: str):
+    """Several incident reports as one PDF (comma-separated ids), rendered in a single
+    build pass; X-Report-Pages maps each id to its first-last page."""
+    wanted = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if not wanted:
+        raise HTTPException(400, "ids is required")
+    if len(wanted) > PDF_BUNDLE_MAX:
+        raise HTTPException(400, f"At most {PDF_BUNDLE_MAX} incidents per bundle")
+    pairs = []
+    for iid in wanted:
+        incident = INCIDENTS.get(iid)
+        if not incident:
+            raise HTTPException(404, f"Incident not found: {iid}")
+        result = RESULTS.get(iid)
+        if not result:
+            raise HTTPException(400, f"Run pipeline first: POST /incidents/{iid}/run")
+        pairs.append((incident, result))
+    pdf, pages = await _in_pdf_pool(pdf_reporter.build_pdf_bundle, pairs)
+    return Response(content=pdf, media_type="application/pdf", headers={
+        "Content-Disposition": 'inline; filename="incidents.pdf"',
+        "X-Report-Pages": ",".join(f"{k}={a}-{b}" for k, (a, b) in pages.items()),
+    })
+
 # --------------------------- System / diagnostics ----------------------------
 @app.get("/status")
 def status():
     return {
         "uptime_seconds": int(time.time() - started_at),
-        "kb_docs": kb_count(),
+        "kb_docs": _kb_docs(),
         "incidents_count": len(INCIDENTS),
         "results_count": len(RESULTS),
         "approvals_count": len([k for k, v in APPROVALS.items() if v]),
@@ -450,15 +832,24 @@ def status():
 
 @app.get("/metrics", dependencies=[ADM])
 def metrics():
-    KB_DOCS_GAUGE.set(kb_count())
     return Response(content=generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
 
+@app.post("/cache/clear", dependencies=[ADM])
+def cache_clear():
+    from .pipeline import clear_evidence_cache
+    return {"evidence_cleared": clear_evidence_cache()}
+
+@app.get("/cache/stats", dependencies=[ADM])
+def cache_stats():
+    return {"results": RESULTS.stats()}
+
 @app.get("/audit/tail", dependencies=[AUD])
 def audit_tail(n: int = 50):
     try:
-        lines = AUDIT_FILE.read_text(encoding="utf-8").splitlines()
         n = max(1, min(n, 1000))
-        return lines[-n:]
+        if AUDIT_FORMAT == "msgpack":
+            return ORJSONResponse([orjson.dumps(r).decode("utf-8") for r in read_records()[-n:]])
+        return ORJSONResponse(tail_lines(n))
     except Exception:
         return []
 
@@ -470,14 +861,42 @@ async def audit_stream(request: Request):
     AUDIT_FILE.parent.mkdir(parents=True, exist_ok=True)
 
     async def _gen():
-        with AUDIT_FILE.open("a+", encoding="utf-8") as f:
-            f.seek(0, os.SEEK_END)
-            while True:
-                line = f.readline()
-                if not line:
-                    await anyio.sleep(0.5)
-                    continue
-                yield f"data: {line.rstrip()}\n\n"
+        # woken by the in-process audit writer; the timeout still picks up
+        # lines appended by other processes (scripts, other workers)
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+        def _wake() -> None:
+            loop.call_soon_threadsafe(changed.set)
+        async def _wait() -> None:
+            with anyio.move_on_after(AUDIT_STREAM_POLL_S):
+                await changed.wait()
+            changed.clear()
+
+        add_listener(_wake)
+        try:
+            if AUDIT_FORMAT == "msgpack":
+                # binary records: decode each one and send it as JSON, like /audit/tail
+                unpacker = record_unpacker()
+                with AUDIT_FILE.open("a+b") as f:
+                    f.seek(0, os.SEEK_END)
+                    while True:
+                        chunk = f.read(AUDIT_STREAM_CHUNK)
+                        if not chunk:
+                            await _wait()
+                            continue
+                        unpacker.feed(chunk)
+                        for rec in unpacker:
+                            yield f"data: {orjson.dumps(rec).decode('utf-8')}\n\n"
+            with AUDIT_FILE.open("a+", encoding="utf-8") as f:
+                f.seek(0, os.SEEK_END)
+                while True:
+                    line = f.readline()
+                    if not line:
+                        await _wait()
+                        continue
+                    yield f"data: {line.rstrip()}\n\n"
+        finally:
+            remove_listener(_wake)
 
     return StreamingResponse(_gen(), media_type="text/event-stream")
 
@@ -491,7 +910,7 @@ def liveness():
 
 @app.get("/readiness")
 def readiness():
-    return {"status": "ready", "kb_docs": kb_count(), "uptime": int(time.time() - started_at)}
+    return {"status": "ready", "kb_docs": _kb_docs(), "uptime": int(time.time() - started_at)}
 
 # ---------------------- Search (robust across types) -------------------------
 @app.get("/incidents/search", dependencies=[RUN])
@@ -503,47 +922,57 @@ def search_incidents(
     limit: int = 50,
     offset: int = 0,
 ):
-    items: List[Any] = list(INCIDENTS.values())
-
-    ql = q.lower().strip()
-    if ql:
-        def _match(i: Any) -> bool:
-            sid = str(_field_of(i, "id") or "").lower()
-            svc = str(_field_of(i, "service") or "").lower()
-            cause = str(_field_of(i, "suspected_cause") or "").lower()
-            return (ql in sid) or (ql in svc) or (cause.find(ql) >= 0)
-        items = [i for i in items if _match(i)]
-
-    if service:
-        s = service.lower()
-        items = [i for i in items if str(_field_of(i, "service") or "").lower() == s]
-
-    if severity:
-        sv = severity.upper()
-        items = [i for i in items if str(_field_of(i, "severity") or "").upper() == sv]
-
     reverse = sort.startswith("-")
     field = sort.lstrip("+-").strip() or "created_at"
+    limit = max(0, min(limit, 200))
+    ql = q.lower().strip()
+
+    # the index is only read under _INDEX_LOCK; encoding and sorting happen outside it
+    with _INDEX_LOCK:
+        _ensure_incident_index()
+
+        # service/severity filters are index intersections; None means "all incidents"
+        cand: Optional[Set[str]] = None
+        if service:
+            cand = INCIDENTS_BY_SERVICE.get(service.lower(), set())
+        if severity:
+            sev_ids = INCIDENTS_BY_SEVERITY.get(severity.upper(), set())
+            cand = sev_ids if cand is None else cand & sev_ids
+
+        if ql:
+            hits = _text_matches(ql)
+            cand = hits if cand is None else cand & hits
+        def _keep(iid: str) -> bool:
+            return cand is None or iid in cand
+
+        if field == "created_at":
+            # index is already ordered: no sort, and the total is a set size
+            ids = (iid for iid in _ids_by_created(reverse) if _keep(iid))
+            total = len(INCIDENTS) if cand is None else len(cand)
+            page_ids = list(islice(ids, max(0, offset), max(0, offset) + limit))
+            page = [INCIDENTS[i] for i in page_ids]
+        else:
+            items: List[Any] = [inc for iid, inc in INCIDENTS.items() if _keep(iid)]
 
     if field == "created_at":
-        items.sort(key=_created_at_of, reverse=reverse)
-    elif field == "severity":
+        return ORJSONResponse({"total": total, "limit": limit, "offset": offset, "items": [_to_jsonable(x) for x in page]})
+
+    if field == "severity":
         order = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
-        items.sort(key=lambda x: order.get(str(_field_of(x, "severity") or "").upper(), 99), reverse=reverse)
+        items.sort(key=lambda x: order.get(str(_accessor(type(x), "severity")(x) or "").upper(), 99), reverse=reverse)
     else:
         def _key(o):
-            v = _field_of(o, field)
+            v = _accessor(type(o), field)(o)
             return (v is None, v)
         items.sort(key=_key, reverse=reverse)
 
     total = len(items)
-    limit = max(0, min(limit, 200))
     page = items[offset: offset + limit]
-    return {"total": total, "limit": limit, "offset": offset, "items": [_to_jsonable(x) for x in page]}
+    return ORJSONResponse({"total": total, "limit": limit, "offset": offset, "items": [_to_jsonable(x) for x in page]})
 
 # ----------------------------- Demo + Integrations ---------------------------
 @app.post("/demo/simulate", dependencies=[RUN])
-def demo_simulate():
+def demo_simulate(background: BackgroundTasks):
     req = DetectRequest(
         service="checkout",
         suspected_cause="bad deploy",
@@ -552,11 +981,12 @@ def demo_simulate():
             {"name": "latency_p95_ms", "value": 1200, "unit": "ms", "window_s": 60},
         ],
     )
-    return detect(req)
+    return _create_incident(req, background)
 
 @app.post("/incidents/{incident_id}/jira", dependencies=[RUN])
 async def open_jira(
     incident_id: str,
+    background: BackgroundTasks,
     summary: str | None = Body(default=None),
     description: str | None = Body(default=None),
 ):
@@ -580,27 +1010,39 @@ async def open_jira(
 
     entry = RESULTS.setdefault(incident_id, {})
     entry["jira"] = issue
-    _try_save_state()
+    _state_changed("res", incident_id)
 
-    try:
-        await notify_slack(f"📮 JIRA created for incident {incident_id}: {issue.get('key', '?')}")
-    except Exception:
-        pass
+    background.add_task(_notify_quietly, slack_batcher.enqueue, f"📮 JIRA created for incident {incident_id}: {issue.get('key', '?')}")
 
     return {"incident_id": incident_id, "jira": issue}
 
 # ----------------------------- Slack interactive ----------------------------
+# keyed HMAC state built once; per request we only copy() it and feed the body
+_SLACK_MAC = hmac.new(SLACK_SIGNING_SECRET.encode("utf-8"), digestmod=hashlib.sha256) if SLACK_SIGNING_SECRET else None
+
 def _verify_slack_sig(signing_secret: str, body: bytes, ts: str, sig: str) -> bool:
     try:
-        basestring = f"v0:{ts}:{body.decode('utf-8')}"
-        digest = hmac.new(signing_secret.encode("utf-8"), basestring.encode("utf-8"), hashlib.sha256).hexdigest()
+        # stale/replayed requests are rejected before any hashing
         if abs(time.time() - int(ts)) > 300:
             return False
-        expected = f"v0={digest}"
-        return hmac.compare_digest(expected, sig)
+        if _SLACK_MAC is not None and signing_secret == SLACK_SIGNING_SECRET:
+            mac = _SLACK_MAC.copy()
+        else:
+            mac = hmac.new(signing_secret.encode("utf-8"), digestmod=hashlib.sha256)
+        mac.update(b"v0:" + ts.encode("ascii") + b":")
+        mac.update(body)
+        return hmac.compare_digest("v0=" + mac.hexdigest(), sig)
     except Exception:
         return False
 
+def _form_field(raw: bytes, name: bytes) -> Optional[bytes]:
+    """Value of one field of an x-www-form-urlencoded body, without building the parse_qs dict."""
+    for part in raw.split(b"&"):
+        key, sep, val = part.partition(b"=")
+        if sep and key == name:
+            return urllib.parse.unquote_to_bytes(val.replace(b"+", b" "))
+    return None
+
 @app.post("/slack/actions")
 async def slack_actions(request: Request):
     raw = await request.body()
@@ -611,9 +1053,7 @@ async def slack_actions(request: Request):
         if not _verify_slack_sig(SLACK_SIGNING_SECRET, raw, ts, sig):
             raise HTTPException(401, "Invalid Slack signature")
 
-    form = urllib.parse.parse_qs(raw.decode("utf-8"))
-    payload_json = (form.get("payload") or ["{}"])[0]
-    payload = json.loads(payload_json)
+    payload = orjson.loads(_form_field(raw, b"payload") or b"{}")
     actions = payload.get("actions") or []
     if not actions:
         return {"ok": True}
@@ -629,17 +1069,9 @@ async def slack_actions(request: Request):
     if action_id == "approve":
         APPROVALS[incident_id] = True
         APPROVALS_TOTAL.inc()
-        _try_save_state()
-        try:
-            if response_url:
-                async with httpx.AsyncClient(timeout=5) as c:
-                    await c.post(response_url, json={
-                        "replace_original": False,
-                        "response_type": "ephemeral",
-                        "text": f"✅ Approved incident `{incident_id}`."
-                    })
-        except Exception:
-            pass
+        _state_changed("app")
+        if response_url:
+            _notify_later((incident_id, "approved"), _slack_reply, response_url, f"✅ Approved incident `{incident_id}`.")
         return {"ok": True}
 
     if action_id == "run":
@@ -649,33 +1081,18 @@ async def slack_actions(request: Request):
             if not inc:
                 return
             try:
-                res = run_all(inc)
+                res = await run_all(inc)
                 RESULTS[incident_id] = res
                 PIPELINE_RUNS_TOTAL.inc()
-                _try_save_state()
-                try:
-                    if response_url:
-                        async with httpx.AsyncClient(timeout=5) as c:
-                            await c.post(response_url, json={
-                                "replace_original": False,
-                                "response_type": "ephemeral",
-                                "text": f"🏁 Pipeline finished for `{incident_id}`. Report: /incidents/{incident_id}/report.html"
-                            })
-                except Exception:
-                    pass
+                _state_changed("res", incident_id)
+                if response_url:
+                    _notify_later((incident_id, "run_done"), _slack_reply, response_url,
+                                  f"🏁 Pipeline finished for `{incident_id}`. Report: /incidents/{incident_id}/report.html")
             except Exception as e:
-                try:
-                    if response_url:
-                        async with httpx.AsyncClient(timeout=5) as c:
-                            await c.post(response_url, json={
-                                "replace_original": False,
-                                "response_type": "ephemeral",
-                                "text": f"❌ Pipeline error for `{incident_id}`: {e}"
-                            })
-                except Exception:
-                    pass
-
-        import asyncio
+                if response_url:
+                    _notify_later((incident_id, "run_error"), _slack_reply, response_url,
+                                  f"❌ Pipeline error for `{incident_id}`: {e}")
+
         asyncio.create_task(_bg())
         return {"ok": True, "message": "Pipeline started"}
 
@@ -685,10 +1102,10 @@ async def slack_actions(request: Request):
 def _latest_incident_id() -> str:
     if not INCIDENTS:
         raise HTTPException(404, "No incidents")
-    def _created(i):
-        v = getattr(i, "created_at", None) or (i.dict().get("created_at") if hasattr(i, "dict") else None)
-        return _as_dt(v)
-    return max(INCIDENTS.values(), key=_created).id
+    with _INDEX_LOCK:
+        _ensure_incident_index()
+        # newest created_at, earliest-inserted on ties (what max() over INCIDENTS returned)
+        return next(_ids_by_created(newest_first=True))
 
 @app.get("/incidents/latest", dependencies=[RUN])
 def latest_incident():
@@ -719,6 +1136,6 @@ def latest_report_html(request: Request):
     return get_report_html(iid, request)
 
 @app.get("/incidents/latest/report.pdf", dependencies=[RUN])
-def latest_report_pdf():
+async def latest_report_pdf():
     iid = _latest_incident_id()
-    return get_report_pdf(iid)
+    return await get_report_pdf(iid)
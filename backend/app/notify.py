@@ -1,25 +1,67 @@
 
-import json, httpx
+import asyncio
+import logging
+import httpx
+import orjson
+from typing import Any, Dict, List, Optional, Tuple
 from .config import SLACK_WEBHOOK_URL, JIRA_BASE_URL, JIRA_API_TOKEN, JIRA_PROJECT_KEY
 
+try:
+    import h2  # noqa: F401  (httpx only negotiates HTTP/2 when h2 is installed)
+    _HTTP2 = True
+except Exception:  # pragma: no cover
+    _HTTP2 = False
+
+log = logging.getLogger("incident-copilot")
+
+# One keep-alive pool per destination host (Slack webhook, Jira), created on first use
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+def get_client(name: str = "slack", timeout: float = 10.0, **kw) -> httpx.AsyncClient:
+    c = _clients.get(name)
+    if c is None or c.is_closed:
+        c = _clients[name] = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            timeout=httpx.Timeout(timeout),
+            http2=_HTTP2,
+            **kw,
+        )
+    return c
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+async def _post_json(client: httpx.AsyncClient, url: str, payload: Any) -> httpx.Response:
+    # body pre-encoded with orjson (httpx's json= goes through stdlib json)
+    return await client.post(url, content=orjson.dumps(payload), headers=_JSON_HEADERS)
+
+async def aclose_clients() -> None:
+    """Close the pooled clients (app shutdown)."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for c in clients:
+        await c.aclose()
+
 async def notify_slack(text: str):
     if not SLACK_WEBHOOK_URL: return False
-    async with httpx.AsyncClient(timeout=10) as c:
-        r = await c.post(SLACK_WEBHOOK_URL, json={"text": text})
-        return r.status_code in (200, 204)
+    r = await _post_json(get_client("slack"), SLACK_WEBHOOK_URL, {"text": text})
+    return r.status_code in (200, 204)
 
 # NEW: send blocks (for interactive buttons)
 async def notify_slack_blocks(text: str, blocks: list):
     if not SLACK_WEBHOOK_URL: return False
     payload = {"text": text, "blocks": blocks}
-    async with httpx.AsyncClient(timeout=10) as c:
-        r = await c.post(SLACK_WEBHOOK_URL, json=payload)
-        return r.status_code in (200, 204)
+    r = await _post_json(get_client("slack"), SLACK_WEBHOOK_URL, payload)
+    return r.status_code in (200, 204)
+
+def _jira_client() -> httpx.AsyncClient:
+    return get_client(
+        "jira", timeout=15.0,
+        base_url=JIRA_BASE_URL.rstrip("/"),
+        headers={"Authorization": f"Bearer {JIRA_API_TOKEN}"},
+    )
 
-async def create_jira_ticket(summary: str, description: str):
+async def create_jira_ticket(summary: str, description: str) -> Optional[dict]:
     if not (JIRA_BASE_URL and JIRA_API_TOKEN and JIRA_PROJECT_KEY): return None
-    url = f"{JIRA_BASE_URL.rstrip('/')}/rest/api/3/issue"
-    headers = {"Authorization": f"Bearer {JIRA_API_TOKEN}", "Content-Type":"application/json"}
     payload = {
         "fields": {
             "project": {"key": JIRA_PROJECT_KEY},
@@ -28,6 +70,98 @@ async def create_jira_ticket(summary: str, description: str):
             "issuetype": {"name": "Task"}
         }
     }
-    async with httpx.AsyncClient(timeout=15) as c:
-        r = await c.post(url, headers=headers, content=json.dumps(payload))
-        return r.json() if r.status_code < 300 else None
+    r = await _post_json(_jira_client(), "/rest/api/3/issue", payload)
+    return orjson.loads(r.content) if r.status_code < 300 else None
+
+# Incident storms: coalesce Slack alerts arriving within SLACK_BATCH_WINDOW_S into
+# one webhook POST (Slack caps a message at 50 blocks, so a full batch flushes early)
+SLACK_BATCH_WINDOW_S = 0.5
+SLACK_BATCH_MAX_BLOCKS = 50
+
+class SlackBatcher:
+    def __init__(self, window_s: float = SLACK_BATCH_WINDOW_S, max_blocks: int = SLACK_BATCH_MAX_BLOCKS):
+        self.window_s = window_s
+        self.max_blocks = max_blocks
+        self._q: Optional["asyncio.Queue[Tuple[str, List[dict]]]"] = None
+        self._task: Optional[asyncio.Task] = None
+        self._held: List[Tuple[str, List[dict]]] = []
+        self._sending: Optional[asyncio.Task] = None  # the batch POST in flight, if any
+
+    def start(self) -> None:
+        """Start the debounce loop on the running event loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._q = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def enqueue(self, text: str, blocks: Optional[list] = None, flush_now: bool = False) -> bool:
+        """Queue an alert for the next batched POST; flush_now sends it on its own right away."""
+        if flush_now:
+            return await (notify_slack_blocks(text, blocks) if blocks else notify_slack(text))
+        if not SLACK_WEBHOOK_URL: return False
+        self.start()
+        self._q.put_nowait((text, list(blocks or [{"type": "section", "text": {"type": "mrkdwn", "text": text}}])))
+        return True
+
+    async def _run(self) -> None:
+        q = self._q
+        loop = asyncio.get_running_loop()
+        while True:
+            # _held is what has been taken off the queue but not sent yet (flushed by stop())
+            if not self._held:
+                self._held.append(await q.get())
+            n = sum(len(b) for _, b in self._held)
+            deadline = loop.time() + self.window_s
+            carry = None
+            while n < self.max_blocks:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(q.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if n + len(item[1]) > self.max_blocks:
+                    carry = item  # opens the next batch
+                    break
+                self._held.append(item)
+                n += len(item[1])
+            batch, self._held = self._held, ([carry] if carry else [])
+            # shielded: cancelling the loop (stop()) must not abort a POST half-way
+            self._sending = asyncio.ensure_future(self._send(batch))
+            await asyncio.shield(self._sending)
+            self._sending = None
+
+    async def _send(self, batch: List[Tuple[str, List[dict]]]) -> None:
+        text = batch[0][0] if len(batch) == 1 else f"{len(batch)} incident notifications"
+        try:
+            await notify_slack_blocks(text, [b for _, blocks in batch for b in blocks])
+        except Exception as e:  # best-effort, like the per-incident sends it replaces
+            log.warning("Slack batch of %d alert(s) not delivered: %r", len(batch), e)
+
+    async def stop(self) -> None:
+        """Stop the loop and send whatever is still queued (app shutdown)."""
+        task, q = self._task, self._q
+        self._task = None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except BaseException:
+            pass
+        sending, self._sending = self._sending, None
+        if sending is not None:
+            await sending  # let the interrupted batch finish instead of dropping it
+        pending, self._held = self._held, []
+        while q is not None and not q.empty():
+            pending.append(q.get_nowait())
+        batch: List[Tuple[str, List[dict]]] = []
+        for item in pending:
+            if batch and sum(len(b) for _, b in batch) + len(item[1]) > self.max_blocks:
+                await self._send(batch)
+                batch = []
+            batch.append(item)
+        if batch:
+            await self._send(batch)
+
+slack_batcher = SlackBatcher()
@@ -1,70 +1,174 @@
 
 from __future__ import annotations
-from typing import Any, Dict, List
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import orjson
 
 from .investigators.rag import retrieve_evidence
 from .remediator.candidates import generate_candidates
 from .validator.validator import validate
 from . import store
-from .audit import write_event
+from .audit import write_events
+
+
+_EVIDENCE_KEYS = ("title", "score", "snippet", "uri", "service", "kind")
+_EVIDENCE_DUMP = frozenset(_EVIDENCE_KEYS + ("source",))
+_EVIDENCE_ATTRS = ("title", "score", "snippet", "uri", "source")
+
+
+@lru_cache(maxsize=None)
+def _evidence_converter(typ: type) -> Callable[[Any], Dict[str, Any]]:
+    """Pick the to-dict strategy once per Evidence class instead of probing every item."""
+    # Works for both your Pydantic Evidence and the shim in rag.py
+    if hasattr(typ, "model_dump"):
+        return lambda e: e.model_dump(include=_EVIDENCE_DUMP)
+    if hasattr(typ, "dict"):
+        return lambda e: e.dict(include=_EVIDENCE_DUMP)
+    if issubclass(typ, dict):
+        return lambda e: e
+    # best-effort getattr
+    return lambda e: {k: getattr(e, k, None) for k in _EVIDENCE_ATTRS}
 
 
 def _evidence_to_dict(e: Any) -> Dict[str, Any]:
     """Normalize Evidence objects/shims to plain dicts for JSON-friendly storage."""
-    # Works for both your Pydantic Evidence and the shim in rag.py
-    if hasattr(e, "model_dump"):
-        d = e.model_dump()
-    elif hasattr(e, "dict"):
-        d = e.dict()
-    elif isinstance(e, dict):
-        d = dict(e)
-    else:
-        # best-effort getattr
-        d = {
-            "title": getattr(e, "title", None),
-            "score": getattr(e, "score", None),
-            "snippet": getattr(e, "snippet", None),
-            "uri": getattr(e, "uri", None),
-            "source": getattr(e, "source", None),
-        }
+    d = _evidence_converter(type(e))(e)
     # keep only common keys to avoid huge blobs
+    out = {k: d.get(k) for k in _EVIDENCE_KEYS}
+    out["uri"] = out["uri"] or d.get("source")
+    return out
+
+
+# ------------------------- Evidence (RAG) result cache -------------------------
+# Near-duplicate incidents (same service, cause and roughly the same signals) build
+# the same retrieval query, so their evidence is reused for EVIDENCE_CACHE_TTL_S.
+# Candidates and validation are NOT cached: they carry the incident id and are
+# anchored to created_at / the current peak window. Any KB mutation clears it.
+EVIDENCE_CACHE_MAX = 256
+EVIDENCE_CACHE_TTL_S = 300.0
+_EVIDENCE_CACHE: "OrderedDict[str, Tuple[float, List[Any]]]" = OrderedDict()
+_EVIDENCE_CACHE_LOCK = threading.Lock()
+
+
+def _fingerprint(incident: Any) -> str:
+    sigs = getattr(incident, "signals", None) or []
+    def _sig(sg: Any) -> Tuple[str, Any]:
+        name = sg.get("name") if isinstance(sg, dict) else getattr(sg, "name", None)
+        value = sg.get("value") if isinstance(sg, dict) else getattr(sg, "value", None)
+        try:
+            value = round(float(value), 2)
+        except (TypeError, ValueError):
+            pass
+        return (str(name), value)
+    raw = orjson.dumps({
+        "svc": getattr(incident, "service", "") or "",  # exact: retrieval filters on it
+        "cause": (getattr(incident, "suspected_cause", "") or "").lower(),
+        "sigs": sorted(_sig(sg) for sg in sigs),
+    }, option=orjson.OPT_SORT_KEYS, default=str)
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _cached_evidence(key: str) -> Optional[List[Any]]:
+    with _EVIDENCE_CACHE_LOCK:
+        hit = _EVIDENCE_CACHE.get(key)
+        if hit is None:
+            return None
+        if time.monotonic() - hit[0] > EVIDENCE_CACHE_TTL_S:
+            del _EVIDENCE_CACHE[key]
+            return None
+        _EVIDENCE_CACHE.move_to_end(key)
+        return list(hit[1])
+
+
+def _store_evidence(key: str, evidence_objs: List[Any]) -> None:
+    with _EVIDENCE_CACHE_LOCK:
+        _EVIDENCE_CACHE[key] = (time.monotonic(), list(evidence_objs))
+        _EVIDENCE_CACHE.move_to_end(key)
+        while len(_EVIDENCE_CACHE) > EVIDENCE_CACHE_MAX:
+            _EVIDENCE_CACHE.popitem(last=False)
+
+
+def clear_evidence_cache() -> int:
+    """Drop cached evidence (KB changed, or an operator suspects drift). Returns entries dropped."""
+    with _EVIDENCE_CACHE_LOCK:
+        n = len(_EVIDENCE_CACHE)
+        _EVIDENCE_CACHE.clear()
+    return n
+
+
+def _validation_error(exc: BaseException) -> Dict[str, Any]:
+    """FAIL result standing in for a validator that raised, so one bad plan doesn't sink the run."""
     return {
-        "title": d.get("title"),
-        "score": d.get("score"),
-        "snippet": d.get("snippet"),
-        "uri": d.get("uri") or d.get("source"),
-        "service": d.get("service"),
-        "kind": d.get("kind"),
+        "status": "FAIL",
+        "before": {},
+        "after": {},
+        "kpi_deltas": {},
+        "notes": f"validation error: {type(exc).__name__}: {exc}",
     }
 
 
-def run_all(incident) -> Dict[str, Any]:
+def _dedup_evidence(evidence: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One entry per (uri, title), keeping the highest score; first-seen order is preserved."""
+    best: Dict[Tuple[Any, Any], Dict[str, Any]] = {}
+    for e in evidence:
+        k = (e.get("uri"), e.get("title"))
+        prev = best.get(k)
+        if prev is None or (e.get("score") or 0) > (prev.get("score") or 0):
+            best[k] = e
+    return list(best.values())
+
+
+async def run_all(incident) -> Dict[str, Any]:
     """End-to-end pipeline:
        1) Retrieve RAG evidence
        2) Generate deterministic candidates (policy-checked)
-       3) Validate each candidate with CSV replay (before/after windows)
+       3) Validate all candidates concurrently with CSV replay (before/after windows)
        4) Persist JSON-friendly result in store.RESULTS[incident.id]
+    Blocking stages run in worker threads so the event loop stays free.
     """
-    write_event(
+    events: List[Tuple[float, str, Dict[str, Any]]] = []
+    def emit(kind: str, payload: Dict[str, Any]) -> None:
+        events.append((time.time(), kind, payload))
+    try:
+        return await _run_stages(incident, emit)
+    finally:
+        # one audit hand-off per run, including runs that fail part-way
+        write_events(events)
+
+
+async def _run_stages(incident, emit: Callable[[str, Dict[str, Any]], None]) -> Dict[str, Any]:
+    emit(
         "pipeline_start",
         {"incident_id": incident.id, "service": incident.service, "severity": incident.severity},
     )
 
-    # 1) Evidence (objects -> dicts)
-    evidence_objs = retrieve_evidence(incident)
-    evidence: List[Dict[str, Any]] = [_evidence_to_dict(e) for e in evidence_objs]
-    write_event(
+    # 1) Evidence (objects -> dicts); reused for near-duplicate incidents
+    fp = _fingerprint(incident)
+    evidence_objs = _cached_evidence(fp)
+    cached = evidence_objs is not None
+    if evidence_objs is None:
+        evidence_objs = await asyncio.to_thread(retrieve_evidence, incident)
+        _store_evidence(fp, evidence_objs)
+    evidence: List[Dict[str, Any]] = _dedup_evidence([_evidence_to_dict(e) for e in evidence_objs])
+    emit(
         "pipeline_evidence",
         {
             "incident_id": incident.id,
             "count": len(evidence),
+            "cached": cached,
             "top_titles": [e.get("title") for e in evidence[:3]],
         },
     )
 
     # 2) Actionable plans (already annotated with policy fields)
-    candidates = generate_candidates(incident, evidence_objs)
-    write_event(
+    candidates = await asyncio.to_thread(generate_candidates, incident, evidence_objs)
+    emit(
         "pipeline_candidates",
         {
             "incident_id": incident.id,
@@ -74,13 +178,18 @@ def run_all(incident) -> Dict[str, Any]:
         },
     )
 
-    # 3) Validate each plan (offline “what-if”)
+    # 3) Validate each plan (offline “what-if”); plans are independent, so run them together
+    outcomes = await asyncio.gather(
+        *(asyncio.to_thread(validate, incident, c) for c in candidates),
+        return_exceptions=True,
+    )
     validations: List[Dict[str, Any]] = []
-    for c in candidates:
-        v = validate(incident, c)  # returns {status, before, after, deltas, notes, candidate_id}
+    for c, v in zip(candidates, outcomes):
+        if isinstance(v, BaseException):
+            v = _validation_error(v)
         c["validation"] = v  # attach onto candidate for UI
         validations.append({"plan_id": c.get("id"), "result": v})
-        write_event(
+        emit(
             "pipeline_validate",
             {
                 "incident_id": incident.id,
@@ -103,7 +212,7 @@ def run_all(incident) -> Dict[str, Any]:
         "policy_summary": policy_summary,
     }
     store.RESULTS[incident.id] = result
-    write_event("pipeline_end", {"incident_id": incident.id})
+    emit("pipeline_end", {"incident_id": incident.id})
 
     return result
 
@@ -79,43 +79,70 @@
 
 # backend/app/policy/policy_guard.py
 from __future__ import annotations
-import os
+import os, json, hashlib, threading
+from collections import OrderedDict
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
 # ---------- Tunables (env) ----------
-ENV_ALLOWLIST = {s.strip().lower() for s in os.getenv("ENV_ALLOWLIST", "dev,staging,prod").split(",") if s.strip()}
-PROD_ENVS     = {s.strip().lower() for s in os.getenv("PROD_ENVS", "prod,production").split(",") if s.strip()}
+def _csv_set(raw: str) -> FrozenSet[str]:
+    return frozenset(s.strip().lower() for s in raw.split(",") if s.strip())
 
-PEAK_START = os.getenv("PEAK_START", "09:00:00")
-PEAK_END   = os.getenv("PEAK_END",   "21:00:00")
-
-REQUIRE_APPROVAL_FOR_WRITES   = os.getenv("REQUIRE_APPROVAL_FOR_WRITES", "1") == "1"
-BLOCK_GLOBAL_FF_IN_PROD       = os.getenv("BLOCK_GLOBAL_FF_IN_PROD", "1") == "1"
-REQUIRE_BACKUP_FOR_SCHEMA     = os.getenv("REQUIRE_BACKUP_FOR_SCHEMA", "1") == "1"
-MAX_TARGETS_PROD              = int(os.getenv("MAX_TARGETS_PROD", "5"))
+def _parse_clock(s: str) -> time:
+    h, m, sec = (int(x) for x in s.split(":"))
+    return time(h, m, sec)
 
-SENSITIVE_SERVICES = {s.strip().lower() for s in os.getenv("SENSITIVE_SERVICES", "auth,payments").split(",") if s.strip()}
+@dataclass(frozen=True)
+class PolicyConfig:
+    """Policy tunables, parsed once (sets lowercased, clocks as time, flags as bool).
+    Hashable, so it is part of the memo keys; tests build one directly."""
+    env_allowlist: FrozenSet[str] = frozenset({"dev", "staging", "prod"})
+    prod_envs: FrozenSet[str] = frozenset({"prod", "production"})
+    peak_start: time = time(9, 0, 0)
+    peak_end: time = time(21, 0, 0)
+    require_approval_for_writes: bool = True
+    block_global_ff_in_prod: bool = True
+    require_backup_for_schema: bool = True
+    max_targets_prod: int = 5
+    sensitive_services: FrozenSet[str] = frozenset({"auth", "payments"})
+
+    @classmethod
+    def from_env(cls) -> "PolicyConfig":
+        g = os.getenv
+        return cls(
+            env_allowlist=_csv_set(g("ENV_ALLOWLIST", "dev,staging,prod")),
+            prod_envs=_csv_set(g("PROD_ENVS", "prod,production")),
+            peak_start=_parse_clock(g("PEAK_START", "09:00:00")),
+            peak_end=_parse_clock(g("PEAK_END", "21:00:00")),
+            require_approval_for_writes=g("REQUIRE_APPROVAL_FOR_WRITES", "1") == "1",
+            block_global_ff_in_prod=g("BLOCK_GLOBAL_FF_IN_PROD", "1") == "1",
+            require_backup_for_schema=g("REQUIRE_BACKUP_FOR_SCHEMA", "1") == "1",
+            max_targets_prod=int(g("MAX_TARGETS_PROD", "5")),
+            sensitive_services=_csv_set(g("SENSITIVE_SERVICES", "auth,payments")),
+        )
+
+    def in_peak(self, now: Optional[datetime] = None) -> bool:
+        t = (now or datetime.utcnow()).time()
+        if self.peak_start <= self.peak_end:
+            return self.peak_start <= t <= self.peak_end
+        return t >= self.peak_start or t <= self.peak_end  # overnight window (e.g., 22:00–06:00)
+
+@lru_cache(maxsize=1)
+def get_policy_config() -> PolicyConfig:
+    return PolicyConfig.from_env()
+
+def reset_config_cache() -> None:
+    """Re-read the policy env on next use (tests / in-process reconfiguration)."""
+    get_policy_config.cache_clear()
 
 # Action types we recognize
 READ_ONLY   = {"read", "observe"}
 WRITE_TYPES = {"config_change", "db_schema", "restart", "deploy", "feature_flag", "scale", "rollback"}
 
-def _parse_clock(s: str) -> time:
-    h, m, sec = (int(x) for x in s.split(":"))
-    return time(h, m, sec)
-
-PEAK_START_T = _parse_clock(PEAK_START)
-PEAK_END_T   = _parse_clock(PEAK_END)
-
-def _in_peak(now: Optional[datetime] = None) -> bool:
-    now = now or datetime.utcnow()
-    t = now.time()
-    if PEAK_START_T <= PEAK_END_T:
-        return PEAK_START_T <= t <= PEAK_END_T
-    else:  # overnight window (e.g., 22:00–06:00)
-        return t >= PEAK_START_T or t <= PEAK_END_T
+def _in_peak(now: Optional[datetime] = None, config: Optional[PolicyConfig] = None) -> bool:
+    return (config or get_policy_config()).in_peak(now)
 
 @dataclass
 class Violation:
@@ -125,73 +152,156 @@ class Violation:
 def _violation(code: str, msg: str) -> Dict[str, str]:
     return {"code": code, "message": msg}
 
-def evaluate_step(step: Dict[str, Any], approved: bool, now: Optional[datetime] = None) -> List[Dict[str, str]]:
-    """
-    Returns a list of violations for a single step.
-    Expected step fields (best-effort): action_type, env, service, targets, op, key, backup_id
-    """
-    v: List[Dict[str, str]] = []
-    action = str(step.get("action_type") or "").lower() or "read"
-    env    = str(step.get("env") or "dev").lower()
-    svc    = str(step.get("service") or "").strip().lower()
-    targets = step.get("targets") or []
-    if isinstance(targets, str):
-        targets = [targets]
+# Hoisted per-step constants (literal sets built once, not per call)
+_WILDCARDS     = frozenset({"*", "all"})
+_FF_OFF_OPS    = frozenset({"disable", "off"})
+_PEAK_BLOCKED  = frozenset({"restart", "deploy"})
+# Violations that sink the whole plan regardless of the remaining steps
+_FATAL_CODES   = frozenset({"env_not_allowlisted", "wildcard_service_blocked", "excessive_blast_radius"})
+
+@lru_cache(maxsize=256)
+def _step_violations(action: str, env: str, svc: str, targets: Tuple[Any, ...], op: str, key: str,
+                     has_backup: bool, approved: bool, in_peak: bool,
+                     cfg: PolicyConfig) -> Tuple[Tuple[str, str], ...]:
+    """Policy rules over a normalized step; memoized because plans repeat the same read/restart steps."""
+    v: List[Tuple[str, str]] = []
+    is_write = action in WRITE_TYPES
+    is_prod  = env in cfg.prod_envs
 
     # Env allowlist
-    if env not in ENV_ALLOWLIST:
-        v.append(_violation("env_not_allowlisted", f"env '{env}' not in allowlist {sorted(ENV_ALLOWLIST)}"))
+    if env not in cfg.env_allowlist:
+        v.append(("env_not_allowlisted", f"env '{env}' not in allowlist {sorted(cfg.env_allowlist)}"))
 
     # Approval for writes (any env)
-    if REQUIRE_APPROVAL_FOR_WRITES and (action in WRITE_TYPES) and not approved:
-        v.append(_violation("approval_required", f"write action '{action}' requires approval"))
+    if cfg.require_approval_for_writes and is_write and not approved:
+        v.append(("approval_required", f"write action '{action}' requires approval"))
 
     # Wildcard service
-    if svc in {"*", "all"}:
-        v.append(_violation("wildcard_service_blocked", "wildcard service not allowed"))
+    if svc in _WILDCARDS:
+        v.append(("wildcard_service_blocked", "wildcard service not allowed"))
 
     # Sensitive services are stricter (writes must be approved)
-    if svc in SENSITIVE_SERVICES and (action in WRITE_TYPES) and not approved:
-        v.append(_violation("sensitive_requires_approval", f"writes on sensitive service '{svc}' require approval"))
+    if svc in cfg.sensitive_services and is_write and not approved:
+        v.append(("sensitive_requires_approval", f"writes on sensitive service '{svc}' require approval"))
 
     # Peak-time restrictions (prod only)
-    if env in PROD_ENVS and _in_peak(now) and action in {"restart", "deploy"}:
-        v.append(_violation("blocked_in_peak", f"'{action}' blocked during peak window {PEAK_START}-{PEAK_END} in {env}"))
+    if is_prod and action in _PEAK_BLOCKED and in_peak:
+        v.append(("blocked_in_peak", f"'{action}' blocked during peak window {cfg.peak_start}-{cfg.peak_end} in {env}"))
 
     # DB schema changes require a backup reference
-    if action == "db_schema" and REQUIRE_BACKUP_FOR_SCHEMA and not step.get("backup_id"):
-        v.append(_violation("backup_required", "db schema changes require 'backup_id'"))
+    if action == "db_schema" and cfg.require_backup_for_schema and not has_backup:
+        v.append(("backup_required", "db schema changes require 'backup_id'"))
 
     # Feature flag safety in prod: block global disable
-    if env in PROD_ENVS and action == "feature_flag":
-        op  = str(step.get("op") or "").lower()
-        key = str(step.get("key") or "").lower()
-        if BLOCK_GLOBAL_FF_IN_PROD and op in {"disable", "off"} and key in {"*", "all"}:
-            v.append(_violation("global_ff_disable_blocked", "disabling ALL feature flags in prod is blocked"))
+    if is_prod and action == "feature_flag":
+        if cfg.block_global_ff_in_prod and op in _FF_OFF_OPS and key in _WILDCARDS:
+            v.append(("global_ff_disable_blocked", "disabling ALL feature flags in prod is blocked"))
 
     # Blast radius in prod
-    if env in PROD_ENVS:
-        if targets == ["*"] or len(targets) > MAX_TARGETS_PROD:
-            v.append(_violation("excessive_blast_radius", f"targets {targets} exceed prod limit ({MAX_TARGETS_PROD})"))
+    if is_prod:
+        tl = list(targets)
+        if tl == ["*"] or len(tl) > cfg.max_targets_prod:
+            v.append(("excessive_blast_radius", f"targets {tl} exceed prod limit ({cfg.max_targets_prod})"))
 
-    return v
+    return tuple(v)
 
-def evaluate_plan(plan: Dict[str, Any], approved: bool, now: Optional[datetime] = None) -> Dict[str, Any]:
+def evaluate_step(step: Dict[str, Any], approved: bool, peak: Optional[bool] = None,
+                  config: Optional[PolicyConfig] = None) -> List[Dict[str, str]]:
+    """
+    Returns a list of violations for a single step.
+    Expected step fields (best-effort): action_type, env, service, targets, op, key, backup_id
+    `peak` is the caller's in-peak decision; None reads the clock (only if the step needs it).
+    `config` defaults to the env-derived get_policy_config().
+    """
+    cfg = config or get_policy_config()
+    g = step.get
+    action = str(g("action_type") or "").lower() or "read"
+    env    = str(g("env") or "dev").lower()
+    svc    = str(g("service") or "").strip().lower()
+    targets = g("targets") or []
+    if isinstance(targets, str):
+        targets = [targets]
+    # the clock only matters for restart/deploy in prod; keep it out of the key otherwise
+    in_peak = env in cfg.prod_envs and action in _PEAK_BLOCKED and (cfg.in_peak() if peak is None else peak)
+    args = (action, env, svc, tuple(targets), str(g("op") or "").lower(), str(g("key") or "").lower(),
+            bool(g("backup_id")), bool(approved), in_peak, cfg)
+    try:
+        found = _step_violations(*args)
+    except TypeError:  # unhashable target entries: evaluate without the cache
+        found = _step_violations.__wrapped__(*args)
+    return [_violation(code, msg) for code, msg in found]
+
+def evaluate_plan(plan: Dict[str, Any], approved: bool, now: Optional[datetime] = None,
+                  fail_fast: bool = False, config: Optional[PolicyConfig] = None) -> Dict[str, Any]:
     """
     Evaluate all steps and summarize.
     Returns: {"policy_ok": bool, "policy_violations": [..], "violations_by_step": {...}}
+    fail_fast stops at the first step with a plan-wide (_FATAL_CODES) violation; the
+    summary then only covers the steps walked so far.
     """
+    cfg = config or get_policy_config()
+    return _evaluate_steps(plan, approved, _in_peak(now, cfg), fail_fast, cfg)
+
+def _evaluate_steps(plan: Dict[str, Any], approved: bool, peak: bool, fail_fast: bool = False,
+                    cfg: Optional[PolicyConfig] = None) -> Dict[str, Any]:
+    # peak is decided once per plan; step-level clock drift doesn't matter
     steps = plan.get("steps") or []
     all_violations: List[Dict[str, str]] = []
     by_step: List[List[Dict[str, str]]] = []
 
     for s in steps:
-        vs = evaluate_step(s, approved=approved, now=now)
+        vs = evaluate_step(s, approved=approved, peak=peak, config=cfg)
         by_step.append(vs)
         all_violations.extend(vs)
+        if fail_fast and any(v["code"] in _FATAL_CODES for v in vs):
+            break
 
     return {
         "policy_ok": len(all_violations) == 0,
         "policy_violations": all_violations,
         "violations_by_step": by_step,
     }
+
+# ---------- Memoized evaluation (execution-time re-checks) ----------
+# A plan's verdict depends only on its steps, the approval flag, whether we're inside
+# the peak window and the PolicyConfig in force -- all part of the key, so no TTL needed.
+POLICY_CACHE_MAX = 256
+_POLICY_CACHE: "OrderedDict[Tuple[bytes, bool, bool, PolicyConfig], Dict[str, Any]]" = OrderedDict()
+_POLICY_CACHE_LOCK = threading.Lock()
+
+def _steps_hash(plan: Dict[str, Any]) -> bytes:
+    raw = json.dumps(plan.get("steps") or [], sort_keys=True, default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+def _copy_verdict(res: Dict[str, Any]) -> Dict[str, Any]:
+    # callers embed the verdict in execution records (policy_snapshot); hand out fresh
+    # containers so appending to / editing them never reaches the cached entry
+    return {
+        **res,
+        "policy_violations": list(res["policy_violations"]),
+        "violations_by_step": [list(vs) for vs in res["violations_by_step"]],
+    }
+
+def evaluate_plan_cached(plan: Dict[str, Any], approved: bool, now: Optional[datetime] = None,
+                         config: Optional[PolicyConfig] = None) -> Dict[str, Any]:
+    """Same as evaluate_plan, memoized by (steps hash, approved, in-peak, config). Each call returns its own copy."""
+    cfg = config or get_policy_config()
+    peak = _in_peak(now, cfg)
+    key = (_steps_hash(plan), bool(approved), peak, cfg)
+    with _POLICY_CACHE_LOCK:
+        hit = _POLICY_CACHE.get(key)
+        if hit is not None:
+            _POLICY_CACHE.move_to_end(key)
+            return _copy_verdict(hit)
+    res = _evaluate_steps(plan, approved, peak, cfg=cfg)
+    with _POLICY_CACHE_LOCK:
+        _POLICY_CACHE[key] = res
+        if len(_POLICY_CACHE) > POLICY_CACHE_MAX:
+            _POLICY_CACHE.popitem(last=False)
+    return _copy_verdict(res)
+
+def invalidate_policy_cache() -> None:
+    """Drop memoized verdicts (call after editing plans or policy tunables in-process)."""
+    with _POLICY_CACHE_LOCK:
+        _POLICY_CACHE.clear()
+    _step_violations.cache_clear()
@@ -5,33 +5,54 @@ from typing import Dict, Tuple
 
 
 class Action(str, Enum):
-ROLLBACK = "rollback"
-SCALE_DB_POOL = "scale_db_pool"
-CLEAR_CACHE = "clear_cache"
+    ROLLBACK = "rollback"
+    SCALE_DB_POOL = "scale_db_pool"
+    CLEAR_CACHE = "clear_cache"
 
 
 SEVERITY_RANK = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
 
 
 class ActionRequest(BaseModel):
-incident_id: str
-action: Action
-severity: str
-environment: str = "prod"
-dry_run: bool = True
+    incident_id: str
+    action: Action
+    severity: str
+    environment: str = "prod"
+    dry_run: bool = True
 
 
 POLICY = {
-Action.ROLLBACK: {"min_severity": "MEDIUM", "require_approval": True},
-Action.SCALE_DB_POOL:{"min_severity": "MEDIUM", "require_approval": True},
-Action.CLEAR_CACHE: {"min_severity": "LOW", "require_approval": False},
+    Action.ROLLBACK: {"min_severity": "MEDIUM", "require_approval": True},
+    Action.SCALE_DB_POOL: {"min_severity": "MEDIUM", "require_approval": True},
+    Action.CLEAR_CACHE: {"min_severity": "LOW", "require_approval": False},
+}
+
+
+def _decide(action: Action, rank: int, prod: bool, approved: bool) -> Tuple[bool, str]:
+    rule = POLICY[action]
+    if rank < SEVERITY_RANK[rule["min_severity"]]:
+        # the caller's severity string is filled in at lookup time
+        return False, "severity {severity} below minimum " + rule["min_severity"]
+    if prod and rule["require_approval"] and not approved:
+        return False, "approval required"
+    return True, "allowed"
+
+
+# Every (action, severity rank, prod?, approved?) verdict, decided once at import
+_ALLOW: Dict[Tuple[Action, int, bool, bool], Tuple[bool, str]] = {
+    (act, rank, prod, approved): _decide(act, rank, prod, approved)
+    for act in POLICY
+    for rank in set(SEVERITY_RANK.values())
+    for prod in (False, True)
+    for approved in (False, True)
 }
 
 
 def allowed(req: ActionRequest, approvals: Dict[str, bool]) -> Tuple[bool, str]:
-rule = POLICY[req.action]
-if SEVERITY_RANK.get(req.severity, 0) < SEVERITY_RANK[rule["min_severity"]]:
-return False, f"severity {req.severity} below minimum {rule['min_severity']}"
-if req.environment == "prod" and rule["require_approval"] and not approvals.get(req.incident_id, False):
-return False, "approval required"
-return True, "allowed"
\ No newline at end of file
+    ok, reason = _ALLOW[(
+        req.action,
+        SEVERITY_RANK.get(req.severity, 0),
+        req.environment == "prod",
+        bool(approvals.get(req.incident_id, False)),
+    )]
+    return ok, (reason if ok else reason.format(severity=req.severity))
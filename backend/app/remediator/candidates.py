@@ -127,74 +127,82 @@ from __future__ import annotations
 from typing import Any, Dict, List
 from ..policy.policy_guard import evaluate_plan
 
-def _base_env(incident) -> str:
+def _base_env(service: str) -> str:
     # naive guess from service; refine as needed or pass via incident metadata
-    _ = (getattr(incident, "service", "") or "").lower()
     return "staging"  # safe default for demos
 
-def _candidate_id(prefix: str, incident) -> str:
-    sid = getattr(incident, "id", "inc")
-    return f"{prefix}-{sid[:8]}"
-
-def _deploy_rollback(incident, env: str, service: str) -> Dict[str, Any]:
-    return {
-        "id": _candidate_id("rollback", incident),
-        "title": f"Rollback recent deploy for {service}",
-        "env": env,
-        "service": service,
+# Plan table: "{service}" placeholders are filled per incident; every step also gets env + service.
+_PLAN_TEMPLATES: List[Dict[str, Any]] = [
+    {
+        "prefix": "rollback",
+        "title": "Rollback recent deploy for {service}",
         "rationale": "Recent deploy suspected; rollback to last known good.",
         "predicted_impact": {"error_rate_pct": -0.5, "latency_p95_ms": -200},
         "steps": [
-            {"action_type": "read", "env": env, "service": service, "cmd": "fetch deploy status"},
-            {"action_type": "deploy", "env": env, "service": service, "targets": [service], "version": "previous"},
-            {"action_type": "restart", "env": env, "service": service, "targets": [service]},
-            {"action_type": "read", "env": env, "service": service, "cmd": "verify health"},
+            ("read", {"cmd": "fetch deploy status"}),
+            ("deploy", {"targets": ["{service}"], "version": "previous"}),
+            ("restart", {"targets": ["{service}"]}),
+            ("read", {"cmd": "verify health"}),
         ],
-    }
-
-def _db_pool_tune(incident, env: str, service: str) -> Dict[str, Any]:
-    return {
-        "id": _candidate_id("db-pool", incident),
-        "title": f"Tune DB pool for {service}",
-        "env": env,
-        "service": service,
+    },
+    {
+        "prefix": "db-pool",
+        "title": "Tune DB pool for {service}",
         "rationale": "High p95 + low 5xx suggests saturation; raise pool, add backoff.",
         "predicted_impact": {"error_rate_pct": -0.2, "latency_p95_ms": -150},
         "steps": [
-            {"action_type": "read", "env": env, "service": service, "cmd": "check DB pool graphs"},
-            {"action_type": "config_change", "env": env, "service": service, "targets": [service], "key": "db.pool.max", "value": "+20%"},
-            {"action_type": "restart", "env": env, "service": service, "targets": [service]},
+            ("read", {"cmd": "check DB pool graphs"}),
+            ("config_change", {"targets": ["{service}"], "key": "db.pool.max", "value": "+20%"}),
+            ("restart", {"targets": ["{service}"]}),
         ],
-    }
+    },
+    {
+        "prefix": "cache-warm",
+        "title": "Warm cache for {service}",
+        "rationale": "Cache miss storm after deploy; warm critical keys.",
+        "predicted_impact": {"error_rate_pct": -0.1, "latency_p95_ms": -100},
+        "steps": [
+            ("read", {"cmd": "inspect cache hit-rate"}),
+            ("config_change", {"targets": ["{service}"], "key": "cache.prefill", "value": "on"}),
+        ],
+    },
+]
+
+def _fill(v: Any, service: str) -> Any:
+    if isinstance(v, str):
+        return v.replace("{service}", service)
+    if isinstance(v, list):
+        return [_fill(x, service) for x in v]
+    return v
 
-def _cache_warm(incident, env: str, service: str) -> Dict[str, Any]:
+def _build_plan(tpl: Dict[str, Any], iid: str, env: str, service: str) -> Dict[str, Any]:
     return {
-        "id": _candidate_id("cache-warm", incident),
-        "title": f"Warm cache for {service}",
+        "id": f"{tpl['prefix']}-{iid}",
+        "title": _fill(tpl["title"], service),
         "env": env,
         "service": service,
-        "rationale": "Cache miss storm after deploy; warm critical keys.",
-        "predicted_impact": {"error_rate_pct": -0.1, "latency_p95_ms": -100},
+        "rationale": tpl["rationale"],
+        "predicted_impact": dict(tpl["predicted_impact"]),
         "steps": [
-            {"action_type": "read", "env": env, "service": service, "cmd": "inspect cache hit-rate"},
-            {"action_type": "config_change", "env": env, "service": service, "targets": [service], "key": "cache.prefill", "value": "on"},
+            {"action_type": action, "env": env, "service": service,
+             **{k: _fill(x, service) for k, x in extra.items()}}
+            for action, extra in tpl["steps"]
         ],
     }
 
 def generate_candidates(incident, evidence_objs: List[Any]) -> List[Dict[str, Any]]:
+    # read the incident once; builders only see plain strings
     service = (getattr(incident, "service", "") or "generic").lower()
-    env = _base_env(incident)
+    iid = (getattr(incident, "id", None) or "inc")[:8]
+    env = _base_env(service)
 
-    plans: List[Dict[str, Any]] = [
-        _deploy_rollback(incident, env, service),
-        _db_pool_tune(incident, env, service),
-        _cache_warm(incident, env, service),
-    ]
+    plans: List[Dict[str, Any]] = [_build_plan(t, iid, env, service) for t in _PLAN_TEMPLATES]
 
     # Evaluate policies; assume approval can be read externally if needed
     approved = False  # runtime approval is checked at execution time; keep candidates conservative
+    # fail fast: a dead plan only needs its first fatal violation here; execute re-checks in full
     for p in plans:
-        evalr = evaluate_plan(p, approved=approved)
+        evalr = evaluate_plan(p, approved=approved, fail_fast=True)
         p["policy_ok"] = bool(evalr["policy_ok"])
         p["policy_violations"] = evalr["policy_violations"]
         p["violations_by_step"] = evalr["violations_by_step"]
@@ -1,5 +1,5 @@
 # backend/app/reporter/__init__.py
-from .html import render_report
+from .html import render_report, render_report_stream
 from .pdf import build_pdf
 
-__all__ = ["render_report", "build_pdf"]
+__all__ = ["render_report", "render_report_stream", "build_pdf"]
@@ -1,18 +1,59 @@
 # backend/app/reporter/html.py
+import hashlib
+import importlib
+import tempfile
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from typing import Iterator
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
 from ..models import PipelineResult, Incident
 
 # templates directory: backend/app/templates/report.html
 _TEMPLATE_DIR = Path(__file__).resolve().parents[1] / "templates"
 
+# compiled template bytecode survives worker restarts (skips re-parsing report.html)
+_BYTECODE_DIR = Path(tempfile.gettempdir()) / "incident-copilot-jinja"
+
+def _bytecode_cache():
+    try:
+        _BYTECODE_DIR.mkdir(parents=True, exist_ok=True)
+        return FileSystemBytecodeCache(str(_BYTECODE_DIR))
+    except OSError:
+        return None
+
+# templates ship with the code, so no per-render mtime check
 _env = Environment(
     loader=FileSystemLoader(str(_TEMPLATE_DIR)),
     autoescape=select_autoescape(["html", "xml"]),
+    auto_reload=False,
+    bytecode_cache=_bytecode_cache(),
 )
 
+def template_sha1(name: str) -> str:
+    return hashlib.sha1((_TEMPLATE_DIR / name).read_bytes()).hexdigest()
+
+def _load_template(name: str) -> Template:
+    """Template from the AOT-compiled module (scripts/build_templates.py) when it matches
+    the .html on disk; otherwise lex + parse it through the environment."""
+    try:
+        mod = importlib.import_module(f"..templates_compiled.{Path(name).stem}", __package__)
+        if getattr(mod, "SOURCE_SHA1", None) == template_sha1(name):
+            return _env.template_class.from_module_dict(_env, vars(mod), _env.globals)
+    except Exception:  # missing or built against another Jinja: parse instead
+        pass
+    return _env.get_template(name)
+
+_REPORT_TPL = _load_template("report.html")
+
 def render_report(incident: Incident, result: PipelineResult) -> str:
     """Render the incident report to HTML using templates/report.html."""
-    tpl = _env.get_template("report.html")
     # Pass the same keys your template expects; add more as needed
-    return tpl.render(incident=incident, result=result)
+    return _REPORT_TPL.render(incident=incident, result=result)
+
+STREAM_BUFFER = 50  # template output events joined per yielded chunk
+
+def render_report_stream(incident: Incident, result: PipelineResult) -> Iterator[bytes]:
+    """Same HTML as render_report, yielded as UTF-8 chunks (for StreamingResponse)."""
+    stream = _REPORT_TPL.stream(incident=incident, result=result)
+    stream.enable_buffering(STREAM_BUFFER)
+    for chunk in stream:
+        yield chunk.encode("utf-8")
@@ -1,15 +1,140 @@
 from io import BytesIO
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from typing import Any, Dict, List, Sequence, Tuple
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Flowable
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
+from reportlab.lib.utils import simpleSplit
+
+from .reporter import _BLANK, _STEP_FIELDS
+
+# getSampleStyleSheet() builds a fresh stylesheet each call; resolve the styles once
+_STYLES = getSampleStyleSheet()
+_H1, _H2, _BODY = _STYLES["Heading1"], _STYLES["Heading2"], _STYLES["BodyText"]
+_MONO = ParagraphStyle("mono", parent=_BODY, fontName="Courier", fontSize=9, leading=11)
+
+# Table styles are read-only once built; Table.setStyle copies the commands it needs
+_HEADER_BG = colors.HexColor("#111827")
+_HEADER_ROW = [
+    ("BACKGROUND", (0,0), (-1,0), _HEADER_BG),
+    ("TEXTCOLOR", (0,0), (-1,0), colors.whitesmoke),
+    ("GRID", (0,0), (-1,-1), 0.25, colors.grey),
+    ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
+]
+_EVIDENCE_STYLE = TableStyle(_HEADER_ROW + [("ROWBACKGROUNDS", (0,1), (-1,-1), [colors.whitesmoke, colors.lightgrey])])
+_VALIDATION_STYLE = TableStyle(_HEADER_ROW)
+
+def warm() -> None:
+    """Process-pool initializer: load reportlab's base fonts up front."""
+    SimpleDocTemplate(BytesIO(), pagesize=A4).build([Paragraph("warm-up", _BODY)])
+
+def _doc(buf: BytesIO) -> SimpleDocTemplate:
+    return SimpleDocTemplate(buf, pagesize=A4, topMargin=36, bottomMargin=36, leftMargin=42, rightMargin=42)
 
 def build_pdf(incident, result) -> bytes:
     buf = BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=A4, topMargin=36, bottomMargin=36, leftMargin=42, rightMargin=42)
-    styles = getSampleStyleSheet()
-    h1 = styles["Heading1"]; h2 = styles["Heading2"]; body = styles["BodyText"]
-    mono = ParagraphStyle("mono", parent=body, fontName="Courier", fontSize=9, leading=11)
+    _doc(buf).build(_story(incident, result))
+    return buf.getvalue()
+
+class _PageMark(Flowable):
+    """Zero-size flowable that records the page it lands on (report boundaries in a bundle)."""
+    def __init__(self, key: str, pages: Dict[str, int]):
+        super().__init__()
+        self.key, self.pages = key, pages
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+    def draw(self):
+        self.pages[self.key] = self.canv.getPageNumber()
+
+def build_pdf_bundle(pairs: Sequence[Tuple[Any, Any]]) -> Tuple[bytes, Dict[str, Tuple[int, int]]]:
+    """Render several (incident, result) reports as one document in a single build pass.
+    Returns the PDF and each incident's 1-based (first, last) page range."""
+    buf = BytesIO()
+    doc = _doc(buf)
+    starts: Dict[str, int] = {}
+    story: List[Any] = []
+    for i, (incident, result) in enumerate(pairs):
+        if i:
+            story.append(PageBreak())
+        story.append(_PageMark(incident.id, starts))
+        story.extend(_story(incident, result))
+    doc.build(story)
+    order = [inc.id for inc, _ in pairs]
+    ends = [starts[k] - 1 for k in order[1:]] + [doc.page]
+    return buf.getvalue(), {k: (starts[k], end) for k, end in zip(order, ends)}
+
+# Candidate plans are plain-text two-column tables: no per-line Paragraph (and its
+# markup parser), bold labels come from the table style. Cells don't wrap on their
+# own, so long text is pre-split to the value column width.
+_CAND_WIDTHS = [90, 370]
+_CAND_FONT, _CAND_SIZE = "Helvetica", 9
+_CAND_TEXT_W = _CAND_WIDTHS[1] - 12  # minus the default 6pt left/right cell padding
+_CAND_STYLE = TableStyle([
+    ("FONTNAME", (0,0), (-1,-1), _CAND_FONT),
+    ("FONTNAME", (0,0), (0,-1), "Helvetica-Bold"),
+    ("FONTNAME", (1,0), (1,0), "Helvetica-Bold"),
+    ("FONTSIZE", (0,0), (-1,-1), _CAND_SIZE),
+    ("LEADING", (0,0), (-1,-1), 11),
+    ("VALIGN", (0,0), (-1,-1), "TOP"),
+    ("LINEBELOW", (0,0), (-1,0), 0.25, colors.grey),
+])
+_VIOLATION_STYLE = TableStyle([
+    ("FONTNAME", (0,0), (-1,-1), _CAND_FONT),
+    ("FONTNAME", (0,0), (0,-1), "Helvetica-Bold"),
+    ("FONTSIZE", (0,0), (-1,-1), _CAND_SIZE),
+    ("LEADING", (0,0), (-1,-1), 11),
+    ("VALIGN", (0,0), (-1,-1), "TOP"),
+    ("TEXTCOLOR", (0,0), (-1,-1), colors.HexColor("#991b1b")),
+])
+
+def _wrap(lines) -> str:
+    return "\n".join(
+        part
+        for line in lines
+        for part in (simpleSplit(str(line), _CAND_FONT, _CAND_SIZE, _CAND_TEXT_W) or [""])
+    )
+
+def _step_text(s: Dict[str, Any]) -> str:
+    parts = [f"{k}={v}" for k in _STEP_FIELDS if (v := s.get(k)) not in _BLANK]
+    if targets := s.get("targets"):
+        parts.append(f"targets={','.join(map(str, targets))}")
+    return f"• [{s.get('action_type') or 'read'}] {' '.join(parts)}".rstrip()
+
+def _violation_text(v: Any) -> str:
+    if isinstance(v, dict):
+        return f"• [{v.get('code') or '-'}] {v.get('message') or ''}".rstrip()
+    return f"• {v}"
+
+def _candidate_tables(c: Dict[str, Any]) -> List[Any]:
+    """Candidate dict as generate_candidates builds it (title, rationale, steps, ...)."""
+    violations = c.get("policy_violations") or []
+    mark = "✅" if c.get("policy_ok", not violations) else "⛔"
+    impact = c.get("predicted_impact") or {}
+    if isinstance(impact, dict):
+        impact = ", ".join(f"{k} {v}" for k, v in impact.items()) or "-"
+    data = [
+        ["Plan", _wrap([f"{mark} {c.get('title') or c.get('id') or 'Plan'}"])],
+        ["Rationale", _wrap([c.get("rationale") or "-"])],
+        ["Predicted Impact", _wrap([impact])],
+        ["Steps", _wrap(_step_text(s) for s in c.get("steps") or [])],
+    ]
+    out = [Table(data, colWidths=_CAND_WIDTHS, style=_CAND_STYLE, hAlign="LEFT")]
+    if violations:
+        out.append(Table(
+            [["Policy Violations", _wrap(_violation_text(v) for v in violations)]],
+            colWidths=_CAND_WIDTHS, style=_VIOLATION_STYLE, hAlign="LEFT",
+        ))
+    return out
+
+def _num(x: Any, nd: int = 4) -> str:
+    try:
+        return f"{float(x):.{nd}f}"
+    except (TypeError, ValueError):
+        return "-"
+
+def _story(incident, result: Dict[str, Any]) -> List[Any]:
+    """Report flowables for an Incident and the result dict pipeline.run_all stores."""
+    h1, h2, body = _H1, _H2, _BODY
 
     story = []
     story.append(Paragraph(f"Incident Report — {incident.id}", h1))
@@ -22,18 +147,13 @@ def build_pdf(incident, result) -> bytes:
 
     # Evidence
     story.append(Paragraph("Evidence", h2))
-    if result.evidence:
+    evidence = result.get("evidence") or []
+    if evidence:
         data = [["Title", "Score", "Source"]]
-        for e in result.evidence:
-            data.append([e.title, f"{e.score:.3f}", e.source_file or ""])
+        for e in evidence:
+            data.append([e.get("title") or "KB Document", _num(e.get("score"), 3), e.get("uri") or ""])
         tbl = Table(data, colWidths=[260, 60, 160])
-        tbl.setStyle(TableStyle([
-            ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#111827")),
-            ("TEXTCOLOR", (0,0), (-1,0), colors.whitesmoke),
-            ("GRID", (0,0), (-1,-1), 0.25, colors.grey),
-            ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
-            ("ROWBACKGROUNDS", (0,1), (-1,-1), [colors.whitesmoke, colors.lightgrey]),
-        ]))
+        tbl.setStyle(_EVIDENCE_STYLE)
         story.append(tbl)
     else:
         story.append(Paragraph("No evidence found.", body))
@@ -41,45 +161,29 @@ def build_pdf(incident, result) -> bytes:
 
     # Candidates
     story.append(Paragraph("Candidate Plans", h2))
-    for c in result.candidates:
-        mark = "✅" if not c.policy_violations else "⛔"
-        story.append(Paragraph(f"{mark} <b>{c.name}</b>", body))
-        story.append(Paragraph(f"<i>Rationale:</i> {c.rationale}", body))
-        story.append(Paragraph(f"<i>Predicted Impact:</i> {c.predicted_impact}", body))
-        if c.policy_violations:
-            story.append(Paragraph("<b>Policy Violations:</b>", body))
-            for v in c.policy_violations:
-                story.append(Paragraph(f"• {v}", body))
-        story.append(Paragraph("<b>Steps:</b>", body))
-        for s in c.steps:
-            story.append(Paragraph(f"• [{s.action_type}] {s.action}", body))
+    for c in result.get("candidates") or []:
+        story.extend(_candidate_tables(c))
         story.append(Spacer(1, 6))
 
-    # Validation
+    # Validation: one block of rows per validated plan
     story.append(Paragraph("Validation", h2))
-    if result.validation:
-        v = result.validation
-        data = [
-            ["Metric", "Before", "After", "Delta"],
-            ["error_rate", f"{v.before['error_rate']:.4f}", f"{v.after['error_rate']:.4f}", f"{v.kpi_deltas['error_rate']:.4f}"],
-            ["p95_ms", f"{v.before['p95_ms']:.1f}", f"{v.after['p95_ms']:.1f}", f"{v.kpi_deltas['p95_ms']:.1f}"],
-        ]
-        tbl = Table(data, colWidths=[120, 120, 120, 120])
-        tbl.setStyle(TableStyle([
-            ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#111827")),
-            ("TEXTCOLOR", (0,0), (-1,0), colors.whitesmoke),
-            ("GRID", (0,0), (-1,-1), 0.25, colors.grey),
-            ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
-        ]))
+    validations = result.get("validations") or []
+    if validations:
+        data = [["Plan", "Status", "Metric", "Before", "After", "Delta"]]
+        for entry in validations:
+            v = entry.get("result") or {}
+            before, after, deltas = v.get("before") or {}, v.get("after") or {}, v.get("kpi_deltas") or {}
+            for k in sorted(set(before) | set(after)) or ["-"]:
+                data.append([entry.get("plan_id") or "-", v.get("status") or "UNKNOWN", k,
+                             _num(before.get(k)), _num(after.get(k)), _num(deltas.get(k))])
+        tbl = Table(data, colWidths=[110, 60, 100, 70, 70, 70])
+        tbl.setStyle(_VALIDATION_STYLE)
         story.append(tbl)
-        story.append(Paragraph(f"Status: <b>{v.status}</b>", body))
     else:
         story.append(Paragraph("No validation executed.", body))
     story.append(Spacer(1, 10))
 
     # Summary / Policies
     story.append(Paragraph("Policy Summary", h2))
-    story.append(Paragraph(result.policy_summary or "All policies ✅", body))
-
-    doc.build(story)
-    return buf.getvalue()
+    story.append(Paragraph(result.get("policy_summary") or "All policies ✅", body))
+    return story
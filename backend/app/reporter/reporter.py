@@ -1,7 +1,8 @@
 # backend/app/reporter/reporter.py
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from datetime import datetime
+from itertools import chain
 
 
 def _as_iso(x: Any) -> Optional[str]:
@@ -19,42 +20,42 @@ def _fmt_float(x: Any, nd: int = 3) -> str:
         return "-"
 
 
+_STEP_FIELDS = ("cmd", "key", "value", "op", "version", "backup_id")
+_BLANK = (None, "", [])
+
+
 def _fmt_step(step: Dict[str, Any]) -> str:
     """Render a remediation step as a compact bullet."""
-    parts: List[str] = []
-    a = (step.get("action_type") or "read").lower()
-    svc = step.get("service") or "-"
-    env = step.get("env") or "-"
-    parts.append(f"*{a}* @{env}/{svc}")
+    g = step.get
+    a = (g("action_type") or "read").lower()
     # include common fields if present
-    for k in ("cmd", "key", "value", "op", "version", "backup_id"):
-        if step.get(k) not in (None, "", []):
-            parts.append(f"{k}={step[k]}")
-    targets = step.get("targets")
-    if targets:
+    parts = [f"*{a}* @{g('env') or '-'}/{g('service') or '-'}"]
+    parts += [f"{k}={v}" for k in _STEP_FIELDS if (v := g(k)) not in _BLANK]
+    if targets := g("targets"):
         parts.append(f"targets={targets}")
-    return " — " + ", ".join(parts)
+    return f" — {', '.join(parts)}"
 
 
-def _render_evidence(ev_list: List[Dict[str, Any]]) -> List[str]:
-    lines: List[str] = ["## Evidence", ""]
+def _render_evidence(ev_list: List[Dict[str, Any]]) -> Iterator[str]:
+    yield "## Evidence"
+    yield ""
     if not ev_list:
-        lines.append("- No evidence found.")
-        return lines
+        yield "- No evidence found."
+        return
     for ev in ev_list:
         title = ev.get("title") or "KB Document"
         uri = ev.get("uri") or ""
         score = ev.get("score")
         score_s = f" (score: {_fmt_float(score, 3)})" if score is not None else ""
-        lines.append(f"- **{title}**{score_s} — {uri}")
-    return lines
+        yield f"- **{title}**{score_s} — {uri}"
 
 
-def _render_candidates(cands: List[Dict[str, Any]]) -> List[str]:
-    lines: List[str] = ["## Candidates", ""]
+def _render_candidates(cands: List[Dict[str, Any]]) -> Iterator[str]:
+    yield "## Candidates"
+    yield ""
     if not cands:
-        lines.append("- No candidates generated.")
-        return lines
+        yield "- No candidates generated."
+        return
 
     for c in cands:
         title = c.get("title") or c.get("id") or "Plan"
@@ -64,118 +65,109 @@ def _render_candidates(cands: List[Dict[str, Any]]) -> List[str]:
         pred = c.get("predicted_impact") or {}
         ri = c.get("rationale") or ""
         status = "OK ✅" if ok else "BLOCKED ⛔"
-        lines.append(f"### {title}")
-        lines.append(f"- Env/Service: `{env}` / `{svc}`")
-        lines.append(f"- Policy: **{status}**")
+        yield f"### {title}"
+        yield f"- Env/Service: `{env}` / `{svc}`"
+        yield f"- Policy: **{status}**"
         if pred:
-            lines.append(f"- Predicted impact: error_rate_pct {pred.get('error_rate_pct')}, latency_p95_ms {pred.get('latency_p95_ms')}")
+            yield f"- Predicted impact: error_rate_pct {pred.get('error_rate_pct')}, latency_p95_ms {pred.get('latency_p95_ms')}"
         if ri:
-            lines.append(f"- Rationale: {ri}")
+            yield f"- Rationale: {ri}"
 
         steps = c.get("steps") or []
         if steps:
-            lines.append("- Steps:")
+            yield "- Steps:"
             for s in steps:
-                lines.append(f"  - {_fmt_step(s)}")
+                yield f"  - {_fmt_step(s)}"
 
         # Inline per-candidate validation (if present)
         v = c.get("validation")
         if v:
-            lines.append("- Validation:")
-            lines.append(f"  - Status: **{v.get('status','UNKNOWN')}**")
+            yield "- Validation:"
+            yield f"  - Status: **{v.get('status','UNKNOWN')}**"
             b = v.get("before") or {}
             a = v.get("after") or {}
             d = v.get("deltas") or {}
-            lines.append(
+            yield (
                 f"  - Before → After: "
                 f"err% {_fmt_float(b.get('error_rate_pct'))} → {_fmt_float(a.get('error_rate_pct'))}, "
                 f"p95 {_fmt_float(b.get('latency_p95_ms'))}ms → {_fmt_float(a.get('latency_p95_ms'))}ms"
             )
-            lines.append(
-                f"  - Δ (relative): err {_fmt_float(d.get('error_rate_drop_rel'))}, p95 {_fmt_float(d.get('latency_p95_drop_rel'))}"
-            )
+            yield f"  - Δ (relative): err {_fmt_float(d.get('error_rate_drop_rel'))}, p95 {_fmt_float(d.get('latency_p95_drop_rel'))}"
             if v.get("notes"):
-                lines.append(f"  - _{v['notes']}_")
+                yield f"  - _{v['notes']}_"
 
         # Policy violations details
         viols = c.get("policy_violations") or []
         if viols:
-            lines.append("- Policy violations:")
+            yield "- Policy violations:"
             for v in viols:
-                lines.append(f"  - [{v.get('code')}] {v.get('message')}")
-        lines.append("")  # spacing
-    return lines
+                yield f"  - [{v.get('code')}] {v.get('message')}"
+        yield ""  # spacing
 
 
-def _render_policy_summary(result: Dict[str, Any]) -> List[str]:
-    lines: List[str] = ["## Policy", ""]
-    lines.append(f"- Summary: {result.get('policy_summary', '-')}")
-    return lines
+def _render_policy_summary(result: Dict[str, Any]) -> Iterator[str]:
+    yield "## Policy"
+    yield ""
+    yield f"- Summary: {result.get('policy_summary', '-')}"
 
 
-def _render_validations_summary(result: Dict[str, Any]) -> List[str]:
-    lines: List[str] = ["## Validation (Summary)", ""]
+def _render_validations_summary(result: Dict[str, Any]) -> Iterator[str]:
+    yield "## Validation (Summary)"
+    yield ""
     vals = result.get("validations") or []
     if not vals:
-        lines.append("- No validation runs.")
-        return lines
+        yield "- No validation runs."
+        return
     for v in vals:
         rid = v.get("plan_id") or "-"
         rr = v.get("result") or {}
-        lines.append(f"- Plan `{rid}` → **{rr.get('status','UNKNOWN')}** "
-                     f"(errΔ={_fmt_float((rr.get('deltas') or {}).get('error_rate_drop_rel'))}, "
-                     f"p95Δ={_fmt_float((rr.get('deltas') or {}).get('latency_p95_drop_rel'))})")
-    return lines
+        d = rr.get("deltas") or {}
+        yield (f"- Plan `{rid}` → **{rr.get('status', 'UNKNOWN')}** "
+               f"(errΔ={_fmt_float(d.get('error_rate_drop_rel'))}, p95Δ={_fmt_float(d.get('latency_p95_drop_rel'))})")
 
 
-def to_markdown(incident, result: Dict[str, Any]) -> str:
-    """Render a complete, human-readable incident report in Markdown."""
-    lines: List[str] = []
-
-    # Header
+def _render_header(incident) -> Iterator[str]:
     inc_id = getattr(incident, "id", None) or (incident.get("id") if isinstance(incident, dict) else "")
     service = getattr(incident, "service", None) or (incident.get("service") if isinstance(incident, dict) else "")
     severity = getattr(incident, "severity", None) or (incident.get("severity") if isinstance(incident, dict) else "")
     cause = getattr(incident, "suspected_cause", None) or (incident.get("suspected_cause") if isinstance(incident, dict) else "")
     created = getattr(incident, "created_at", None) or (incident.get("created_at") if isinstance(incident, dict) else None)
 
-    lines.append(f"# Incident Report — {inc_id}")
-    lines.append("")
-    lines.append(f"- **Service:** `{service}`")
-    lines.append(f"- **Severity:** `{severity}`")
-    lines.append(f"- **Suspected cause:** {cause or '-'}")
+    yield f"# Incident Report — {inc_id}"
+    yield ""
+    yield f"- **Service:** `{service}`"
+    yield f"- **Severity:** `{severity}`"
+    yield f"- **Suspected cause:** {cause or '-'}"
     iso = _as_iso(created)
     if iso:
-        lines.append(f"- **Created at:** {iso}")
-    lines.append("")
-
-    # Evidence
-    lines += _render_evidence(result.get("evidence") or [])
-    lines.append("")
+        yield f"- **Created at:** {iso}"
 
-    # Candidates (with inline validation + violations)
-    lines += _render_candidates(result.get("candidates") or [])
-    lines.append("")
-
-    # Policy summary
-    lines += _render_policy_summary(result)
-    lines.append("")
-
-    # Validation summary table
-    lines += _render_validations_summary(result)
-    lines.append("")
 
+def _render_ticket(result: Dict[str, Any]) -> Iterator[str]:
     # Optional: ticketing info (if present in result)
     jira = result.get("jira")
     if jira:
-        lines.append("## Ticket")
         key = jira.get("key") or "-"
         url = jira.get("self") or ""
-        lines.append(f"- JIRA: **{key}** — {url}")
-        lines.append("")
+        yield "## Ticket"
+        yield f"- JIRA: **{key}** — {url}"
+        yield ""
+
 
-    # Footer
-    lines.append("---")
-    lines.append("_Generated by Incident Copilot_")
+_GAP = ("",)
+_FOOTER = ("---", "_Generated by Incident Copilot_")
 
-    return "\n".join(lines)
+
+def to_markdown(incident, result: Dict[str, Any]) -> str:
+    """Render a complete, human-readable incident report in Markdown."""
+    # sections are generators chained straight into one join (no per-section lists)
+    return "\n".join(chain(
+        _render_header(incident), _GAP,
+        _render_evidence(result.get("evidence") or []), _GAP,
+        # Candidates (with inline validation + violations)
+        _render_candidates(result.get("candidates") or []), _GAP,
+        _render_policy_summary(result), _GAP,
+        _render_validations_summary(result), _GAP,
+        _render_ticket(result),
+        _FOOTER,
+    ))
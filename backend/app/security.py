@@ -1,7 +1,8 @@
 
 from __future__ import annotations
-import json, os, time
-from typing import Dict, Set, List, Optional
+import json, os, time, hashlib, threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
 from fastapi import Header, HTTPException
 
 # Config
@@ -16,24 +17,24 @@ JWT_ISSUER   = os.getenv("JWT_ISSUER", "").strip()
 # Optional: map keys -> scopes (your existing feature)
 _raw = os.getenv("SCOPED_KEYS", "").strip()
 
-def _parse_scoped_keys(raw: str) -> Dict[str, Set[str]]:
+def _parse_scoped_keys(raw: str) -> Dict[str, FrozenSet[str]]:
     if not raw: return {}
     # JSON form takes precedence
     if raw.startswith("{"):
-        try: return {k: set(v) for k,v in json.loads(raw).items()}
+        try: return {k: frozenset(v) for k,v in json.loads(raw).items()}
         except Exception: return {}
     # "k1:run,execute; k2:kb,admin"
-    out: Dict[str, Set[str]] = {}
+    out: Dict[str, FrozenSet[str]] = {}
     try:
         for part in [p.strip() for p in raw.split(";") if p.strip()]:
             k, scopes = part.split(":", 1)
-            out[k.strip()] = set(s.strip() for s in scopes.split(",") if s.strip())
+            out[k.strip()] = frozenset(s.strip() for s in scopes.split(",") if s.strip())
     except Exception:
         return {}
     return out
 
-KEY_SCOPES: Dict[str, Set[str]] = _parse_scoped_keys(_raw)
-ALL_SCOPES = {"run","execute","kb","audit","admin"}
+KEY_SCOPES: Dict[str, FrozenSet[str]] = _parse_scoped_keys(_raw)
+ALL_SCOPES = frozenset({"run","execute","kb","audit","admin"})
 
 class AuthError(HTTPException):
     def __init__(self, msg: str, code: int = 401):
@@ -45,41 +46,81 @@ try:
 except Exception:
     jwt = None
 
-def _principal(sub: str, scopes: List[str], mode: str):
-    return {"sub": sub, "scopes": set(scopes), "mode": mode}
-
-def _ok_for(scopes_have: Set[str], required: List[str]) -> bool:
-    return set(required).issubset(scopes_have)
+def _principal(sub: str, scopes: Iterable[str], mode: str):
+    # frozensets (ALL_SCOPES, KEY_SCOPES values) are shared as-is, not copied per request
+    return {"sub": sub, "scopes": scopes if isinstance(scopes, frozenset) else frozenset(scopes), "mode": mode}
+
+def _ok_for(scopes_have: FrozenSet[str], required: FrozenSet[str]) -> bool:
+    return required <= scopes_have
+
+# jwt.decode arguments are fixed by env, so build them once
+_JWT_DECODE_KW: Dict[str, Any] = {
+    "algorithms": ["HS256"],
+    "options": {"verify_aud": bool(JWT_AUDIENCE)},
+    "audience": (JWT_AUDIENCE or None),
+    "issuer": (JWT_ISSUER or None),
+}
+
+# Verified bearer tokens -> principal, so a client reusing its token skips the HMAC check.
+# Entries live until the token's exp, capped at JWT_CACHE_TTL_S; oldest evicted past JWT_CACHE_MAX.
+JWT_CACHE_MAX = 1024
+JWT_CACHE_TTL_S = 60.0
+_JWT_CACHE: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_JWT_CACHE_LOCK = threading.Lock()
+
+def _jwt_cache_get(key: bytes) -> Optional[Dict[str, Any]]:
+    with _JWT_CACHE_LOCK:
+        hit = _JWT_CACHE.get(key)
+        if hit is None:
+            return None
+        if hit[0] <= time.time():
+            del _JWT_CACHE[key]
+            return None
+        _JWT_CACHE.move_to_end(key)
+        return dict(hit[1])
+
+def _jwt_cache_put(key: bytes, expires_at: float, principal: Dict[str, Any]) -> None:
+    with _JWT_CACHE_LOCK:
+        _JWT_CACHE[key] = (expires_at, dict(principal))
+        _JWT_CACHE.move_to_end(key)
+        while len(_JWT_CACHE) > JWT_CACHE_MAX:
+            _JWT_CACHE.popitem(last=False)
 
 def _verify_jwt(bearer: Optional[str]):
-    if DEMO_MODE: return _principal("demo", list(ALL_SCOPES), "demo")
+    if DEMO_MODE: return _principal("demo", ALL_SCOPES, "demo")
     if AUTH_MODE != "scoped_jwt": return None
     if not bearer: raise AuthError("Missing bearer token")
     if jwt is None: raise AuthError("PyJWT not installed on server")
+    key = hashlib.blake2b(bearer.encode("utf-8"), digest_size=16).digest()
+    cached = _jwt_cache_get(key)
+    if cached is not None:
+        return cached
     try:
-        data = jwt.decode(
-            bearer, JWT_SECRET, algorithms=["HS256"],
-            options={"verify_aud": bool(JWT_AUDIENCE)},
-            audience=(JWT_AUDIENCE or None),
-            issuer=(JWT_ISSUER or None)
-        )
+        data = jwt.decode(bearer, JWT_SECRET, **_JWT_DECODE_KW)
     except Exception as e:
         raise AuthError(f"Invalid token: {e}")
     # scopes can be 'scope' (space-delimited) or 'scopes' (array)
     raw = data.get("scope") or data.get("scopes") or []
     scopes = raw.split() if isinstance(raw,str) else list(raw)
     sub = data.get("sub") or data.get("uid") or "unknown"
-    if "exp" in data and data["exp"] < int(time.time()):
+    now = time.time()
+    if "exp" in data and data["exp"] < int(now):
         raise AuthError("Token expired")
-    return _principal(sub, scopes, "jwt")
+    p = _principal(sub, scopes, "jwt")
+    expires_at = now + JWT_CACHE_TTL_S
+    if "exp" in data:
+        expires_at = min(expires_at, float(data["exp"]))
+    _jwt_cache_put(key, expires_at, p)
+    return p
 
 def _verify_key(x_api_key: Optional[str]):
-    if DEMO_MODE: return _principal("demo", list(ALL_SCOPES), "demo")
+    if DEMO_MODE: return _principal("demo", ALL_SCOPES, "demo")
     if x_api_key and API_KEY and x_api_key == API_KEY:
         # full access (superuser) for ops
-        return _principal("apikey", list(ALL_SCOPES), "api_key")
-    if x_api_key and x_api_key in KEY_SCOPES:
-        return _principal("scopedkey", list(KEY_SCOPES[x_api_key]), "scoped_key")
+        return _principal("apikey", ALL_SCOPES, "api_key")
+    scopes = KEY_SCOPES.get(x_api_key) if x_api_key else None
+    if scopes is not None:
+        return _principal("scopedkey", scopes, "scoped_key")
     return None
 
 def require_scopes(required: List[str]):
@@ -90,6 +131,7 @@ def require_scopes(required: List[str]):
       - api_key:    X-API-Key==API_KEY => all scopes; or SCOPED_KEYS per-key scopes.
       - scoped_jwt: X-API-Key==API_KEY => all scopes; else Bearer JWT scopes required.
     """
+    req_fs = frozenset(required)
     def _dep(
         x_api_key: Optional[str] = Header(default=None, alias="X-API-Key"),
         authorization: Optional[str] = Header(default=None, alias="Authorization"),
@@ -110,8 +152,7 @@ def require_scopes(required: List[str]):
             return p
 
         # Enforce scopes for scoped-key or jwt
-        have = set(p["scopes"])
-        if not _ok_for(have, required):
+        if not _ok_for(p["scopes"], req_fs):
             raise AuthError(f"Insufficient scope. Need: {required}", 403)
         return p
     return _dep
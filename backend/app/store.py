@@ -1,95 +1,325 @@
 ﻿from __future__ import annotations
-import json, uuid
+import time, uuid, atexit, asyncio, threading
+import orjson
 import datetime as dt
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict
-from .config import STATE_DIR as _STATE_DIR
+from urllib.parse import quote, unquote
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from .config import STATE_DIR as _STATE_DIR, RESULTS_MAX, RESULTS_TTL_S
+
+class ResultCache(MutableMapping):
+    """Dict-compatible LRU + TTL map: at most `maxsize` entries, each dropped `ttl` seconds
+    after it was last written. Reads refresh recency, not the TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = self.misses = self.expired = self.evicted = 0
+
+    def _expire(self, now: float) -> None:
+        dead = [k for k, (exp, _) in self._data.items() if exp <= now]
+        for k in dead:
+            del self._data[k]
+        self.expired += len(dead)
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                    self.expired += 1
+                self.misses += 1
+                raise KeyError(key)
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+            self._expire(now)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evicted += 1
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            del self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            item = self._data.get(key)  # type: ignore[arg-type]
+            return item is not None and item[0] > time.monotonic()
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            self._expire(time.monotonic())
+            return iter(list(self._data))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "ttl_s": self.ttl,
+                    "hits": self.hits, "misses": self.misses,
+                    "expired": self.expired, "evicted": self.evicted}
 
 # in-memory state
 INCIDENTS: Dict[str, Any] = {}
-RESULTS: Dict[str, Any] = {}
+# bounded: long-running processes would otherwise keep every run's result forever
+RESULTS: ResultCache = ResultCache(RESULTS_MAX, RESULTS_TTL_S)
 APPROVALS: Dict[str, bool] = {}
 
 # files
 STATE_DIR = Path(_STATE_DIR)
 STATE_DIR.mkdir(parents=True, exist_ok=True)
+STATE_INCIDENTS_DIR = STATE_DIR / "incidents"   # one <id>.json shard per incident
+STATE_RESULTS_DIR   = STATE_DIR / "results"     # one <id>.json shard per pipeline result
+STATE_APPROVALS     = STATE_DIR / "approvals.json"
+# pre-shard monoliths, folded into shards (then removed) by load_state
 STATE_INCIDENTS = STATE_DIR / "incidents.json"
 STATE_RESULTS   = STATE_DIR / "results.json"
-STATE_APPROVALS = STATE_DIR / "approvals.json"
 
-def _json_default(o: Any) -> Any:
+try:
+    from pydantic import BaseModel as _PydBase  # type: ignore
+except Exception:  # pragma: no cover
+    _PydBase = None  # type: ignore
+
+def _pyd_dump(o: Any) -> Any:
     # pydantic v2/v1 support
-    try:
-        from pydantic import BaseModel as _PydBase  # type: ignore
-        if isinstance(o, _PydBase):
-            if hasattr(o, "model_dump"):
-                return o.model_dump()
-            if hasattr(o, "dict"):
-                return o.dict()
-    except Exception:
-        pass
-    if isinstance(o, (dt.datetime, dt.date, dt.time)):
-        return o.isoformat()
-    if isinstance(o, Path):
-        return str(o)
-    if isinstance(o, uuid.UUID):
-        return str(o)
-    if isinstance(o, set):
-        return list(o)
-    if isinstance(o, (bytes, bytearray)):
-        return o.decode("utf-8", errors="replace")
-    if hasattr(o, "__dict__"):
-        return {k: _model_to_dict(v) for k, v in vars(o).items()}
-    raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
-
-def _model_to_dict(x: Any) -> Any:
-    if x is None or isinstance(x, (str, int, float, bool)):
-        return x
-    if isinstance(x, (list, tuple, set)):
-        return [_model_to_dict(v) for v in x]
-    if isinstance(x, dict):
-        return {k: _model_to_dict(v) for k, v in x.items()}
-    try:
-        return _json_default(x)
-    except TypeError:
-        return str(x)
+    return o.model_dump() if hasattr(o, "model_dump") else o.dict()
+
+def _iso(o: Any) -> str:
+    return o.isoformat()
+
+def _decode(o: Any) -> str:
+    return o.decode("utf-8", errors="replace")
+
+def _vars_or_str(o: Any) -> Any:
+    # plain objects as their attribute dict (orjson encodes the values); anything else as text
+    return vars(o) if hasattr(o, "__dict__") else str(o)
 
-def _write_atomic(path: Path, text: str) -> None:
+# type -> encoder; subclasses (PosixPath, pydantic models, namedtuples, ...) are
+# resolved through the MRO on first sight and memoized, so each value costs one dict
+# lookup. orjson walks dicts/lists/dataclasses itself and only calls back for these.
+_DEFAULT_DISPATCH: Dict[type, Callable[[Any], Any]] = {
+    dt.datetime: _iso, dt.date: _iso, dt.time: _iso,
+    Path: str, uuid.UUID: str, set: list, tuple: list,
+    bytes: _decode, bytearray: _decode,
+}
+if _PydBase is not None:
+    _DEFAULT_DISPATCH[_PydBase] = _pyd_dump
+
+def _default_handler(t: type) -> Callable[[Any], Any]:
+    h = _DEFAULT_DISPATCH.get(t)
+    if h is None:
+        h = next((_DEFAULT_DISPATCH[b] for b in t.__mro__[1:] if b in _DEFAULT_DISPATCH), _vars_or_str)
+        _DEFAULT_DISPATCH[t] = h
+    return h
+
+def _json_default(o: Any) -> Any:
+    return _default_handler(type(o))(o)
+
+def _write_atomic(path: Path, data: bytes) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(text, encoding="utf-8")
+    tmp.write_bytes(data)
     tmp.replace(path)
 
+# orjson encodes datetime/UUID/numpy natively; _json_default only sees the rest
+_ORJSON_OPTS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, option=_ORJSON_OPTS, default=_json_default)
+
+# ---------- Sharded layout ----------
+# Incidents and results are stored one file per id, so a change rewrites one small
+# shard instead of re-encoding the whole map. Approvals stay a single small file.
+LOAD_WORKERS = 8
+
+def _shard_path(root: Path, key: str) -> Path:
+    name = quote(str(key), safe="")
+    if name.startswith("."):
+        name = "%2E" + name[1:]  # never "." / ".." / hidden files
+    return root / f"{name}.json"
+
+def _write_shard(root: Path, mapping: Any, key: str, drop_missing: bool = True) -> None:
+    try:
+        value = mapping[key]
+    except KeyError:
+        # deleted from memory: drop the shard too (unless absence only means "not cached")
+        if drop_missing:
+            _shard_path(root, key).unlink(missing_ok=True)
+        return
+    _write_atomic(_shard_path(root, key), _dumps(value))
+
+def save_incident(incident_id: str) -> None:
+    _write_shard(STATE_INCIDENTS_DIR, INCIDENTS, incident_id)
+
+def save_result(incident_id: str) -> None:
+    # RESULTS bounds memory, not storage: an evicted/expired result keeps its shard
+    _write_shard(STATE_RESULTS_DIR, RESULTS, incident_id, drop_missing=False)
+
+def save_approvals() -> None:
+    _write_atomic(STATE_APPROVALS, _dumps(dict(APPROVALS)))
+
 def save_state() -> None:
-    _write_atomic(
-        STATE_INCIDENTS,
-        json.dumps({k: _model_to_dict(v) for k, v in INCIDENTS.items()},
-                   indent=2, ensure_ascii=False, default=_json_default),
-    )
-    _write_atomic(
-        STATE_RESULTS,
-        json.dumps({k: _model_to_dict(v) for k, v in RESULTS.items()},
-                   indent=2, ensure_ascii=False, default=_json_default),
-    )
-    _write_atomic(
-        STATE_APPROVALS,
-        json.dumps(APPROVALS, indent=2, ensure_ascii=False, default=_json_default),
-    )
+    """Rewrite every shard and approvals.json now, on the calling thread."""
+    with _WRITE_LOCK:
+        for iid in list(INCIDENTS):
+            save_incident(iid)
+        for iid in list(RESULTS):
+            save_result(iid)
+        save_approvals()
 
-def load_state() -> None:
-    def _load(p: Path, default):
-        if not p.exists():
-            return default
-        return json.loads(p.read_text(encoding="utf-8"))
+# ---------- Debounced persistence ----------
+# Mutators call mark_dirty(); a daemon thread wakes every FLUSH_INTERVAL_S and
+# writes only the shards that changed, so a burst costs one write per id.
+FLUSH_INTERVAL_S = 0.1
+_SAVERS = {"inc": save_incident, "res": save_result}
+_DIRTY: Set[Tuple[str, str]] = set()  # ("inc" | "res", id) or ("app", "")
+_DIRTY_LOCK = threading.Lock()
+_WRITE_LOCK = threading.Lock()   # flusher vs. explicit save_state/flush_state
+_flusher: Optional[threading.Thread] = None
+
+def mark_dirty(which: str, *ids: str) -> None:
+    """Queue ("inc" | "res", ids...) shards or "app" (approvals.json) for the next flush."""
+    with _DIRTY_LOCK:
+        _DIRTY.update([(which, i) for i in ids] if ids else [(which, "")])
+    _ensure_flusher()
+
+def _write_dirty(which: str, key: str) -> None:
+    saver = _SAVERS.get(which)
+    if saver is not None:
+        saver(key)
+    elif which == "app":
+        save_approvals()
+
+def flush_state() -> None:
+    """Write whatever is dirty right now (shutdown, tests). Failed shards stay dirty."""
+    with _DIRTY_LOCK:
+        items = set(_DIRTY)
+        _DIRTY.clear()
+    failed: Set[Tuple[str, str]] = set()
+    with _WRITE_LOCK:
+        for which, key in items:
+            try:
+                _write_dirty(which, key)
+            except Exception:
+                # e.g. a map mutated mid-serialization or a full disk: retry next tick
+                failed.add((which, key))
+    if failed:
+        with _DIRTY_LOCK:
+            _DIRTY.update(failed)
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(FLUSH_INTERVAL_S)
+        if _DIRTY:
+            flush_state()
+
+def _ensure_flusher() -> None:
+    global _flusher
+    if _flusher is not None:
+        return
+    with _DIRTY_LOCK:
+        if _flusher is None:
+            t = threading.Thread(target=_flush_loop, name="state-flusher", daemon=True)
+            t.start()
+            _flusher = t
+
+atexit.register(flush_state)
+
+def _read_json(p: Path) -> Any:
+    return orjson.loads(p.read_bytes())
+
+def _read_shard(p: Path) -> Optional[Tuple[str, Any]]:
     try:
-        INCIDENTS.update(_load(STATE_INCIDENTS, {}))
+        return unquote(p.stem), _read_json(p)
     except Exception:
-        INCIDENTS.clear()
+        return None  # torn/corrupt shard: skip it, the rest still loads
+
+def _load_shards(root: Path, limit: Optional[int] = None, max_age: Optional[float] = None) -> List[Tuple[str, Any]]:
+    """(id, value) per readable shard, oldest first. For a bounded map: only shards written
+    within `max_age` seconds, and the newest `limit` of those; the rest stay on disk untouched."""
+    if not root.is_dir():
+        return []
+    stamped = sorted((p.stat().st_mtime, p) for p in root.glob("*.json"))
+    if max_age is not None:
+        cutoff = time.time() - max_age
+        stamped = [(m, p) for m, p in stamped if m > cutoff]
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as pool:
+        loaded = [kv for kv in pool.map(_read_shard, [p for _, p in stamped]) if kv is not None]
+    # limited after reading, so torn shards don't take the place of good ones
+    return loaded[max(0, len(loaded) - limit):] if limit is not None else loaded
+
+def _migrate_monolith(path: Path, mapping: Any, root: Path) -> None:
+    """Fold a pre-shard <name>.json into per-id shards, then remove it."""
+    if not path.exists():
+        return
     try:
-        RESULTS.update(_load(STATE_RESULTS, {}))
+        old = _read_json(path)
     except Exception:
-        RESULTS.clear()
+        return
+    root.mkdir(parents=True, exist_ok=True)
+    for k, v in old.items():
+        if k not in mapping:
+            mapping[k] = v
+            # written from v: a bounded mapping may already have evicted k again
+            _write_atomic(_shard_path(root, k), _dumps(v))
+    path.unlink(missing_ok=True)
+
+def _read_approvals() -> Dict[str, bool]:
+    return _read_json(STATE_APPROVALS) if STATE_APPROVALS.exists() else {}
+
+def _state_sources() -> List[Callable[[], Any]]:
+    # incidents, results, approvals: independent reads, so they can overlap
+    return [
+        partial(_load_shards, STATE_INCIDENTS_DIR),
+        # only what RESULTS would hold (newest maxsize, not past their TTL)
+        partial(_load_shards, STATE_RESULTS_DIR, limit=RESULTS.maxsize, max_age=RESULTS.ttl),
+        _read_approvals,
+    ]
+
+def _guarded(read: Callable[[], Any]) -> Any:
     try:
-        APPROVALS.update(_load(STATE_APPROVALS, {}))
+        return read()
     except Exception:
-        APPROVALS.clear()
+        return None  # unreadable: start that map empty
+
+def _apply_loaded(incidents: Any, results: Any, approvals: Any) -> None:
+    for mapping, loaded in ((INCIDENTS, incidents), (RESULTS, results), (APPROVALS, approvals)):
+        if loaded is None:
+            mapping.clear()
+        else:
+            mapping.update(loaded)
+    _migrate_monolith(STATE_INCIDENTS, INCIDENTS, STATE_INCIDENTS_DIR)
+    _migrate_monolith(STATE_RESULTS, RESULTS, STATE_RESULTS_DIR)
+    _ensure_flusher()
+
+def load_state() -> None:
+    sources = _state_sources()
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        loaded = list(pool.map(_guarded, sources))
+    _apply_loaded(*loaded)
+
+async def aload_state() -> None:
+    """load_state for the event loop: the three sources are read concurrently in worker threads."""
+    loaded = await asyncio.gather(*(asyncio.to_thread(_guarded, read) for read in _state_sources()))
+    await asyncio.to_thread(_apply_loaded, *loaded)  # migration/pruning touch the disk too
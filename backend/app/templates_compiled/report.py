@@ -0,0 +1,132 @@
+# Generated by scripts/build_templates.py from templates/report.html; do not edit.
+# flake8: noqa
+SOURCE_SHA1 = '05a530eaf3fb1b408dab01d65e9e0939bbbc7636'
+from ..reporter.html import _env as environment
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'report.html'
+
+def root(context, missing=missing, environment=environment):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_incident = resolve('incident')
+    l_0_result = resolve('result')
+    try:
+        t_1 = environment.filters['format']
+    except KeyError:
+        @internalcode
+        def t_1(*unused):
+            raise TemplateRuntimeError("No filter named 'format' found.")
+    pass
+    yield '<!doctype html>\n<html>\n<head>\n  <meta charset="utf-8">\n  <title>Incident '
+    yield escape(environment.getattr((undefined(name='incident') if l_0_incident is missing else l_0_incident), 'id'))
+    yield '</title>\n  <meta name="viewport" content="width=device-width, initial-scale=1">\n  <style>\n    :root { --ink:#0f172a; --muted:#64748b; --ok:#16a34a; --err:#dc2626; --border:#e2e8f0; }\n    body{ font-family: ui-sans-serif,system-ui,Segoe UI,Roboto,Inter,sans-serif; margin:24px; color:var(--ink); }\n    h1{ margin:0 0 6px }\n    .muted{ color:var(--muted) }\n    .card{ border:1px solid var(--border); border-radius:12px; padding:16px; margin:16px 0; }\n    table{ width:100%; border-collapse:collapse; font-size:14px }\n    th,td{ text-align:left; padding:8px; border-bottom:1px solid var(--border) }\n    .badge{ display:inline-block; padding:2px 8px; border:1px solid var(--border); border-radius:999px; margin-right:6px; }\n    .ok{ color:var(--ok) } .err{ color:var(--err) }\n    @media print {\n      .no-print { display:none }\n      body{ margin:0 }\n      .card{ break-inside: avoid }\n    }\n  </style>\n</head>\n<body>\n  <div class="no-print" style="text-align:right">\n    <button onclick="window.print()">Print</button>\n  </div>\n\n  <h1>Incident Report — '
+    yield escape(environment.getattr((undefined(name='incident') if l_0_incident is missing else l_0_incident), 'id'))
+    yield '</h1>\n  <div class="muted">\n    Service: <b>'
+    yield escape(environment.getattr((undefined(name='incident') if l_0_incident is missing else l_0_incident), 'service'))
+    yield '</b> •\n    Severity: <b>'
+    yield escape(environment.getattr((undefined(name='incident') if l_0_incident is missing else l_0_incident), 'severity'))
+    yield '</b> •\n    Created: <b>'
+    yield escape(environment.getattr((undefined(name='incident') if l_0_incident is missing else l_0_incident), 'created_at'))
+    yield '</b>\n    '
+    if environment.getattr((undefined(name='incident') if l_0_incident is missing else l_0_incident), 'suspected_cause'):
+        pass
+        yield ' • Suspected cause: <b>'
+        yield escape(environment.getattr((undefined(name='incident') if l_0_incident is missing else l_0_incident), 'suspected_cause'))
+        yield '</b>'
+    yield '\n  </div>\n\n  <div class="card">\n    <h2>Evidence</h2>\n    '
+    if ((undefined(name='result') if l_0_result is missing else l_0_result) and environment.getattr((undefined(name='result') if l_0_result is missing else l_0_result), 'evidence')):
+        pass
+        yield '\n    <table>\n      <thead><tr><th>Title</th><th>Score</th><th>Source</th></tr></thead>\n      <tbody>\n        '
+        for l_1_e in environment.getattr((undefined(name='result') if l_0_result is missing else l_0_result), 'evidence'):
+            _loop_vars = {}
+            pass
+            yield '\n        <tr>\n          <td>'
+            yield escape(environment.getattr(l_1_e, 'title'))
+            yield '</td>\n          <td>'
+            yield escape(t_1('%.3f', (environment.getattr(l_1_e, 'score') or 0)))
+            yield '</td>\n          <td>'
+            yield escape((environment.getattr(l_1_e, 'source_file') or ''))
+            yield '</td>\n        </tr>\n        '
+        l_1_e = missing
+        yield '\n      </tbody>\n    </table>\n    '
+    else:
+        pass
+        yield '\n      <div class="muted">No evidence found.</div>\n    '
+    yield '\n  </div>\n\n  <div class="card">\n    <h2>Candidate Remediations</h2>\n    '
+    if ((undefined(name='result') if l_0_result is missing else l_0_result) and environment.getattr((undefined(name='result') if l_0_result is missing else l_0_result), 'candidates')):
+        pass
+        yield '\n      '
+        for l_1_c in environment.getattr((undefined(name='result') if l_0_result is missing else l_0_result), 'candidates'):
+            _loop_vars = {}
+            pass
+            yield '\n        <h3>'
+            yield escape(environment.getattr(l_1_c, 'name'))
+            yield ' '
+            if environment.getattr(l_1_c, 'policy_violations'):
+                pass
+                yield '<span class="badge err">⛔ Policy issues</span>'
+            else:
+                pass
+                yield '<span class="badge ok">✅ Policies OK</span>'
+            yield '</h3>\n        <div><b>Rationale:</b> '
+            yield escape(environment.getattr(l_1_c, 'rationale'))
+            yield '</div>\n        <div><b>Predicted Impact:</b> '
+            yield escape(environment.getattr(l_1_c, 'predicted_impact'))
+            yield '</div>\n        '
+            if environment.getattr(l_1_c, 'policy_violations'):
+                pass
+                yield '\n          <div><b>Policy Violations:</b>\n            <ul>\n            '
+                for l_2_v in environment.getattr(l_1_c, 'policy_violations'):
+                    _loop_vars = {}
+                    pass
+                    yield '<li>'
+                    yield escape(l_2_v)
+                    yield '</li>'
+                l_2_v = missing
+                yield '\n            </ul>\n          </div>\n        '
+            yield '\n        <div><b>Steps:</b>\n          <ul>\n            '
+            for l_2_s in environment.getattr(l_1_c, 'steps'):
+                _loop_vars = {}
+                pass
+                yield '<li>['
+                yield escape(environment.getattr(l_2_s, 'action_type'))
+                yield '] '
+                yield escape(environment.getattr(l_2_s, 'action'))
+                yield '</li>'
+            l_2_s = missing
+            yield '\n          </ul>\n        </div>\n        <hr/>\n      '
+        l_1_c = missing
+        yield '\n    '
+    else:
+        pass
+        yield '\n      <div class="muted">No candidates available.</div>\n    '
+    yield '\n  </div>\n\n  <div class="card">\n    <h2>Validation</h2>\n    '
+    if ((undefined(name='result') if l_0_result is missing else l_0_result) and environment.getattr((undefined(name='result') if l_0_result is missing else l_0_result), 'validation')):
+        pass
+        yield '\n      <table>\n        <thead><tr><th>Metric</th><th>Before</th><th>After</th><th>Delta</th></tr></thead>\n        <tbody>\n          <tr><td>error_rate</td><td>'
+        yield escape(t_1('%.4f', environment.getattr(environment.getattr(environment.getattr((undefined(name='result') if l_0_result is missing else l_0_result), 'validation'), 'before'), 'error_rate')))
+        yield '</td><td>'
+        yield escape(t_1('%.4f', environment.getattr(environment.getattr(environment.getattr((undefined(name='result') if l_0_result is missing else l_0_result), 'validation'), 'after'), 'error_rate')))
+        yield '</td><td>'
+        yield escape(t_1('%.4f', environment.getattr(environment.getattr(environment.getattr((undefined(name='result') if l_0_result is missing else l_0_result), 'validation'), 'kpi_deltas'), 'error_rate')))
+        yield '</td></tr>\n          <tr><td>p95_ms</td><td>'
+        yield escape(t_1('%.1f', environment.getattr(environment.getattr(environment.getattr((undefined(name='result') if l_0_result is missing else l_0_result), 'validation'), 'before'), 'p95_ms')))
+        yield '</td><td>'
+        yield escape(t_1('%.1f', environment.getattr(environment.getattr(environment.getattr((undefined(name='result') if l_0_result is missing else l_0_result), 'validation'), 'after'), 'p95_ms')))
+        yield '</td><td>'
+        yield escape(t_1('%.1f', environment.getattr(environment.getattr(environment.getattr((undefined(name='result') if l_0_result is missing else l_0_result), 'validation'), 'kpi_deltas'), 'p95_ms')))
+        yield '</td></tr>\n        </tbody>\n      </table>\n      <div>Status: <b>'
+        yield escape(environment.getattr(environment.getattr((undefined(name='result') if l_0_result is missing else l_0_result), 'validation'), 'status'))
+        yield '</b></div>\n    '
+    else:
+        pass
+        yield '\n      <div class="muted">No validation executed.</div>\n    '
+    yield '\n  </div>\n\n  <div class="card">\n    <h2>Policy Summary</h2>\n    <div>'
+    yield escape((environment.getattr((undefined(name='result') if l_0_result is missing else l_0_result), 'policy_summary') or 'All policies ✅'))
+    yield '</div>\n  </div>\n</body>\n</html>'
+
+blocks = {}
+debug_info = '5=20&29=22&31=24&32=26&33=28&34=30&39=36&43=39&45=43&46=45&47=47&59=55&60=58&61=62&62=71&63=73&64=75&67=78&73=87&85=103&89=106&90=112&93=118&101=124'
\ No newline at end of file
@@ -0,0 +1,96 @@
+# backend/app/tests/test_audit.py
+from app import audit
+
+def test_tail_lines_reads_backwards_across_windows(tmp_path, monkeypatch):
+    p = tmp_path / "audit.log"
+    lines = [f'{{"i": {i}, "pad": "{"x" * (i % 50)}"}}' for i in range(500)]
+    p.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    monkeypatch.setattr(audit, "TAIL_BLOCK", 128)
+
+    assert audit.tail_lines(7, p) == lines[-7:]
+    assert audit.tail_lines(1000, p) == lines
+    assert audit.tail_lines(3, tmp_path / "missing.log") == []
+
+def test_listeners_fire_after_batch_write(tmp_path, monkeypatch):
+    import threading
+    audit._shutdown()            # retire any writer still bound to the real log
+    audit._writer_thread = None
+    monkeypatch.setattr(audit, "AUDIT_FILE", tmp_path / "audit.log")
+    hit = threading.Event()
+    audit.add_listener(hit.set)
+    try:
+        audit.write_event("unit_test", {"x": 1})
+        assert hit.wait(2.0)
+        assert "unit_test" in (tmp_path / "audit.log").read_text(encoding="utf-8")
+    finally:
+        audit.remove_listener(hit.set)
+        audit._shutdown()
+        audit._writer_thread = None
+
+def test_writer_retries_only_the_unwritten_tail(tmp_path, monkeypatch):
+    import os
+    import queue
+    monkeypatch.setattr(audit, "AUDIT_FILE", tmp_path / "audit.log")
+    q = queue.Queue()
+    monkeypatch.setattr(audit, "_audit_q", q)
+    real_write, calls = os.write, []
+
+    def flaky_write(fd, data):
+        calls.append(len(data))
+        if len(calls) == 1:  # short write: half the batch lands...
+            return real_write(fd, bytes(data[: len(data) // 2]))
+        if len(calls) == 2:  # ...then the disk errors
+            raise OSError(28, "No space left on device")
+        return real_write(fd, data)
+
+    monkeypatch.setattr(audit.os, "write", flaky_write)
+    q.put(b"record-1\n")
+    q.put(b"record-2\n")
+    q.put(audit._STOP)
+    audit._writer()
+
+    assert calls == [18, 9, 9]
+    assert (tmp_path / "audit.log").read_bytes() == b"record-1\nrecord-2\n"
+
+def test_write_events_queues_one_contiguous_blob(monkeypatch):
+    import orjson
+    queued = []
+    monkeypatch.setattr(audit, "AUDIT_FORMAT", "json")
+    monkeypatch.setattr(audit, "_ensure_writer", lambda: None)
+    monkeypatch.setattr(audit, "_enqueue", queued.append)
+
+    audit.write_events([(1.0, "a", {"x": 1}), (2.0, "b", None)])
+    audit.write_events([])
+
+    assert len(queued) == 1
+    recs = [orjson.loads(ln) for ln in queued[0].splitlines()]
+    assert recs == [{"ts": 1.0, "kind": "a", "payload": {"x": 1}}, {"ts": 2.0, "kind": "b", "payload": {}}]
+
+def test_stream_decodes_msgpack_records(tmp_path, monkeypatch):
+    import asyncio
+    import msgpack
+    import orjson
+    from app import main
+    p = tmp_path / "audit.mpk"
+    p.write_bytes(msgpack.packb({"kind": "old"}))  # before the stream opened: not replayed
+    monkeypatch.setattr(main, "AUDIT_FORMAT", "msgpack")
+    monkeypatch.setattr(main, "AUDIT_FILE", p)
+
+    async def run():
+        it = (await main.audit_stream(None)).body_iterator
+        first = asyncio.ensure_future(it.__anext__())
+        await asyncio.sleep(0.05)
+        rec = msgpack.packb({"kind": "new", "payload": {"msg": "ünïcode"}}, use_bin_type=True)
+        with p.open("ab") as f:  # a record split across two writes
+            f.write(rec[:5]); f.flush()
+            audit._notify()
+            await asyncio.sleep(0.05)
+            f.write(rec[5:])
+        audit._notify()
+        frame = await asyncio.wait_for(first, 2.0)
+        await it.aclose()
+        return frame
+
+    frame = asyncio.run(run())
+    assert frame.startswith("data: ") and frame.endswith("\n\n")
+    assert orjson.loads(frame[6:]) == {"kind": "new", "payload": {"msg": "ünïcode"}}
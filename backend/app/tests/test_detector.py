@@ -46,3 +46,11 @@ def test_severity_high_extreme_single():
     sigs2 = [{"name":"latency_p95_ms","value": 1600, "unit":"ms", "window_s":60}]
     assert infer_severity(sigs1) == "HIGH"
     assert infer_severity(sigs2) == "HIGH"
+
+def test_normalize_skips_copy_when_canonical():
+    sigs = normalize([
+        {"name": "5xx_rate", "value": 0.7, "unit": "%", "window_s": 60},
+        {"name": "latency_p95", "value": 900.0, "unit": "ms", "window_s": 60},
+    ])
+    assert normalize(sigs) is sigs  # second pass is a no-op
+    assert normalize(sigs) == sigs
@@ -0,0 +1,45 @@
+# backend/app/tests/test_embedding.py
+from app.embedding import embed_texts
+
+def test_embed_shape_and_norm():
+    vecs = embed_texts(["DB pool exhausted", "", "rollback rollback deploy"], dim=64)
+    assert len(vecs) == 3
+    assert all(len(v) == 64 for v in vecs)
+    assert abs(sum(x * x for x in vecs[0]) - 1.0) < 1e-5
+    assert all(x == 0.0 for x in vecs[1])  # empty text stays a zero vector
+
+def test_embed_deterministic_and_case_insensitive():
+    a = embed_texts(["Cache Warm"])[0]
+    b = embed_texts(["cache warm"])[0]
+    assert a == b
+
+def test_onnx_embedding_length_batches_match_one_padded_batch():
+    import numpy as np
+    import pytest
+    pytest.importorskip("onnxruntime")
+    tokenizers = pytest.importorskip("tokenizers")
+    from app.investigators.onnx_embedding import ORTEmbedding
+
+    vocab = {"[PAD]": 0, "[UNK]": 1, **{w: i + 2 for i, w in enumerate("db pool cache warm rollback deploy a b c".split())}}
+    tok = tokenizers.Tokenizer(tokenizers.models.WordLevel(vocab, unk_token="[UNK]"))
+    tok.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    table = np.random.default_rng(0).normal(size=(len(vocab), 8)).astype(np.float32)
+    widths = []
+
+    class Session:  # token-wise lookup stands in for the transformer
+        def run(self, _, feeds):
+            widths.append(feeds["input_ids"].shape)
+            return [table[feeds["input_ids"]]]
+
+    ef = ORTEmbedding.__new__(ORTEmbedding)
+    ef._tok, ef._sess, ef._inputs, ef.batch_size = tok, Session(), {"input_ids", "attention_mask"}, 2
+    docs = ["db pool", "a b c a b c a b c", "cache", "rollback deploy db pool cache", "warm"]
+    got = np.array(ef(docs))
+
+    tok.enable_padding()  # reference: everything padded to the longest doc in one run
+    enc = tok.encode_batch(docs)
+    ids = np.array([e.ids for e in enc])
+    mask = np.array([e.attention_mask for e in enc])
+    want = ef._embed(ids, mask)
+    assert np.allclose(got, want, atol=1e-6)
+    assert widths[:3] == [(2, 1), (2, 5), (1, 9)]  # sorted by length; short docs never padded to 9
@@ -0,0 +1,102 @@
+# backend/app/tests/test_executor.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app import executor
+from app.executor import execute_plan, _normalize_plan, _plan_waves
+
+INC = SimpleNamespace(id="inc-0001")
+
+@pytest.fixture
+def audit_events(monkeypatch):
+    """Capture executor audit events instead of appending to the real audit log."""
+    events = []
+    monkeypatch.setattr(executor, "write_event", lambda kind, payload: events.append((kind, payload)))
+    return events
+
+def _waves(steps):
+    return _plan_waves(steps, _normalize_plan(steps))
+
+def test_reads_share_a_wave_writes_serialize():
+    steps = [
+        {"action_type": "read"},
+        {"action_type": "observe"},
+        {"action_type": "config_change", "key": "a", "value": 1},
+        {"action_type": "scale", "targets": ["x"], "replicas": 2},
+        {"action_type": "read"},
+    ]
+    assert _waves(steps) == [[0, 1], [2], [3], [4]]
+
+def test_explicit_depends_on():
+    steps = [
+        {"action_type": "restart", "targets": ["x"]},
+        {"action_type": "read", "depends_on": []},
+        {"action_type": "read", "depends_on": [0]},
+    ]
+    assert _waves(steps) == [[0, 1], [2]]
+
+def test_execute_dry_run_success_ordered(audit_events):
+    plan = {"id": "p1", "steps": [
+        {"action_type": "read", "env": "staging"},
+        {"action_type": "observe", "env": "staging"},
+        {"action_type": "config_change", "env": "staging", "key": "k", "value": "v"},
+    ]}
+    r = asyncio.run(execute_plan(INC, plan, approved=True, dry_run=True))
+    assert r["status"] == "success"
+    assert [s["step_index"] for s in r["steps"]] == [0, 1, 2]
+    assert [k for k, _ in audit_events][0] == "execute_start" and audit_events[-1][0] == "execute_end"
+
+def test_execute_stops_after_failed_wave(audit_events):
+    plan = {"id": "p2", "steps": [
+        {"action_type": "config_change", "env": "staging"},  # missing key -> fails
+        {"action_type": "read", "env": "staging"},
+    ]}
+    r = asyncio.run(execute_plan(INC, plan, approved=True, dry_run=True))
+    assert r["status"] == "failed"
+    assert len(r["steps"]) == 1
+
+def test_execute_hard_block(audit_events):
+    plan = {"id": "p3", "steps": [{"action_type": "read", "env": "qa"}]}
+    r = asyncio.run(execute_plan(INC, plan, approved=True))
+    assert r["status"] == "blocked"
+    assert "env_not_allowlisted" in r["blocked_by"]
+    assert [k for k, _ in audit_events] == ["execute_blocked"]
+
+def test_choose_then_execute_routes(audit_events, monkeypatch):
+    from fastapi.testclient import TestClient
+    from app import main
+    from app.models import Incident
+
+    inc = Incident.model_construct(id="inc-route", service="cart", severity="LOW", suspected_cause="x")
+    res = {"candidates": [
+        {"id": "p-read", "policy_ok": True, "steps": [{"action_type": "read", "env": "staging"}]},
+        {"id": "p-cfg", "policy_ok": True, "steps": [
+            {"action_type": "config_change", "env": "staging", "key": "k", "value": "v"}]},
+    ]}
+    saved = {name: getattr(main, name) for name in ("INCIDENTS", "RESULTS", "APPROVALS", "_state_changed")}
+    main.INCIDENTS, main.RESULTS, main.APPROVALS = {inc.id: inc}, {inc.id: res}, {inc.id: True}
+    main._state_changed = lambda *a: None
+    monkeypatch.setattr(main, "write_event", lambda kind, payload: audit_events.append((kind, payload)))
+    main.app.dependency_overrides[main.RUN.dependency] = lambda: {"mode": "demo"}
+    main.app.dependency_overrides[main.EXEC.dependency] = lambda: {"mode": "demo"}
+    try:
+        client = TestClient(main.app)
+        assert client.post(f"/incidents/{inc.id}/choose", params={"plan_id": "nope"}).status_code == 404
+        r = client.post(f"/incidents/{inc.id}/choose", params={"plan_id": "p-cfg"})
+        assert r.status_code == 200 and res["chosen_plan_id"] == "p-cfg"
+
+        r = client.post(f"/incidents/{inc.id}/execute")  # falls back to the chosen plan
+        assert r.status_code == 200, r.text
+        assert r.json()["status"] == "success" and r.json()["plan_id"] == "p-cfg"
+        r = client.post(f"/incidents/{inc.id}/execute", params={"plan_id": "p-read"})
+        assert r.status_code == 200 and r.json()["plan_id"] == "p-read"
+        assert client.post(f"/incidents/{inc.id}/execute", params={"plan_id": "nope"}).status_code == 404
+        assert [e["plan_id"] for e in res["executions"]] == ["p-cfg", "p-read"]
+        assert [k for k, _ in audit_events].count("execute_end") == 2
+    finally:
+        main.app.dependency_overrides.pop(main.RUN.dependency, None)
+        main.app.dependency_overrides.pop(main.EXEC.dependency, None)
+        for name, value in saved.items():
+            setattr(main, name, value)
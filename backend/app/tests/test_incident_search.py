@@ -0,0 +1,113 @@
+# backend/app/tests/test_incident_search.py
+import orjson
+from app import main
+
+def _inc(iid, service, severity, created_at, cause=""):
+    return {"id": iid, "service": service, "severity": severity,
+            "created_at": created_at, "suspected_cause": cause}
+
+def _search(**kw):
+    return orjson.loads(main.search_incidents(**kw).body)
+
+def test_search_uses_indexes_and_keeps_stable_order(monkeypatch):
+    incidents = {
+        "a": _inc("a", "checkout", "HIGH", "2025-01-01T10:00:00", "db pool"),
+        "b": _inc("b", "cart", "LOW", "2025-01-01T11:00:00"),
+        "c": _inc("c", "Checkout", "HIGH", "2025-01-01T10:00:00"),
+        "d": _inc("d", "checkout", "LOW", "2025-01-01T12:00:00", "DB failover"),
+    }
+    monkeypatch.setattr(main, "INCIDENTS", incidents)
+
+    r = _search()
+    # newest first; equal timestamps keep insertion order
+    assert [i["id"] for i in r["items"]] == ["d", "b", "a", "c"]
+    assert r["total"] == 4
+
+    r = _search(service="CHECKOUT", severity="high", sort="created_at")
+    assert [i["id"] for i in r["items"]] == ["a", "c"]
+
+    r = _search(q="db", limit=1)
+    assert r["total"] == 2 and [i["id"] for i in r["items"]] == ["d"]
+
+    incidents["e"] = _inc("e", "cart", "HIGH", "2025-01-02T00:00:00")
+    assert _search(limit=1)["items"][0]["id"] == "e"
+
+def test_text_search_does_not_match_across_rows(monkeypatch):
+    incidents = {
+        "x1": _inc("x1", "ab", "LOW", "2025-01-01T10:00:00", "Ünicode cause"),
+        "x2": _inc("x2", "cd", "LOW", "2025-01-01T11:00:00"),
+    }
+    monkeypatch.setattr(main, "INCIDENTS", incidents)
+
+    assert _search(q="ÜNICODE")["total"] == 1
+    assert _search(q="bc")["total"] == 0   # "ab" + "cd" are adjacent in the packed column
+    assert {i["id"] for i in _search(q="x")["items"]} == {"x1", "x2"}
+
+def test_list_incidents_reuses_cached_bodies(monkeypatch):
+    incidents = {"a": _inc("a", "cart", "LOW", "2025-01-01T10:00:00")}
+    monkeypatch.setattr(main, "INCIDENTS", incidents)
+    monkeypatch.setattr(main, "_JSON_CACHE", {})
+
+    assert orjson.loads(main.list_incidents().body) == [incidents["a"]]
+    cached = main._JSON_CACHE["a"][1]
+    main.list_incidents()
+    assert main._JSON_CACHE["a"][1] is cached
+
+    # replacing the object (same id) re-encodes
+    incidents["a"] = _inc("a", "checkout", "LOW", "2025-01-01T10:00:00")
+    assert orjson.loads(main.list_incidents().body)[0]["service"] == "checkout"
+
+def test_create_incident_fills_defaults_without_revalidating(monkeypatch):
+    from fastapi import BackgroundTasks
+    from app.models import DetectRequest
+    monkeypatch.setattr(main, "INCIDENTS", {})
+    monkeypatch.setattr(main, "_state_changed", lambda *a: None)
+    monkeypatch.setattr(main, "write_event", lambda *a, **k: None)
+
+    req = DetectRequest(service="cart", signals=[{"name": "error_rate", "value": 0.2}])
+    main._create_incident(req, BackgroundTasks())
+    (inc,) = main.INCIDENTS.values()
+    assert inc.id and inc.created_at is not None and inc.notes == {}
+    assert inc.service == "cart" and inc.severity
+
+def test_concurrent_indexing_keeps_text_columns_aligned(monkeypatch):
+    import sys
+    import threading
+    monkeypatch.setattr(main, "INCIDENTS", {})
+    main._reindex_incidents()
+    done = threading.Event()
+
+    def detect(t):  # what _create_incident does from a worker thread
+        for i in range(2500):
+            inc = _inc(f"T{t}-{i}", f"svc{t}", "LOW", "2025-01-01T10:00:00", f"cause {t} {i}")
+            with main._INDEX_LOCK:
+                main.INCIDENTS[inc["id"]] = inc
+                main._index_incident(inc["id"], inc)
+
+    def search():  # sync route on another worker thread
+        while not done.is_set():
+            main._reindex_incidents()
+            main._text_matches("cause 3")
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # force thread switches mid-append
+    try:
+        threads = [threading.Thread(target=detect, args=(t,)) for t in range(8)]
+        reader = threading.Thread(target=search)
+        reader.start()
+        for th in threads: th.start()
+        for th in threads: th.join()
+        done.set()
+        reader.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    ids, (sid_col, svc_col, cause_col) = main._COL_IDS, main._COL_TEXT
+    assert main._INC_ROW.keys() == main.INCIDENTS.keys()
+    assert len(ids) == len(sid_col) == len(svc_col) == len(cause_col) == len(main.INCIDENTS)
+    for r, iid in enumerate(ids):
+        inc = main.INCIDENTS[iid]
+        assert main._INC_ROW[iid] == r
+        assert (sid_col[r], svc_col[r], cause_col[r]) == (iid.lower(), inc["service"], inc["suspected_cause"])
+    main.INCIDENTS.clear()
+    main._reindex_incidents()
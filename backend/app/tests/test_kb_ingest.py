@@ -0,0 +1,149 @@
+# backend/app/tests/test_kb_ingest.py
+import pytest
+from app.kb import ingest
+
+class _FakeCollection:
+    def __init__(self):
+        self.calls = []
+    def upsert(self, ids, documents, metadatas):
+        self.calls.append((list(ids), list(documents), list(metadatas)))
+    def get(self, ids, include):
+        return {"ids": []}
+
+def test_add_text_docs_upserts_in_batches(monkeypatch):
+    col = _FakeCollection()
+    monkeypatch.setattr(ingest, "_get_collection", lambda: col)
+    items = [{"title": f"doc {i}", "text": f"body {i}", "service": "checkout"} for i in range(5)]
+
+    out = ingest.add_text_docs(items, batch_size=2)
+
+    assert [len(c[0]) for c in col.calls] == [2, 2, 1]
+    assert [o["id"] for o in out] == [i for c in col.calls for i in c[0]]
+    # same ids as the single-doc path, so bulk and single ingestion dedupe together
+    assert out[0]["id"] == ingest._mk_id("doc 0", "body 0", "checkout")
+    assert col.calls[0][2][0]["kind"] == "kb_manual"
+
+def test_add_text_docs_collapses_duplicate_ids_last_wins(monkeypatch):
+    col = _FakeCollection()
+    monkeypatch.setattr(ingest, "_get_collection", lambda: col)
+    items = [
+        {"title": "a", "text": "body", "uri": "kb://first"},
+        {"title": "b", "text": "other"},
+        {"title": "a", "text": "body", "uri": "kb://second"},
+    ]
+
+    out = ingest.add_text_docs(items)
+
+    ((ids, _, metas),) = col.calls
+    assert len(set(ids)) == len(ids) == 2
+    assert [o["title"] for o in out] == ["b", "a"]
+    assert metas[1]["uri"] == out[1]["uri"] == "kb://second"
+
+def test_fetch_text_async_applies_same_limits():
+    import asyncio
+    import httpx
+
+    def handler(request):
+        if request.url.path == "/moved":
+            return httpx.Response(301, headers={"Location": "http://kb/big"})
+        if request.url.path == "/big":
+            return httpx.Response(200, content=b"y" * 50, headers={"Content-Type": "text/html"})
+        return httpx.Response(200, content=b"{}", headers={"Content-Type": "application/octet-stream"})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            assert await ingest.fetch_text_async(c, "http://kb/big", max_bytes=50) == "y" * 50
+            assert await ingest.fetch_text_async(c, "http://kb/moved", max_bytes=50) == "y" * 50
+            with pytest.raises(ValueError):
+                await ingest.fetch_text_async(c, "http://kb/big", max_bytes=10)
+            with pytest.raises(ValueError):
+                await ingest.fetch_text_async(c, "http://kb/bin")
+    asyncio.run(run())
+
+def test_ingest_url_maps_fetch_errors(monkeypatch):
+    import httpx
+    from fastapi.testclient import TestClient
+    from app import main
+
+    def boom(exc):
+        async def fetch(client, url):
+            raise exc
+        return fetch
+
+    req = httpx.Request("GET", "http://kb/x")
+    main.app.dependency_overrides[main.KB.dependency] = lambda: {"mode": "demo"}
+    try:
+        client = TestClient(main.app)
+        cases = [
+            (httpx.HTTPStatusError("nf", request=req, response=httpx.Response(404, request=req)), 502),
+            (httpx.ConnectError("refused", request=req), 502),
+            (httpx.UnsupportedProtocol("ftp"), 400),
+        ]
+        for exc, status in cases:
+            monkeypatch.setattr(main, "fetch_text_async", boom(exc))
+            assert client.post("/kb/ingest/url", json={"url": "http://kb/x"}).status_code == status
+    finally:
+        main.app.dependency_overrides.pop(main.KB.dependency, None)
+
+def test_list_docs_reads_bodies_only_for_legacy_rows(monkeypatch):
+    calls = []
+    class _Col:
+        def get(self, include, limit=None, offset=None, ids=None):
+            calls.append((tuple(include), ids))
+            if ids is None:
+                return {"ids": ["new", "old"], "metadatas": [{"title": "n", "snippet": "cached"}, {"title": "o"}]}
+            return {"ids": ids, "documents": ["legacy body " * 100]}
+        def count(self):
+            return 2
+    monkeypatch.setattr(ingest, "_get_collection", lambda: _Col())
+
+    out = ingest.list_docs(limit=10)
+
+    assert calls == [(("metadatas",), None), (("documents",), ["old"])]
+    assert [i["snippet"] for i in out["items"]] == ["cached", ("legacy body " * 100)[:ingest.SNIPPET_CHARS]]
+
+class _DocsCollection(_FakeCollection):
+    """Fake store keyed by id, for the routes that keep the KB doc count."""
+    def __init__(self, ids=()):
+        super().__init__()
+        self.docs = dict.fromkeys(ids, "")
+    def get(self, ids, include):
+        return {"ids": [i for i in ids if i in self.docs]}
+    def delete(self, ids):
+        for i in ids:
+            del self.docs[i]
+
+def test_delete_counts_only_docs_that_existed(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app import main
+
+    col = _DocsCollection(["a"])
+    monkeypatch.setattr(ingest, "_get_collection", lambda: col)
+    monkeypatch.setattr(main, "_KB_DOCS", 1)
+    main.app.dependency_overrides[main.KB.dependency] = lambda: {"mode": "demo"}
+    try:
+        client = TestClient(main.app)
+        assert client.delete("/kb/docs/a").json() == {"deleted": ["a"]}
+        assert client.delete("/kb/docs/a").json() == {"deleted": []}
+        assert client.delete("/kb/docs/zz").json() == {"deleted": []}
+        assert main._kb_docs() == 0
+    finally:
+        main.app.dependency_overrides.pop(main.KB.dependency, None)
+
+def test_reingest_text_does_not_grow_the_count(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app import main
+
+    col = _DocsCollection()
+    col.upsert = lambda ids, documents, metadatas: col.docs.update(zip(ids, documents))
+    monkeypatch.setattr(ingest, "_get_collection", lambda: col)
+    monkeypatch.setattr(main, "_KB_DOCS", 0)
+    main.app.dependency_overrides[main.KB.dependency] = lambda: {"mode": "demo"}
+    try:
+        client = TestClient(main.app)
+        doc = {"title": "Runbook", "text": "restart the pods"}
+        assert client.post("/kb/ingest/text", json=doc).json()["created"] is True
+        assert client.post("/kb/ingest/text", json=doc).json()["created"] is False
+        assert main._kb_docs() == 1 == len(col.docs)
+    finally:
+        main.app.dependency_overrides.pop(main.KB.dependency, None)
@@ -0,0 +1,105 @@
+# backend/app/tests/test_notify.py
+import asyncio
+import httpx
+
+from app import notify
+
+def test_notify_reuses_pooled_client_per_destination(monkeypatch):
+    seen = []
+    def handler(request):
+        seen.append((request.url.host, request.url.path, request.headers.get("authorization")))
+        return httpx.Response(200, json={"key": "OPS-1"})
+
+    real = httpx.AsyncClient
+    monkeypatch.setattr(notify.httpx, "AsyncClient",
+                        lambda **kw: real(transport=httpx.MockTransport(handler), **kw))
+    monkeypatch.setattr(notify, "_clients", {})
+    monkeypatch.setattr(notify, "SLACK_WEBHOOK_URL", "https://hooks.slack.test/T/B/X")
+    monkeypatch.setattr(notify, "JIRA_BASE_URL", "https://jira.test/")
+    monkeypatch.setattr(notify, "JIRA_API_TOKEN", "tok")
+    monkeypatch.setattr(notify, "JIRA_PROJECT_KEY", "OPS")
+
+    async def go():
+        assert await notify.notify_slack("a") is True
+        slack = notify._clients["slack"]
+        assert await notify.notify_slack_blocks("b", []) is True
+        assert notify._clients["slack"] is slack
+        assert await notify.create_jira_ticket("s", "d") == {"key": "OPS-1"}
+        await notify.aclose_clients()
+        assert slack.is_closed and not notify._clients
+
+    asyncio.run(go())
+    assert seen[-1] == ("jira.test", "/rest/api/3/issue", "Bearer tok")
+    assert [h for h, _, _ in seen[:2]] == ["hooks.slack.test"] * 2
+
+def test_notify_later_collapses_duplicates_and_bounds_in_flight(monkeypatch):
+    from app import main
+    monkeypatch.setattr(main, "NOTIFY_MAX_IN_FLIGHT", 2)
+    monkeypatch.setattr(main, "_NOTIFY_SEM", None)
+    sent, peak, running = [], [0], [0]
+
+    async def send(text):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        sent.append(text)
+
+    async def go():
+        assert main._notify_later(("i1", "approved"), send, "a") is True
+        assert main._notify_later(("i1", "approved"), send, "a-retry") is False
+        for i in range(4):
+            main._notify_later((f"i{i + 2}", "approved"), send, f"b{i}")
+        await asyncio.gather(*main._NOTIFY_TASKS)
+        # key is released once sent
+        assert main._notify_later(("i1", "approved"), send, "again") is True
+        await asyncio.gather(*main._NOTIFY_TASKS)
+
+    asyncio.run(go())
+    assert "a-retry" not in sent and len(sent) == 6 and "again" in sent
+    assert peak[0] == 2
+
+def test_slack_batcher_merges_alerts_within_window(monkeypatch):
+    posts = []
+    async def fake_blocks(text, blocks):
+        posts.append((text, blocks))
+        return True
+    monkeypatch.setattr(notify, "notify_slack_blocks", fake_blocks)
+    monkeypatch.setattr(notify, "SLACK_WEBHOOK_URL", "https://hooks.slack.test/T/B/X")
+    section = lambda t: {"type": "section", "text": {"type": "mrkdwn", "text": t}}
+
+    async def go():
+        b = notify.SlackBatcher(window_s=0.05, max_blocks=3)
+        for i in range(4):
+            assert await b.enqueue(f"inc {i}") is True
+        await asyncio.sleep(0.2)
+        await b.enqueue("late", [section("x"), section("y")])
+        await b.stop()  # flushes what is still queued
+        assert await b.enqueue("now", [section("z")], flush_now=True) is True
+
+    asyncio.run(go())
+    # 3-block cap splits the storm; the late alert goes out on shutdown; flush_now is sent alone
+    assert [len(bl) for _, bl in posts] == [3, 1, 2, 1]
+    assert posts[0][0] == "3 incident notifications" and posts[1][0] == "inc 3"
+    assert posts[0][1][0] == section("inc 0") and posts[-1][0] == "now"
+
+def test_slack_batcher_stop_finishes_the_batch_in_flight(monkeypatch):
+    posts, started = [], []
+    async def slow_blocks(text, blocks):
+        started.append(text)
+        await asyncio.sleep(0.05)
+        posts.append(text)
+        return True
+    monkeypatch.setattr(notify, "notify_slack_blocks", slow_blocks)
+    monkeypatch.setattr(notify, "SLACK_WEBHOOK_URL", "https://hooks.slack.test/T/B/X")
+
+    async def go():
+        b = notify.SlackBatcher(window_s=0.01)
+        await b.enqueue("first")
+        while not started:
+            await asyncio.sleep(0.005)
+        await b.enqueue("second")
+        await b.stop()  # cancels the loop mid-POST
+
+    asyncio.run(go())
+    assert posts == ["first", "second"]
@@ -0,0 +1,84 @@
+# backend/app/tests/test_pipeline.py
+import asyncio
+import threading
+
+from app import pipeline
+from app.models import Incident
+
+def test_run_all_validates_concurrently_and_contains_failures(monkeypatch):
+    cands = [{"id": f"p{i}", "policy_ok": True} for i in range(3)]
+    barrier = threading.Barrier(3, timeout=5)  # only passes if all three run at once
+
+    def fake_validate(incident, c):
+        barrier.wait()
+        if c["id"] == "p1":
+            raise RuntimeError("replay data missing")
+        return {"status": "PASS", "kpi_deltas": {}}
+
+    monkeypatch.setattr(pipeline, "retrieve_evidence", lambda inc: [])
+    monkeypatch.setattr(pipeline, "generate_candidates", lambda inc, ev: cands)
+    monkeypatch.setattr(pipeline, "validate", fake_validate)
+    flushed = []
+    monkeypatch.setattr(pipeline, "write_events", flushed.append)
+    monkeypatch.setattr(pipeline.store, "RESULTS", {})
+
+    inc = Incident(id="i1", service="cart", severity="HIGH")
+    out = asyncio.run(pipeline.run_all(inc))
+    # audit events are handed off once, in order
+    assert len(flushed) == 1
+    assert [k for _, k, _ in flushed[0]] == ["pipeline_start", "pipeline_evidence", "pipeline_candidates"] \
+        + ["pipeline_validate"] * 3 + ["pipeline_end"]
+
+    assert [v["plan_id"] for v in out["validations"]] == ["p0", "p1", "p2"]
+    assert [v["result"]["status"] for v in out["validations"]] == ["PASS", "FAIL", "PASS"]
+    assert "replay data missing" in cands[1]["validation"]["notes"]
+    assert pipeline.store.RESULTS["i1"] is out
+
+def test_evidence_to_dict_handles_models_dicts_and_shims():
+    from types import SimpleNamespace
+    from app.models import EvidenceItem
+
+    m = EvidenceItem(title="t", snippet="s", score=0.5, uri="kb://a", source_file="kb/a.md")
+    assert pipeline._evidence_to_dict(m) == {
+        "title": "t", "score": 0.5, "snippet": "s", "uri": "kb://a", "service": None, "kind": None}
+    d = {"title": "d", "source": "kb/b.md", "service": "cart", "extra": "x" * 10}
+    assert pipeline._evidence_to_dict(d) == {
+        "title": "d", "score": None, "snippet": None, "uri": "kb/b.md", "service": "cart", "kind": None}
+    shim = SimpleNamespace(title="n", score=0.1, snippet="", source="kb/c.md", service="ignored")
+    assert pipeline._evidence_to_dict(shim)["uri"] == "kb/c.md"
+    assert pipeline._evidence_to_dict(shim)["service"] is None  # shims only expose the core five
+
+def test_run_all_reuses_evidence_for_near_duplicate_incidents(monkeypatch):
+    calls = []
+    def fake_retrieve(inc):
+        calls.append(inc.id)
+        return [{"title": "runbook", "score": 0.9}]
+    monkeypatch.setattr(pipeline, "retrieve_evidence", fake_retrieve)
+    monkeypatch.setattr(pipeline, "generate_candidates", lambda inc, ev: [{"id": f"p-{inc.id}"}])
+    monkeypatch.setattr(pipeline, "validate", lambda inc, c: {"status": "PASS"})
+    monkeypatch.setattr(pipeline, "write_events", lambda events: None)
+    monkeypatch.setattr(pipeline.store, "RESULTS", {})
+    pipeline.clear_evidence_cache()
+
+    a = asyncio.run(pipeline.run_all(Incident(id="a", service="cart", severity="HIGH", suspected_cause="Bad deploy")))
+    b = asyncio.run(pipeline.run_all(Incident(id="b", service="cart", severity="LOW", suspected_cause="bad deploy")))
+    asyncio.run(pipeline.run_all(Incident(id="c", service="cart", severity="HIGH", suspected_cause="db pool")))
+
+    assert calls == ["a", "c"]
+    assert b["evidence"] == a["evidence"]
+    # candidates are always rebuilt for the incident at hand
+    assert b["incident_id"] == "b" and b["candidates"][0]["id"] == "p-b"
+
+    assert pipeline.clear_evidence_cache() == 2
+    asyncio.run(pipeline.run_all(Incident(id="d", service="cart", severity="HIGH", suspected_cause="bad deploy")))
+    assert calls[-1] == "d"
+
+def test_dedup_evidence_keeps_best_score_in_first_seen_order():
+    ev = [
+        {"title": "A", "uri": "kb/a.md", "score": 0.4},
+        {"title": "B", "uri": "kb/b.md", "score": 0.9},
+        {"title": "A", "uri": "kb/a.md", "score": 0.7},
+        {"title": "A2", "uri": "kb/a.md", "score": None},
+    ]
+    out = pipeline._dedup_evidence(ev)
+    assert [(e["title"], e["score"]) for e in out] == [("A", 0.7), ("B", 0.9), ("A2", None)]
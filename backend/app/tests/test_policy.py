@@ -1,46 +1,129 @@
 # backend/app/tests/test_policy.py
-import os
-from datetime import datetime
-from app.policy.policy_guard import evaluate_plan
+from datetime import datetime, time
+from app.policy.policy_guard import PolicyConfig, evaluate_plan
 
 def _plan(action_type, env="prod", service="checkout", **kw):
     step = {"action_type": action_type, "env": env, "service": service}
     step.update(kw)
     return {"steps": [step]}
 
-def test_requires_approval_for_writes(monkeypatch):
-    monkeypatch.setenv("REQUIRE_APPROVAL_FOR_WRITES", "1")
+def test_requires_approval_for_writes():
     plan = _plan("config_change", env="staging")
-    r = evaluate_plan(plan, approved=False, now=datetime(2025, 1, 1, 10, 0, 0))
+    cfg = PolicyConfig(require_approval_for_writes=True)
+    r = evaluate_plan(plan, approved=False, now=datetime(2025, 1, 1, 10, 0, 0), config=cfg)
     assert not r["policy_ok"]
     assert any(v["code"] == "approval_required" for v in r["policy_violations"])
+    off = evaluate_plan(plan, approved=False, config=PolicyConfig(require_approval_for_writes=False))
+    assert off["policy_ok"]
 
-def test_block_global_ff_disable_in_prod(monkeypatch):
-    monkeypatch.setenv("BLOCK_GLOBAL_FF_IN_PROD", "1")
+def test_block_global_ff_disable_in_prod():
     plan = _plan("feature_flag", env="prod", key="*", op="disable")
-    r = evaluate_plan(plan, approved=True, now=datetime(2025, 1, 1, 10, 0, 0))
+    cfg = PolicyConfig(block_global_ff_in_prod=True)
+    r = evaluate_plan(plan, approved=True, now=datetime(2025, 1, 1, 10, 0, 0), config=cfg)
     assert not r["policy_ok"]
     assert any(v["code"] == "global_ff_disable_blocked" for v in r["policy_violations"])
 
-def test_db_schema_requires_backup(monkeypatch):
-    monkeypatch.setenv("REQUIRE_BACKUP_FOR_SCHEMA", "1")
+def test_db_schema_requires_backup():
     plan = _plan("db_schema", env="staging")  # no backup_id
-    r = evaluate_plan(plan, approved=True)
+    r = evaluate_plan(plan, approved=True, config=PolicyConfig(require_backup_for_schema=True))
     assert not r["policy_ok"]
     assert any(v["code"] == "backup_required" for v in r["policy_violations"])
 
-def test_restart_blocked_in_peak(monkeypatch):
+def test_restart_blocked_in_peak():
     # Peak 09:00–21:00, now=10:00
-    monkeypatch.setenv("PEAK_START", "09:00:00")
-    monkeypatch.setenv("PEAK_END",   "21:00:00")
+    cfg = PolicyConfig(peak_start=time(9, 0, 0), peak_end=time(21, 0, 0))
     plan = _plan("restart", env="prod")
-    r = evaluate_plan(plan, approved=True, now=datetime(2025, 1, 1, 10, 0, 0))
+    r = evaluate_plan(plan, approved=True, now=datetime(2025, 1, 1, 10, 0, 0), config=cfg)
     assert not r["policy_ok"]
     assert any(v["code"] == "blocked_in_peak" for v in r["policy_violations"])
+    # overnight window 22:00–06:00 leaves 10:00 open
+    night = PolicyConfig(peak_start=time(22, 0, 0), peak_end=time(6, 0, 0))
+    assert evaluate_plan(plan, approved=True, now=datetime(2025, 1, 1, 10, 0, 0), config=night)["policy_ok"]
 
-def test_env_allowlist(monkeypatch):
-    monkeypatch.setenv("ENV_ALLOWLIST", "dev,staging,prod")
+def test_env_allowlist():
     plan = _plan("read", env="qa")
-    r = evaluate_plan(plan, approved=True)
+    r = evaluate_plan(plan, approved=True, config=PolicyConfig(env_allowlist=frozenset({"dev", "staging", "prod"})))
     assert not r["policy_ok"]
     assert any(v["code"] == "env_not_allowlisted" for v in r["policy_violations"])
+    assert evaluate_plan(plan, approved=True, config=PolicyConfig(env_allowlist=frozenset({"qa"})))["policy_ok"]
+
+def test_config_is_read_from_env_once(monkeypatch):
+    from app.policy.policy_guard import get_policy_config, reset_config_cache
+    monkeypatch.setenv("ENV_ALLOWLIST", " QA, dev ")
+    monkeypatch.setenv("PEAK_START", "22:00:00")
+    monkeypatch.setenv("REQUIRE_APPROVAL_FOR_WRITES", "0")
+    reset_config_cache()
+    try:
+        cfg = get_policy_config()
+        assert cfg.env_allowlist == frozenset({"qa", "dev"})
+        assert cfg.peak_start == time(22, 0, 0) and not cfg.require_approval_for_writes
+        monkeypatch.setenv("ENV_ALLOWLIST", "prod")
+        assert get_policy_config() is cfg  # memoized until reset
+        assert evaluate_plan(_plan("config_change", env="qa"), approved=False)["policy_ok"]
+    finally:
+        monkeypatch.undo()
+        reset_config_cache()
+
+def test_cached_matches_uncached_and_invalidates():
+    from app.policy import policy_guard
+    from app.policy.policy_guard import evaluate_plan_cached, invalidate_policy_cache
+    invalidate_policy_cache()
+    plan = _plan("config_change", env="staging")
+    now = datetime(2025, 1, 1, 10, 0, 0)
+    a = evaluate_plan_cached(plan, approved=False, now=now)
+    assert a == evaluate_plan(plan, approved=False, now=now)
+    assert len(policy_guard._POLICY_CACHE) == 1
+    b = evaluate_plan_cached(plan, approved=False, now=now)
+    assert b == a and b is not a
+    # a caller editing its copy (e.g. an execution record's policy_snapshot) leaves the cache intact
+    b["policy_ok"] = True
+    b["policy_violations"].append({"code": "X", "message": "x"})
+    b["violations_by_step"][0].clear()
+    assert evaluate_plan_cached(plan, approved=False, now=now) == a
+    assert evaluate_plan_cached(plan, approved=True, now=now)["policy_ok"]
+    invalidate_policy_cache()
+    assert not policy_guard._POLICY_CACHE
+
+def test_action_policy_table():
+    from app.policy_models import Action, ActionRequest, allowed
+    req = lambda sev, env="prod": ActionRequest(incident_id="i", action=Action.ROLLBACK, severity=sev, environment=env)
+    assert allowed(req("low"), {}) == (False, "severity low below minimum MEDIUM")
+    assert allowed(req("HIGH"), {}) == (False, "approval required")
+    assert allowed(req("HIGH"), {"i": True}) == (True, "allowed")
+    assert allowed(req("MEDIUM", env="staging"), {}) == (True, "allowed")
+
+def test_step_verdicts_are_memoized_but_returned_fresh():
+    from app.policy.policy_guard import _step_violations, evaluate_step, invalidate_policy_cache
+    invalidate_policy_cache()
+    step = {"action_type": "restart", "env": "staging", "service": "checkout", "targets": ["checkout"]}
+    a = evaluate_step(step, approved=False)
+    b = evaluate_step(dict(step), approved=False)
+    assert a == b and a is not b and a[0] is not b[0]
+    assert _step_violations.cache_info().hits == 1
+    # unhashable targets still evaluate
+    assert evaluate_step({**step, "env": "prod", "targets": [{"host": "a"}]}, approved=True, peak=False) == []
+
+def test_plan_reads_the_clock_once(monkeypatch):
+    from app.policy import policy_guard
+    calls = []
+    real = policy_guard._in_peak
+    monkeypatch.setattr(policy_guard, "_in_peak", lambda now=None, config=None: calls.append(now) or real(now, config))
+    steps = [{"action_type": "restart", "env": "prod", "service": "checkout"}] * 3
+    r = policy_guard.evaluate_plan({"steps": steps}, approved=True, now=datetime(2025, 1, 1, 10, 0, 0))
+    assert len(calls) == 1
+    assert [v["code"] for v in r["policy_violations"]] == ["blocked_in_peak"] * 3
+    assert policy_guard.evaluate_step(steps[0], approved=True, peak=False) == []
+
+def test_fail_fast_stops_at_first_fatal_step():
+    steps = [
+        {"action_type": "read", "env": "sandbox"},
+        {"action_type": "restart", "env": "prod", "service": "checkout"},
+    ]
+    full = evaluate_plan({"steps": steps}, approved=False)
+    fast = evaluate_plan({"steps": steps}, approved=False, fail_fast=True)
+    assert not fast["policy_ok"] and len(fast["violations_by_step"]) == 1
+    assert [v["code"] for v in fast["policy_violations"]] == ["env_not_allowlisted"]
+    assert len(full["violations_by_step"]) == 2
+    # non-fatal violations keep walking
+    ok_env = evaluate_plan({"steps": steps[1:] * 2}, approved=False, fail_fast=True)
+    assert len(ok_env["violations_by_step"]) == 2
@@ -0,0 +1,156 @@
+# backend/app/tests/test_reports.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from app import main
+from app.models import Incident
+
+def test_render_pdf_runs_in_pool_and_caches_by_content(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)  # stands in for the process pool
+    calls = []
+    def fake_build(incident, result):
+        calls.append(incident.id)
+        return b"%PDF-" + incident.service.encode()
+    monkeypatch.setattr(main, "_pdf_pool", lambda: pool)
+    monkeypatch.setattr(main.pdf_reporter, "build_pdf", fake_build)
+    monkeypatch.setattr(main, "_PDF_CACHE", type(main._PDF_CACHE)())
+
+    inc = Incident(id="i1", service="cart", severity="HIGH")
+    res = SimpleNamespace(evidence=[], candidates=[], validation=None, policy_summary="")
+
+    async def go():
+        a = await main._render_pdf(inc, res)
+        b = await main._render_pdf(inc, res)
+        c = await main._render_pdf(inc.model_copy(update={"service": "checkout"}), res)
+        return a, b, c
+
+    a, b, c = asyncio.run(go())
+    pool.shutdown()
+    assert a == b == b"%PDF-cart" and c == b"%PDF-checkout"
+    assert calls == ["i1", "i1"]  # second request for the same content was served from cache
+
+def test_report_template_uses_compiled_module_only_when_current(monkeypatch):
+    from app.reporter import html
+
+    tpl = html._load_template("report.html")
+    assert tpl.root_render_func.__module__ == "app.templates_compiled.report"
+
+    inc = Incident(id="i1", service="cart", severity="HIGH")
+    res = SimpleNamespace(evidence=[], candidates=[], validation=None, policy_summary="ok")
+    assert tpl.render(incident=inc, result=res) == \
+        html._env.get_template("report.html").render(incident=inc, result=res)
+
+    # edited template, stale module: parse the .html instead
+    monkeypatch.setattr(html, "template_sha1", lambda name: "0" * 40)
+    assert html._load_template("report.html").root_render_func.__module__ != "app.templates_compiled.report"
+
+def test_report_stream_matches_render():
+    from app.reporter import html
+
+    inc = Incident(id="i1", service="cart", severity="HIGH")
+    res = SimpleNamespace(evidence=[], candidates=[], validation=None, policy_summary="ok")
+    chunks = list(html.render_report_stream(inc, res))
+    assert all(isinstance(c, bytes) for c in chunks)
+    assert b"".join(chunks).decode("utf-8") == html.render_report(inc, res)
+
+def test_build_pdf_reuses_module_styles(monkeypatch):
+    from app.reporter import pdf
+    monkeypatch.setattr(pdf, "getSampleStyleSheet", lambda: (_ for _ in ()).throw(AssertionError("rebuilt")))
+    inc = Incident(id="i1", service="cart", severity="HIGH", suspected_cause="bad deploy")
+    ev = {"title": "Runbook", "score": 0.91, "uri": "kb/runbook.md"}
+    plan = {"id": "rollback-i1", "title": "Rollback", "rationale": "r", "predicted_impact": {"error_rate_pct": -0.5},
+            "policy_ok": False, "policy_violations": [{"code": "x", "message": "y"}],
+            "steps": [{"action_type": "rollback", "targets": ["cart"]}]}
+    val = {"status": "PASS", "before": {"5xx_rate": 0.1, "latency_p95_ms": 900.0},
+           "after": {"5xx_rate": 0.01, "latency_p95_ms": 300.0}, "kpi_deltas": {"5xx_rate": -0.09, "latency_p95_ms": -600.0}}
+    res = {"evidence": [ev] * 3, "candidates": [plan], "validations": [{"plan_id": "rollback-i1", "result": val}],
+           "policy_summary": "1 violation"}
+    assert pdf.build_pdf(inc, res).startswith(b"%PDF-")
+
+def test_pdf_bundle_renders_once_and_reports_page_ranges():
+    from app.reporter import pdf
+    res = {"evidence": [], "candidates": [], "validations": [], "policy_summary": "ok"}
+    long_res = {**res, "evidence": [{"title": f"doc {i}", "score": 0.5, "uri": "kb.md"} for i in range(120)]}
+    incs = [Incident(id=f"i{i}", service="cart", severity="HIGH") for i in range(3)]
+    blob, pages = pdf.build_pdf_bundle([(incs[0], res), (incs[1], long_res), (incs[2], res)])
+    assert blob.startswith(b"%PDF-")
+    assert pages["i0"] == (1, 1)
+    first, last = pages["i1"]
+    assert first == 2 and last > first
+    assert pages["i2"] == (last + 1, last + 1)
+
+def test_pdf_candidates_are_plain_tables_with_wrapped_text():
+    from app.reporter import pdf
+    from app.remediator.candidates import generate_candidates
+    plan = generate_candidates(Incident(id="i1", service="cart", severity="HIGH"), [])[1]
+    plan["rationale"] = "word " * 200
+    plan["steps"][1]["value"] = "<max> & recycle"
+    rationale_tbl, violations_tbl = pdf._candidate_tables(plan)
+    rows = rationale_tbl._cellvalues
+    assert all(isinstance(cell, str) for row in rows for cell in row)
+    assert rows[0][1] == "⛔ Tune DB pool for cart"
+    assert rows[1][1].count("\n") > 5  # long rationale pre-split to the column width
+    assert rows[2][1] == "error_rate_pct -0.2, latency_p95_ms -150"
+    assert rows[3][1].split("\n")[1] == \
+        "• [config_change] key=db.pool.max value=<max> & recycle targets=cart"  # no markup escaping needed
+    assert violations_tbl._cellvalues == [["Policy Violations",
+        "• [approval_required] write action 'config_change' requires approval\n"
+        "• [approval_required] write action 'restart' requires approval"]]
+
+def test_bundle_route_renders_requested_incidents_in_one_pass(monkeypatch):
+    from fastapi.testclient import TestClient
+    pool = ThreadPoolExecutor(max_workers=1)  # stands in for the process pool
+    calls = []
+    def fake_bundle(pairs):
+        calls.append([inc.id for inc, _ in pairs])
+        return b"%PDF-bundle", {inc.id: (n + 1, n + 1) for n, (inc, _) in enumerate(pairs)}
+    monkeypatch.setattr(main, "_pdf_pool", lambda: pool)
+    monkeypatch.setattr(main.pdf_reporter, "build_pdf_bundle", fake_bundle)
+    res = {"evidence": [], "candidates": [], "validations": [], "policy_summary": ""}
+    monkeypatch.setattr(main, "INCIDENTS", {i: Incident(id=i, service="cart", severity="LOW") for i in ("a", "b", "c")})
+    monkeypatch.setattr(main, "RESULTS", {"a": res, "b": res})
+    main.app.dependency_overrides[main.RUN.dependency] = lambda: {"mode": "demo"}
+    try:
+        client = TestClient(main.app)
+        r = client.get("/reports/incidents.pdf", params={"ids": "b, a,b"})
+        assert r.status_code == 200 and r.content == b"%PDF-bundle"
+        assert r.headers["X-Report-Pages"] == "b=1-1,a=2-2"
+        assert calls == [["b", "a"]]
+        assert client.get("/reports/incidents.pdf", params={"ids": "a,c"}).status_code == 400  # no result
+        assert client.get("/reports/incidents.pdf", params={"ids": "zz"}).status_code == 404
+        assert client.get("/reports/incidents.pdf", params={"ids": " , "}).status_code == 400
+    finally:
+        main.app.dependency_overrides.pop(main.RUN.dependency, None)
+        pool.shutdown()
+
+def _pipeline_result(monkeypatch, incident):
+    """A result dict exactly as pipeline.run_all stores it (only retrieval and audit stubbed)."""
+    from app import pipeline
+    from app.models import EvidenceItem
+    ev = EvidenceItem(title="Rollback runbook", snippet="s", score=0.87, uri="kb://rollback", source_file="kb/rollback.md")
+    monkeypatch.setattr(pipeline, "retrieve_evidence", lambda inc: [ev])
+    monkeypatch.setattr(pipeline, "write_events", lambda events: None)
+    monkeypatch.setattr(pipeline.store, "RESULTS", {})
+    pipeline.clear_evidence_cache()
+    return asyncio.run(pipeline.run_all(incident))
+
+def test_bundle_route_renders_pipeline_results(monkeypatch):
+    from fastapi.testclient import TestClient
+    pool = ThreadPoolExecutor(max_workers=1)  # stands in for the process pool; the real renderer runs
+    monkeypatch.setattr(main, "_pdf_pool", lambda: pool)
+    incs = {i: Incident(id=i, service="cart", severity="HIGH", suspected_cause="bad deploy") for i in ("a", "b")}
+    monkeypatch.setattr(main, "INCIDENTS", incs)
+    monkeypatch.setattr(main, "RESULTS", {i: _pipeline_result(monkeypatch, inc) for i, inc in incs.items()})
+    assert main.RESULTS["a"]["candidates"] and main.RESULTS["a"]["validations"]
+    main.app.dependency_overrides[main.RUN.dependency] = lambda: {"mode": "demo"}
+    try:
+        client = TestClient(main.app)
+        r = client.get("/reports/incidents.pdf", params={"ids": "a,b"})
+        assert r.status_code == 200 and r.content.startswith(b"%PDF-")
+        (a_first, a_last), (b_first, _) = [tuple(map(int, part.split("=")[1].split("-")))
+                                           for part in r.headers["X-Report-Pages"].split(",")]
+        assert a_first == 1 and b_first == a_last + 1
+    finally:
+        main.app.dependency_overrides.pop(main.RUN.dependency, None)
+        pool.shutdown()
@@ -0,0 +1,44 @@
+# backend/app/tests/test_security.py
+import pytest
+from app import security
+
+def test_scoped_keys_are_frozen_and_checked_without_copies(monkeypatch):
+    keys = security._parse_scoped_keys("k1: run, kb; k2:admin")
+    assert keys == {"k1": frozenset({"run", "kb"}), "k2": frozenset({"admin"})}
+    monkeypatch.setattr(security, "KEY_SCOPES", keys)
+    monkeypatch.setattr(security, "DEMO_MODE", False)
+    monkeypatch.setattr(security, "AUTH_MODE", "api_key")
+
+    dep = security.require_scopes(["run"])
+    p = dep(x_api_key="k1", authorization=None)
+    assert p["mode"] == "scoped_key" and p["scopes"] is keys["k1"]
+    with pytest.raises(security.AuthError) as e:
+        dep(x_api_key="k2", authorization=None)
+    assert e.value.status_code == 403
+    with pytest.raises(security.AuthError):
+        dep(x_api_key="nope", authorization=None)
+
+def test_verified_jwts_are_cached_until_expiry(monkeypatch):
+    import time
+    jwt = pytest.importorskip("jwt")
+    monkeypatch.setattr(security, "DEMO_MODE", False)
+    monkeypatch.setattr(security, "AUTH_MODE", "scoped_jwt")
+    monkeypatch.setattr(security, "_JWT_CACHE", type(security._JWT_CACHE)())
+    monkeypatch.setattr(security, "JWT_SECRET", "s" * 32)
+    decodes = []
+    real = jwt.decode
+    monkeypatch.setattr(security.jwt, "decode", lambda *a, **k: decodes.append(1) or real(*a, **k))
+
+    now = time.time()
+    tok = jwt.encode({"sub": "u1", "scope": "run kb", "aud": security.JWT_AUDIENCE, "exp": int(now) + 30},
+                     security.JWT_SECRET, algorithm="HS256")
+    a = security._verify_jwt(tok)
+    b = security._verify_jwt(tok)
+    assert a == b and a is not b and a["scopes"] == {"run", "kb"}
+    assert len(decodes) == 1
+
+    # expired entries are re-verified (and rejected by jwt.decode itself)
+    monkeypatch.setattr(security.time, "time", lambda: now + 31)
+    with pytest.raises(security.AuthError):
+        security._verify_jwt(tok)
+    assert len(decodes) == 2
@@ -0,0 +1,173 @@
+# backend/app/tests/test_store.py
+from app import store
+from app.store import ResultCache
+
+def test_result_cache_is_bounded_lru(monkeypatch):
+    c = ResultCache(maxsize=2, ttl=60)
+    c["a"], c["b"] = 1, 2
+    assert c["a"] == 1          # a is now most recent
+    c["c"] = 3
+    assert "b" not in c and set(c) == {"a", "c"}
+    assert c.setdefault("d", {}) == {} and len(c) == 2
+    assert c.stats()["evicted"] == 2
+
+def test_result_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(store.time, "monotonic", lambda: now[0])
+    c = ResultCache(maxsize=10, ttl=5)
+    c["a"] = 1
+    now[0] += 4
+    assert c.get("a") == 1
+    now[0] += 2
+    assert c.get("a") is None and "a" not in c and len(c) == 0
+    assert c.stats()["expired"] == 1
+
+def _use_state_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(store, "STATE_INCIDENTS_DIR", tmp_path / "incidents")
+    monkeypatch.setattr(store, "STATE_RESULTS_DIR", tmp_path / "results")
+    monkeypatch.setattr(store, "STATE_APPROVALS", tmp_path / "approvals.json")
+    monkeypatch.setattr(store, "STATE_INCIDENTS", tmp_path / "incidents.json")
+    monkeypatch.setattr(store, "STATE_RESULTS", tmp_path / "results.json")
+    monkeypatch.setattr(store, "_ensure_flusher", lambda: None)  # flush by hand
+
+def _fresh_maps(monkeypatch, maxsize=4):
+    monkeypatch.setattr(store, "INCIDENTS", {})
+    monkeypatch.setattr(store, "RESULTS", ResultCache(maxsize=maxsize, ttl=60))
+    monkeypatch.setattr(store, "APPROVALS", {})
+
+def test_save_state_round_trips_through_orjson(monkeypatch, tmp_path):
+    import datetime as dt, uuid
+    from app.models import Incident
+    _use_state_dir(monkeypatch, tmp_path)
+    _fresh_maps(monkeypatch)
+    inc = Incident(id="i1", service="cart", severity="HIGH", created_at=dt.datetime(2025, 1, 1, 10, 0, 0, 500))
+    store.INCIDENTS["i1"] = inc
+    store.APPROVALS["i1"] = True
+    u = uuid.UUID(int=1)
+    store.RESULTS["i1"] = {"run": u, "tags": {"a"}, "at": dt.date(2025, 1, 2), "ünï": "ok"}
+
+    store.save_state()
+    raw = (tmp_path / "results" / "i1.json").read_bytes()
+    assert "ünï".encode() in raw and b"\n  " in raw  # UTF-8 kept, indented
+
+    _fresh_maps(monkeypatch)
+    store.load_state()
+    assert store.INCIDENTS["i1"]["created_at"] == "2025-01-01T10:00:00.000500"
+    assert store.RESULTS["i1"] == {"run": str(u), "tags": ["a"], "at": "2025-01-02", "ünï": "ok"}
+    assert store.APPROVALS == {"i1": True}
+
+def test_mark_dirty_writes_only_changed_shards(monkeypatch, tmp_path):
+    _use_state_dir(monkeypatch, tmp_path)
+    _fresh_maps(monkeypatch)
+    monkeypatch.setattr(store, "_DIRTY", set())
+    written = []
+    real = store._write_atomic
+    monkeypatch.setattr(store, "_write_atomic", lambda p, d: (written.append(p.name), real(p, d)))
+
+    store.INCIDENTS.update({"a": {"id": "a"}, "b/..": {"id": "b/.."}})
+    store.RESULTS["a"] = {"n": 1}
+    for _ in range(50):
+        store.mark_dirty("res", "a")
+    store.mark_dirty("inc", "b/..")
+    store.mark_dirty("app")
+    store.flush_state()
+    assert sorted(written) == ["a.json", "approvals.json", "b%2F...json"]
+    assert (tmp_path / "incidents" / "b%2F...json").exists()
+
+    written.clear()
+    store.flush_state()
+    assert written == []  # nothing dirty, nothing written
+
+    del store.INCIDENTS["b/.."]
+    store.mark_dirty("inc", "b/..")
+    store.flush_state()
+    assert not (tmp_path / "incidents" / "b%2F...json").exists()
+    del store.RESULTS["a"]  # only out of the cache: the persisted result stays
+    store.mark_dirty("res", "a")
+    store.flush_state()
+    assert (tmp_path / "results" / "a.json").exists()
+
+    monkeypatch.setattr(store, "_write_atomic", lambda p, d: (_ for _ in ()).throw(OSError("disk full")))
+    store.mark_dirty("inc", "a")
+    store.flush_state()
+    assert store._DIRTY == {("inc", "a")}  # kept for the next tick
+
+def test_load_state_migrates_monoliths_and_trims_results(monkeypatch, tmp_path):
+    import orjson, os, time
+    _use_state_dir(monkeypatch, tmp_path)
+    _fresh_maps(monkeypatch, maxsize=2)
+    (tmp_path / "incidents.json").write_bytes(orjson.dumps({"i1": {"id": "i1"}, "i2": {"id": "i2"}}))
+    (tmp_path / "results").mkdir()
+    for n, iid in enumerate(["old", "mid", "new"]):
+        p = tmp_path / "results" / f"{iid}.json"
+        p.write_bytes(orjson.dumps({"n": n}))
+        os.utime(p, (time.time() - 30 + n, time.time() - 30 + n))
+    (tmp_path / "results" / "torn.json").write_bytes(b"{")
+
+    store.load_state()
+    assert set(store.INCIDENTS) == {"i1", "i2"} and not (tmp_path / "incidents.json").exists()
+    assert sorted(p.name for p in (tmp_path / "incidents").iterdir()) == ["i1.json", "i2.json"]
+    assert set(store.RESULTS) == {"mid", "new"}
+    # trimmed in memory only; every shard is still on disk
+    assert sorted(p.name for p in (tmp_path / "results").iterdir()) == ["mid.json", "new.json", "old.json", "torn.json"]
+
+def test_dumps_encodes_nested_models_without_a_copy_pass():
+    import orjson
+    from collections import namedtuple
+    from pathlib import PurePosixPath
+    from app.models import Incident
+    Pair = namedtuple("Pair", "a b")
+    class Plain:
+        def __init__(self):
+            self.tags = {"x"}
+    inc = Incident(id="i1", service="cart", severity="HIGH")
+    out = orjson.loads(store._dumps({"inc": [inc], "p": PurePosixPath("kb/a.md"),
+                                     "t": Pair(1, b"z"), "o": Plain(), "f": frozenset()}))
+    assert out["inc"][0]["id"] == "i1" and out["inc"][0]["created_at"] == inc.created_at.isoformat()
+    assert out["p"] == "kb/a.md"
+    assert out["t"] == [1, "z"]
+    assert out["o"] == {"tags": ["x"]}
+    assert out["f"] == "frozenset()"  # unknown, attribute-less types fall back to str()
+
+def test_load_state_reads_its_three_sources_concurrently(monkeypatch, tmp_path):
+    import asyncio
+    import threading
+    _use_state_dir(monkeypatch, tmp_path)
+    barrier = threading.Barrier(3, timeout=5)  # breaks unless all three reads overlap
+    def shards(root, **_bounds):
+        barrier.wait()
+        return [(root.name, {"from": root.name})]
+    def approvals():
+        barrier.wait()
+        return {"i1": True}
+    monkeypatch.setattr(store, "_load_shards", shards)
+    monkeypatch.setattr(store, "_read_approvals", approvals)
+
+    for load in (store.load_state, lambda: asyncio.run(store.aload_state())):
+        _fresh_maps(monkeypatch)
+        barrier.reset()
+        load()
+        assert store.INCIDENTS == {"incidents": {"from": "incidents"}}
+        assert dict(store.RESULTS) == {"results": {"from": "results"}}
+        assert store.APPROVALS == {"i1": True}
+
+def test_results_beyond_the_cache_stay_on_disk(monkeypatch, tmp_path):
+    import os, time
+    _use_state_dir(monkeypatch, tmp_path)
+    _fresh_maps(monkeypatch, maxsize=2)
+    root = tmp_path / "results"
+    root.mkdir()
+    now = time.time()
+    ages = {"old": 120, "r1": 30, "r2": 20, "r3": 10}  # seconds; "old" is past the 60s TTL
+    for k, age in ages.items():
+        (root / f"{k}.json").write_bytes(b'{"k": "%s"}' % k.encode())
+        os.utime(root / f"{k}.json", (now - age, now - age))
+
+    store.load_state()
+    assert dict(store.RESULTS) == {"r2": {"k": "r2"}, "r3": {"k": "r3"}}  # newest maxsize, unexpired
+    assert sorted(p.stem for p in root.iterdir()) == sorted(ages)        # nothing pruned
+
+    store.RESULTS["r4"] = {"k": "r4"}  # evicts r2 from memory
+    store.mark_dirty("res", "r2", "r4")
+    store.flush_state()
+    assert (root / "r2.json").exists() and (root / "r4.json").exists()
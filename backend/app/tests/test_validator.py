@@ -0,0 +1,100 @@
+# backend/app/tests/test_validator.py
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.validator import validator
+
+def test_window_means_come_from_cached_sorted_arrays(monkeypatch, tmp_path):
+    csv_path = tmp_path / "metrics.csv"
+    csv_path.write_text(
+        "ts,5xx_rate,latency_p95_ms\n"
+        "2025-01-01T10:05:00Z,0.2,200\n"     # after (out of order on purpose)
+        "2025-01-01T09:55:00+00:00,0.5,,\n"  # before; empty latency is skipped
+        "2025-01-01T09:58:00,0.7,600\n"      # before
+        "2025-01-01T10:10:00,0.4,400\n"      # end is exclusive
+        "not-a-time,9,9\n"
+    )
+    monkeypatch.setattr(validator, "CSV_PATH", csv_path)
+    reads = []
+    real = validator._read_rows
+    monkeypatch.setattr(validator, "_read_rows", lambda p: reads.append(p) or real(p))
+
+    inc = SimpleNamespace(created_at=datetime(2025, 1, 1, 10, 0, 0))
+    r = validator.validate(inc, {})
+    assert r["before"] == {"5xx_rate": 0.6, "latency_p95_ms": 600.0}
+    assert r["after"] == {"5xx_rate": 0.2, "latency_p95_ms": 200.0}
+    assert r["status"] == "PASS"
+    validator.validate(inc, {})
+    assert len(reads) == 1  # parsed once per file version
+
+    empty = validator.validate(SimpleNamespace(created_at=datetime(2030, 1, 1)), {})
+    assert empty["status"] == "UNKNOWN" and empty["before"] == {"5xx_rate": None, "latency_p95_ms": None}
+
+def test_arrow_parse_matches_row_parser(tmp_path):
+    import numpy as np
+    import pytest
+    pytest.importorskip("pyarrow")
+    ok = tmp_path / "ok.csv"
+    ok.write_text("ts,5xx_rate,latency_p95_ms\n"
+                  "2025-01-01T10:05:00Z,0.2,200\n"
+                  "2025-01-01T09:55:00+02:00,0.5,\n"
+                  "2025-01-01T07:58:00Z,0.7,600\n")
+    fast = validator._arrow_arrays(ok)
+    slow = validator._to_arrays(validator._read_rows(ok))
+    assert np.array_equal(fast[0], slow[0])
+    for k in validator.KPI_KEYS:
+        assert np.array_equal(fast[1][k], slow[1][k], equal_nan=True)
+
+    mixed = tmp_path / "mixed.csv"
+    mixed.write_text("ts,5xx_rate\n2025-01-01T10:05:00Z,0.2\n2025-01-01T09:55:00,x\n")
+    assert validator._arrow_arrays(mixed) is None  # left to the lenient row parser
+
+def test_candidates_of_one_incident_share_window_means(monkeypatch, tmp_path):
+    csv_path = tmp_path / "metrics.csv"
+    csv_path.write_text("ts,5xx_rate,latency_p95_ms\n2025-01-01T09:58:00,0.7,600\n2025-01-01T10:05:00,0.2,200\n")
+    monkeypatch.setattr(validator, "CSV_PATH", csv_path)
+    monkeypatch.setattr(validator, "_MEANS", type(validator._MEANS)())
+    passes = []
+    real = validator._before_after
+    monkeypatch.setattr(validator, "_before_after", lambda d, t0: passes.append(t0) or real(d, t0))
+
+    inc = SimpleNamespace(created_at=datetime(2025, 1, 1, 10, 0, 0))
+    results = [validator.validate(inc, {"id": f"p{i}"}) for i in range(4)]
+    assert len(passes) == 1 and all(r == results[0] for r in results)
+    results[0]["before"]["5xx_rate"] = -1  # callers get their own copies
+    assert validator.validate(inc, {})["before"]["5xx_rate"] == 0.7
+
+    validator.validate(SimpleNamespace(created_at=datetime(2025, 1, 1, 11)), {})
+    assert len(passes) == 2
+
+def test_refresher_publishes_snapshots_off_the_request_path(monkeypatch, tmp_path):
+    import os
+    import threading
+    import time
+    csv_path = tmp_path / "metrics.csv"
+    csv_path.write_text("ts,5xx_rate,latency_p95_ms\n2025-01-01T09:58:00,0.7,600\n2025-01-01T10:05:00,0.2,200\n")
+    monkeypatch.setattr(validator, "CSV_PATH", csv_path)
+    validator.start_refresher(interval=60)  # one parse on start, then idle for the test
+    try:
+        deadline = time.monotonic() + 5
+        while (validator._SNAPSHOT[0] or ("",))[0] != str(csv_path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        real = validator._load_arrays
+        on_request = []
+        def tracked(p):
+            if threading.current_thread().name != "validator-refresh":
+                on_request.append(p)
+            return real(p)
+        monkeypatch.setattr(validator, "_load_arrays", tracked)
+        inc = SimpleNamespace(created_at=datetime(2025, 1, 1, 10, 0, 0))
+        assert validator.validate(inc, {})["before"]["5xx_rate"] == 0.7
+        assert on_request == []  # unchanged file: the published snapshot is used as-is
+
+        # write-then-validate before the refresher's next tick sees the new rows
+        csv_path.write_text("ts,5xx_rate,latency_p95_ms\n2025-01-01T09:58:00,0.9,600\n2025-01-01T10:05:00,0.2,200\n")
+        os.utime(csv_path, ns=(time.time_ns(), time.time_ns() + 10**9))
+        assert validator.validate(inc, {})["before"]["5xx_rate"] == 0.9
+        assert on_request == [csv_path]
+    finally:
+        validator.stop_refresher()
+    assert validator._SNAPSHOT[0] is None
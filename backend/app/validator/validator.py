@@ -1,9 +1,19 @@
 # backend/app/validator/validator.py
 from __future__ import annotations
-import os, csv
+import os, csv, threading
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.compute as pc  # type: ignore
+    import pyarrow.csv as pa_csv  # type: ignore
+except Exception:  # pragma: no cover
+    pa = pc = pa_csv = None  # type: ignore
 
 CSV_PATH = Path(os.getenv("VALIDATOR_CSV", "backend/app/data/sample_metrics.csv"))
 BEFORE_MIN = int(os.getenv("VALIDATOR_BEFORE_MIN", "10"))
@@ -64,41 +74,180 @@ def _read_rows(path: Path) -> List[Dict[str, Any]]:
             rows.append(r)
     return rows
 
-def _window_mean(rows: List[Dict[str, Any]], start: datetime, end: datetime) -> Dict[str, Optional[float]]:
-    start = _naive_utc(start)
-    end   = _naive_utc(end)
-    sums   = {k: 0.0 for k in KPI_KEYS}
-    counts = {k: 0     for k in KPI_KEYS}
-    for r in rows:
-        ts = r.get("_ts")
-        if not isinstance(ts, datetime):
-            continue
-        ts = _naive_utc(ts)
-        if ts < start or ts >= end:
-            continue
-        for k in KPI_KEYS:
-            val = r.get(k)
-            if isinstance(val, (int, float)):
-                sums[k] += float(val)
-                counts[k] += 1
-    means: Dict[str, Optional[float]] = {}
+# Pre-parsed CSV: timestamps (datetime64[us], sorted) and one float64 column per KPI,
+# NaN where the cell was empty/non-numeric. Rebuilt only when the file changes.
+_Arrays = Tuple[np.ndarray, Dict[str, np.ndarray]]
+_ARRAYS: Dict[Tuple[str, int, int], _Arrays] = {}
+_ARRAYS_LOCK = threading.Lock()
+
+def _to_arrays(rows: List[Dict[str, Any]]) -> _Arrays:
+    rows = [r for r in rows if isinstance(r.get("_ts"), datetime)]
+    ts = np.array([_naive_utc(r["_ts"]) for r in rows], dtype="datetime64[us]")
+    order = np.argsort(ts, kind="stable")
+    kpis: Dict[str, np.ndarray] = {}
     for k in KPI_KEYS:
-        means[k] = (sums[k] / counts[k]) if counts[k] > 0 else None
-    return means
+        col = np.array([r.get(k) if isinstance(r.get(k), (int, float)) else np.nan for r in rows], dtype=np.float64)
+        kpis[k] = col[order]
+    return ts[order], kpis
+
+_TS_COLUMNS = ("ts", "timestamp", "time", "datetime")
+
+def _arrow_arrays(path: Path) -> Optional[_Arrays]:
+    """Columnar parse in pyarrow's threaded C++ reader. None when pyarrow is missing or
+    the file needs the lenient row parser (mixed tz/naive stamps, junk cells, ragged rows)."""
+    if pa_csv is None:
+        return None
+    with path.open(newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+    ts_cols = [c for c in _TS_COLUMNS if c in header]
+    if len(ts_cols) != 1:
+        return None  # the row parser falls back across several stamp columns per row
+    ts_col = ts_cols[0]
+    kpis = [k for k in KPI_KEYS if k in header]
+    # zoned stamps ("...Z", "+02:00") parse as UTC, naive ones are taken as-is (like _naive_utc)
+    for ts_type in (pa.timestamp("us", tz="UTC"), pa.timestamp("us")):
+        try:
+            table = pa_csv.read_csv(path, convert_options=pa_csv.ConvertOptions(
+                include_columns=[ts_col, *kpis],
+                column_types={ts_col: ts_type, **{k: pa.float64() for k in kpis}},
+            ))
+            break
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            continue
+    else:
+        return None
+    table = table.filter(pc.is_valid(table[ts_col])).sort_by(ts_col)
+    ts = table[ts_col].to_numpy().astype("datetime64[us]")
+    n = len(ts)
+    cols = {k: table[k].to_numpy().astype(np.float64) if k in kpis else np.full(n, np.nan) for k in KPI_KEYS}
+    return ts, cols
+
+def _file_key(path: Path) -> Optional[Tuple[str, int, int]]:
+    """Version of the file (path, mtime, size); None when it is missing."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+def _load_arrays(path: Path) -> Tuple[Optional[Tuple[str, int, int]], _Arrays]:
+    """(file version key, arrays); the key is None when the file is missing."""
+    key = _file_key(path)
+    if key is None:
+        return None, _to_arrays([])
+    with _ARRAYS_LOCK:
+        hit = _ARRAYS.get(key)
+    if hit is None:
+        try:
+            hit = _arrow_arrays(path)
+        except Exception:
+            hit = None
+        if hit is None:
+            hit = _to_arrays(_read_rows(path))
+        with _ARRAYS_LOCK:
+            _ARRAYS.clear()  # only the current version of the file is worth keeping
+            _ARRAYS[key] = hit
+    return key, hit
+
+# Background refresher: a daemon thread polls the CSV's stat and re-parses it when it
+# changes, publishing (path, version key, arrays) into a single slot that is swapped
+# whole. While it runs, validate() only loads that reference and never parses.
+REFRESH_INTERVAL_S = float(os.getenv("VALIDATOR_REFRESH_S", "2"))
+_SNAPSHOT: List[Optional[Tuple[str, Optional[Tuple[str, int, int]], _Arrays]]] = [None]
+_refresher: Optional[threading.Thread] = None
+_refresh_stop = threading.Event()
+
+def refresh(path: Optional[Path] = None) -> bool:
+    """Publish the current version of path (default CSV_PATH); True when it changed."""
+    path = path or CSV_PATH
+    key, data = _load_arrays(path)
+    snap = _SNAPSHOT[0]
+    if snap is not None and snap[:2] == (str(path), key):
+        return False
+    _SNAPSHOT[0] = (str(path), key, data)
+    return True
+
+def _refresh_loop(interval: float) -> None:
+    while True:
+        try:
+            refresh()
+        except Exception:
+            pass  # keep serving the last good snapshot
+        if _refresh_stop.wait(interval):
+            return
+
+def start_refresher(interval: float = REFRESH_INTERVAL_S) -> None:
+    """Start the refresher thread (idempotent); the first parse happens on it, not on a request."""
+    global _refresher
+    if _refresher is not None and _refresher.is_alive():
+        return
+    _refresh_stop.clear()
+    _refresher = threading.Thread(target=_refresh_loop, args=(interval,), name="validator-refresh", daemon=True)
+    _refresher.start()
+
+def stop_refresher(timeout: float = 2.0) -> None:
+    global _refresher
+    t, _refresher = _refresher, None
+    _refresh_stop.set()
+    if t is not None:
+        t.join(timeout)
+    _SNAPSHOT[0] = None
+
+def _current_arrays(path: Path) -> Tuple[Optional[Tuple[str, int, int]], _Arrays]:
+    snap = _SNAPSHOT[0]  # read the slot once; the refresher may swap it meanwhile
+    # the refresher only pre-warms the parse: a stat still decides, so metrics written
+    # just before /run are never validated against the previous version of the file
+    if snap is not None and snap[0] == str(path) and _refresher is not None and _file_key(path) == snap[1]:
+        return snap[1], snap[2]
+    return _load_arrays(path)  # refresher off (tests, scripts), not caught up yet, or file changed
+
+Means = Dict[str, Optional[float]]
+
+def _masked_mean(col: np.ndarray) -> Optional[float]:
+    col = col[~np.isnan(col)]
+    return float(col.mean()) if col.size else None
+
+def _before_after(data: _Arrays, t0: datetime) -> Tuple[Means, Means]:
+    """Both windows ([t0-BEFORE, t0) and [t0, t0+AFTER)) from one searchsorted over the 3 edges."""
+    ts, kpis = data
+    edges = np.array([t0 - timedelta(minutes=BEFORE_MIN), t0, t0 + timedelta(minutes=AFTER_MIN)],
+                     dtype="datetime64[us]")
+    lo, mid, hi = np.searchsorted(ts, edges, side="left")
+    before = {k: _masked_mean(kpis[k][lo:mid]) for k in KPI_KEYS}
+    after = {k: _masked_mean(kpis[k][mid:hi]) for k in KPI_KEYS}
+    return before, after
+
+# Every candidate of an incident replays the same windows around the same t0, so the
+# means are memoized per (file version, t0) and the K validate() calls share one pass.
+MEANS_CACHE_MAX = 128
+_MEANS: "OrderedDict[Tuple[Any, datetime], Tuple[Means, Means]]" = OrderedDict()
+
+def _window_means(path: Path, t0: datetime) -> Tuple[Means, Means]:
+    key, data = _current_arrays(path)
+    ck = (key, t0)
+    with _ARRAYS_LOCK:
+        hit = _MEANS.get(ck)
+        if hit is not None:
+            _MEANS.move_to_end(ck)
+    if hit is None:
+        hit = _before_after(data, t0)
+        if key is not None:
+            with _ARRAYS_LOCK:
+                _MEANS[ck] = hit
+                while len(_MEANS) > MEANS_CACHE_MAX:
+                    _MEANS.popitem(last=False)
+    return dict(hit[0]), dict(hit[1])
 
 def validate(incident: Any, candidate: Dict[str, Any], window: int = 60) -> Dict[str, Any]:
     """
     Offline heuristic validation using sample_metrics.csv around incident.created_at.
     Returns: {status, before, after, kpi_deltas, notes}
     """
-    rows = _read_rows(CSV_PATH)
-
     # Anchor time: incident.created_at if present, else now
     t0_attr = getattr(incident, "created_at", None)
     t0 = _naive_utc(_to_dt(t0_attr)) if t0_attr else _naive_utc(datetime.utcnow())
 
-    before = _window_mean(rows, t0 - timedelta(minutes=BEFORE_MIN), t0)
-    after  = _window_mean(rows, t0, t0 + timedelta(minutes=AFTER_MIN))
+    before, after = _window_means(CSV_PATH, t0)
 
     deltas: Dict[str, Optional[float]] = {}
     checks: List[bool] = []
@@ -0,0 +1,28 @@
+
+from __future__ import annotations
+import argparse, json, sys
+from pathlib import Path
+
+import msgpack
+
+DEFAULT_AUDIT_FILE = "state/logs/audit.mpk"
+
+def main():
+    ap = argparse.ArgumentParser(description="Dump a msgpack audit log (AUDIT_FORMAT=msgpack) as JSON lines")
+    ap.add_argument("path", nargs="?", default=DEFAULT_AUDIT_FILE)
+    ap.add_argument("--tail", type=int, default=0, help="only print the last N records")
+    args = ap.parse_args()
+
+    p = Path(args.path)
+    if not p.exists():
+        raise SystemExit(f"[audit_dump] no such file: {p}")
+
+    with p.open("rb") as f:
+        records = list(msgpack.Unpacker(f, raw=False))
+    if args.tail > 0:
+        records = records[-args.tail:]
+    for rec in records:
+        sys.stdout.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+if __name__ == "__main__":
+    main()
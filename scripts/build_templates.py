@@ -0,0 +1,38 @@
+
+from __future__ import annotations
+import argparse
+from pathlib import Path
+
+# AOT-compile backend/app/templates/*.html into importable Python modules so workers
+# skip Jinja's lexer/parser at startup. Re-run after editing a template; a stale
+# module is ignored at runtime (its SOURCE_SHA1 no longer matches the .html).
+
+from backend.app.reporter.html import _TEMPLATE_DIR, _env, template_sha1
+
+DEFAULT_OUT = Path(__file__).resolve().parents[1] / "backend" / "app" / "templates_compiled"
+
+HEADER = (
+    "# Generated by scripts/build_templates.py from templates/{name}; do not edit.\n"
+    "# flake8: noqa\n"
+    "SOURCE_SHA1 = {sha!r}\n"
+    # compiled code binds `environment` at def time; reporter.html defines _env before importing us
+    "from ..reporter.html import _env as environment\n"
+)
+
+def main():
+    ap = argparse.ArgumentParser(description="Compile Jinja templates to Python modules")
+    ap.add_argument("--out", default=str(DEFAULT_OUT))
+    args = ap.parse_args()
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    (out / "__init__.py").touch()
+
+    for src in sorted(_TEMPLATE_DIR.glob("*.html")):
+        code = _env.compile(src.read_text(encoding="utf-8"), name=src.name, filename=str(src), raw=True)
+        target = out / f"{src.stem}.py"
+        target.write_text(HEADER.format(name=src.name, sha=template_sha1(src.name)) + code, encoding="utf-8")
+        print(f"[build_templates] {src.name} -> {target}")
+
+if __name__ == "__main__":
+    main()
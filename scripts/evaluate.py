@@ -1,40 +1,40 @@
 
 from __future__ import annotations
-import argparse, json, time
+import argparse, time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
-# stdlib HTTP (same helper shape as simulator)
-import http.client
-from urllib.parse import urlparse
-
-from simulate_incident import run_one, SCENARIOS  # reuse your simulator
+# stdlib HTTP: same pooled keep-alive connections as the simulator
+from simulate_incident import run_one, SCENARIOS, Resp, _send, _dumps, _parse  # reuse your simulator
 
 DEFAULT_BASE_URL = "http://localhost:8000"
 
-def _http_request(method: str, url: str, headers: Optional[dict] = None) -> dict:
-    p = urlparse(url)
-    conn = http.client.HTTPConnection(p.hostname, p.port or 80, timeout=8)
-    path = (p.path or "/") + (("?" + p.query) if p.query else "")
+# gateway hiccups on idempotent GETs are retried with exponential backoff (0.1s, 0.2s, 0.4s)
+RETRY_STATUS = (502, 503, 504)
+RETRIES = 3
+BACKOFF_S = 0.1
+
+def _http_request(method: str, base_url: str, path: str, headers: Optional[dict] = None) -> Resp:
     hdrs = {"Accept": "application/json"}
     if headers:
         hdrs.update(headers)
-    conn.request(method, path, headers=hdrs)
-    resp = conn.getresponse()
-    raw = resp.read().decode("utf-8") or "{}"
-    try:
-        js = json.loads(raw)
-    except Exception:
-        js = {"_raw": raw}
-    return {"status": resp.status, "json": js}
+    retries = RETRIES if method == "GET" else 0
+    for attempt in range(retries + 1):
+        status, data = _send(method, base_url, path, None, hdrs, timeout=8)  # pooled keep-alive connection
+        if status not in RETRY_STATUS or attempt == retries:
+            break
+        time.sleep(BACKOFF_S * (2 ** attempt))
+    return Resp(status, _parse(data))
 
 def _get_candidates(base_url: str, incident_id: str, api_key: Optional[str]) -> List[Dict[str, Any]]:
     headers = {"x-api-key": api_key} if api_key else None
-    r = _http_request("GET", f"{base_url}/incidents/{incident_id}/candidates", headers=headers)
-    if r["status"] != 200:
-        raise RuntimeError(f"candidates HTTP {r['status']} → {r['json']}")
-    return r["json"]
+    r = _http_request("GET", base_url, f"/incidents/{incident_id}/candidates", headers=headers)
+    if r.status != 200:
+        raise RuntimeError(f"candidates HTTP {r.status} → {r.json}")
+    return r.json
 
 def evaluate_once(
     base_url: str,
@@ -56,13 +56,10 @@ def evaluate_once(
     )
     cands = _get_candidates(base_url, inc_id, api_key)
 
-    policy_ok = sum(1 for c in cands if c.get("policy_ok"))
-    policy_block = len(cands) - policy_ok
-
-    val_pass = 0
-    val_fail = 0
-    val_unknown = 0
+    policy_ok = val_pass = val_fail = val_unknown = 0
     for c in cands:
+        if c.get("policy_ok"):
+            policy_ok += 1
         v = c.get("validation") or {}
         st = (v.get("status") or "UNKNOWN").upper()
         if st == "PASS":
@@ -71,6 +68,7 @@ def evaluate_once(
             val_fail += 1
         else:
             val_unknown += 1
+    policy_block = len(cands) - policy_ok
 
     elapsed = time.time() - t0
     return {
@@ -85,6 +83,15 @@ def evaluate_once(
         "elapsed_sec": round(elapsed, 3),
     }
 
+def _rates(a: list) -> Dict[str, float]:
+    runs, ctot, ok, passed, elapsed = a
+    return {
+        "avg_candidates": round(ctot / runs, 2),
+        "policy_ok_rate": round(ok / max(1, ctot), 3),
+        "validation_pass_rate": round(passed / max(1, ctot), 3),
+        "avg_elapsed_sec": round(elapsed / runs, 3),
+    }
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--base-url", default=DEFAULT_BASE_URL)
@@ -95,21 +102,28 @@ def main():
     ap.add_argument("--after-min", type=int, default=10)
     ap.add_argument("--api-key", default=None)
     ap.add_argument("--save", default=None, help="path to write JSON results (optional)")
+    ap.add_argument("--concurrency", type=int, default=1,
+                    help="runs in flight at once (metrics CSV write + pipeline run stay serialized)")
     args = ap.parse_args()
 
     base = args.base_url.rstrip("/")
     scenarios = list(SCENARIOS.keys()) if args.scenario == "all" else [args.scenario]
 
-    results: List[Dict[str, Any]] = []
-    for sk in scenarios:
-        for i in range(args.runs):
-            print(f"[eval] {sk} run {i+1}/{args.runs}")
-            try:
-                r = evaluate_once(base, sk, Path(args.csv), args.before_min, args.after_min, args.api_key)
-                results.append(r)
-                print(" ", r)
-            except Exception as e:
-                print(f"  error: {e}")
+    def one(job) -> Optional[Dict[str, Any]]:
+        sk, i = job
+        print(f"[eval] {sk} run {i+1}/{args.runs}")
+        try:
+            r = evaluate_once(base, sk, Path(args.csv), args.before_min, args.after_min, args.api_key)
+            print(" ", r)
+            return r
+        except Exception as e:
+            print(f"  error: {e}")
+            return None
+
+    jobs = [(sk, i) for sk in scenarios for i in range(args.runs)]
+    # independent runs: detect / candidates calls overlap, results keep submission order
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        results: List[Dict[str, Any]] = [r for r in pool.map(one, jobs) if r is not None]
 
     # summarize
     total = len(results)
@@ -117,34 +131,28 @@ def main():
         print("[eval] no results to summarize")
         return
 
-    agg = {
-        "total_runs": total,
-        "avg_candidates": round(sum(r["candidates"] for r in results) / total, 2),
-        "policy_ok_rate": round(sum(r["policy_ok"] for r in results) / max(1, sum(r["candidates"] for r in results)), 3),
-        "validation_pass_rate": round(sum(r["validation_pass"] for r in results) / max(1, sum(r["candidates"] for r in results)), 3),
-        "avg_elapsed_sec": round(sum(r["elapsed_sec"] for r in results) / total, 3),
-        "by_scenario": {},
-    }
+    # one pass: overall totals and per-scenario [runs, candidates, policy_ok, validation_pass, elapsed]
+    tot = [0, 0, 0, 0, 0.0]
+    acc: Dict[str, list] = defaultdict(lambda: [0, 0, 0, 0, 0.0])
+    for r in results:
+        row = (1, r["candidates"], r["policy_ok"], r["validation_pass"], r["elapsed_sec"])
+        a = acc[r["scenario"]]
+        for k, v in enumerate(row):
+            tot[k] += v
+            a[k] += v
+
+    agg = {"total_runs": total, **_rates(tot), "by_scenario": {}}
     for sk in scenarios:
-        subset = [r for r in results if r["scenario"] == sk]
-        if not subset: 
-            continue
-        ctot = sum(r["candidates"] for r in subset)
-        agg["by_scenario"][sk] = {
-            "runs": len(subset),
-            "avg_candidates": round(ctot / len(subset), 2),
-            "policy_ok_rate": round(sum(r["policy_ok"] for r in subset) / max(1, ctot), 3),
-            "validation_pass_rate": round(sum(r["validation_pass"] for r in subset) / max(1, ctot), 3),
-            "avg_elapsed_sec": round(sum(r["elapsed_sec"] for r in subset) / len(subset), 3),
-        }
+        if sk in acc:
+            agg["by_scenario"][sk] = {"runs": acc[sk][0], **_rates(acc[sk])}
 
     print("\n=== SUMMARY ===")
-    print(json.dumps(agg, indent=2))
+    print(_dumps(agg, indent=True).decode("utf-8"))
 
     if args.save:
         Path(args.save).parent.mkdir(parents=True, exist_ok=True)
         out = {"results": results, "summary": agg, "generated_at": datetime.utcnow().isoformat() + "Z"}
-        Path(args.save).write_text(json.dumps(out, indent=2), encoding="utf-8")
+        Path(args.save).write_bytes(_dumps(out, indent=True))
         print(f"[eval] wrote {args.save}")
 
 if __name__ == "__main__":
@@ -0,0 +1,34 @@
+
+from __future__ import annotations
+import argparse
+from pathlib import Path
+
+# One-off build step (needs `pip install optimum[onnxruntime]`; not a runtime dependency).
+# Writes model.onnx, model.int8.onnx and tokenizer.json into --out for CHROMA_EMBED_BACKEND=onnx.
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_OUT = "models/all-MiniLM-L6-v2-int8"
+
+def main():
+    ap = argparse.ArgumentParser(description="Export a sentence-transformer to ONNX and quantize it to int8")
+    ap.add_argument("--model", default=DEFAULT_MODEL)
+    ap.add_argument("--out", default=DEFAULT_OUT)
+    args = ap.parse_args()
+
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoTokenizer
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+
+    model = ORTModelForFeatureExtraction.from_pretrained(args.model, export=True)
+    model.save_pretrained(out)
+    AutoTokenizer.from_pretrained(args.model).save_pretrained(out)
+
+    # dynamic quantization: int8 weights, activations quantized per batch at runtime
+    quantize_dynamic(str(out / "model.onnx"), str(out / "model.int8.onnx"), weight_type=QuantType.QInt8)
+    print(f"[export_onnx] wrote {out / 'model.int8.onnx'}")
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,66 @@
 
 from __future__ import annotations
-import os, glob, sys, traceback, hashlib
+import os, re, glob, sys, traceback, hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-PRIMITIVES = (str, int, float, bool)
-
-def _clean_meta(d: dict) -> dict:
-    out = {}
-    for k, v in (d or {}).items():
-        if v is None:
-            continue
-        out[k] = v if isinstance(v, PRIMITIVES) else str(v)
-    return out
+# docs embedded + written per round trip; Chroma caps a single write at client.get_max_batch_size()
+SEED_BATCH = int(os.getenv("SEED_BATCH", "256"))
 
 def _stable_id_from_path(p: Path) -> str:
     # deterministic across reruns and unaffected by list order
     h = hashlib.sha256(p.as_posix().encode("utf-8")).hexdigest()
     return h
 
-def _title_from_md(p: Path, fallback: str) -> str:
+def _content_hash(text: str, meta: dict, embedder: str) -> str:
+    # covers everything a re-seed would write: body, metadata, and which model embeds it
+    h = hashlib.blake2b(digest_size=16)
+    for part in (embedder, text, *(f"{k}={meta[k]}" for k in sorted(meta))):
+        h.update(part.encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+# one line, up to any of the separators str.splitlines() breaks on
+_FIRST_LINE = re.compile(r"[^\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]*")
+
+def _title_from_md(text: str, fallback: str) -> str:
+    # common case: the heading is the first non-blank line, so don't split the whole doc
+    head = text.lstrip()
+    if head.startswith("#"):
+        return _FIRST_LINE.match(head).group().strip().lstrip("#").strip() or fallback
+    for line in text.splitlines():
+        s = line.strip()
+        if s.startswith("#"):
+            return s.lstrip("#").strip() or fallback
+    return fallback
+
+READ_WORKERS = 16
+
+def _read(fp: str) -> tuple[Path, str | None]:
+    """(path, text); None for anything that isn't a regular file. Each file is read once."""
+    p = Path(fp)
+    if not p.is_file():
+        return p, None
     try:
-        for line in p.read_text(encoding="utf-8", errors="ignore").splitlines():
-            s = line.strip()
-            if s.startswith("#"):
-                return s.lstrip("#").strip() or fallback
+        return p, p.read_text(encoding="utf-8")
     except Exception:
-        pass
-    return fallback
+        return p, p.read_text(encoding="utf-8", errors="ignore")
+
+# Known services in priority order (the first match wins when several apply)
+SERVICES = ("checkout", "payments", "cart", "search", "auth", "db", "cache", "api", "gateway")
+_SERVICE_RANK = {svc: i for i, svc in enumerate(SERVICES)}
+_SERVICE_LENS = frozenset(len(svc) for svc in SERVICES)
 
 def _infer_kind_service(p: Path, name: str) -> tuple[str, str]:
-    parts = [x.lower() for x in p.parts]
+    parts = {x.lower() for x in p.parts}
     kind = "runbook" if "runbook" in parts else ("incident" if "incidents" in parts or "incident" in parts else "doc")
     stem = p.stem.lower()
-    # service from folder or name prefix
-    for svc in ["checkout","payments","cart","search","auth","db","cache","api","gateway"]:
-        if svc in parts or stem.startswith(svc):
-            return kind, svc
+    # service from folder or name prefix: set lookups instead of scanning every service
+    hits = (parts | {stem[:n] for n in _SERVICE_LENS}) & _SERVICE_RANK.keys()
+    if hits:
+        return kind, min(hits, key=_SERVICE_RANK.__getitem__)
     # fallbacks: filename tokens before first '_' or '-'
-    token = stem.split("_")[0].split("-")[0]
+    token = stem.partition("_")[0].partition("-")[0]
     return kind, (token if token and token not in {"runbook","incident"} else "generic")
 
 def main():
@@ -58,7 +81,16 @@ def main():
         print("ERROR: chromadb import failed:", repr(e))
         raise
 
-    ef = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=MODEL)
+    if os.getenv("CHROMA_EMBED_BACKEND", "").strip().lower() == "onnx":
+        # same ORT embedder as the backend, so seeded vectors match query vectors
+        sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+        from app.investigators.onnx_embedding import ORTEmbedding
+        onnx_dir = os.getenv("CHROMA_ONNX_DIR", "models/all-MiniLM-L6-v2-int8")
+        ef = ORTEmbedding(onnx_dir)
+        embedder = f"onnx:{onnx_dir}"
+    else:
+        ef = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=MODEL)
+        embedder = f"st:{MODEL}"
 
     try:
         client = chromadb.PersistentClient(path=VECTOR_DB_DIR)
@@ -74,37 +106,54 @@ def main():
     files = sorted(glob.glob(KB_GLOB, recursive=True))
     print(f"KB_GLOB={KB_GLOB} matched {len(files)} files")
 
+    # overlap file reads (network mounts, big KBs); map keeps glob order
+    with ThreadPoolExecutor(max_workers=max(1, min(READ_WORKERS, len(files)))) as ex:
+        contents = list(ex.map(_read, files))
+
     docs, ids, metas = [], [], []
-    for fp in files:
-        p = Path(fp)
-        if not p.is_file():
+    for p, text in contents:
+        if text is None:
             continue
-        try:
-            text = p.read_text(encoding="utf-8")
-        except Exception:
-            text = p.read_text(errors="ignore")
         name = p.name
-        title = _title_from_md(p, fallback=name)
+        title = _title_from_md(text, fallback=name)
         kind, service = _infer_kind_service(p, name)
 
-        meta = _clean_meta({
+        # every field is already a str, so Chroma takes the dict as-is
+        meta = {
             "filename": name,
             "path": str(p),
             "uri": f"file://{p.as_posix()}",
             "title": title,
             "kind": kind,
             "service": service,
-        })
+            "snippet": text[:400],  # lets /kb/docs list without reading bodies
+        }
+        meta["content_hash"] = _content_hash(text, meta, embedder)
         docs.append(text)
         ids.append(_stable_id_from_path(p))
         metas.append(meta)
 
+    # Embed outside the write and pass vectors in, one bounded batch at a time. The
+    # collection's own ef is used, so seeded vectors match what the backend queries with.
+    # Docs whose stored content_hash still matches are skipped (no re-embedding).
+    write = coll.upsert if hasattr(coll, "upsert") else coll.add
+    batch = max(1, SEED_BATCH)
+    try:
+        batch = min(batch, client.get_max_batch_size())
+    except Exception:
+        pass
+    written = 0
     try:
-        if docs:
-            if hasattr(coll, "upsert"):
-                coll.upsert(documents=docs, metadatas=metas, ids=ids)
-            else:
-                coll.add(documents=docs, metadatas=metas, ids=ids)
+        for i in range(0, len(docs), batch):
+            existing = coll.get(ids=ids[i:i + batch], include=["metadatas"])
+            known = {k: (m or {}).get("content_hash") for k, m in zip(existing["ids"], existing["metadatas"])}
+            todo = [j for j in range(i, min(i + batch, len(docs))) if known.get(ids[j]) != metas[j]["content_hash"]]
+            if todo:
+                sub = [docs[j] for j in todo]
+                write(ids=[ids[j] for j in todo], documents=sub, metadatas=[metas[j] for j in todo],
+                      embeddings=ef(sub))
+                written += len(todo)
+            print(f"  checked {min(i + batch, len(docs))}/{len(docs)}, upserted {written}")
     except Exception:
         print("ERROR: writing to collection failed:\n", traceback.format_exc())
         raise
@@ -113,7 +162,7 @@ def main():
         count = coll.count()
     except Exception:
         count = -1
-    print(f"Seeded {len(docs)} docs. Collection count now: {count}")
+    print(f"Seeded {written} new/changed of {len(docs)} docs. Collection count now: {count}")
 
 if __name__ == "__main__":
     try:
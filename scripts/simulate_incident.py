@@ -1,35 +1,39 @@
 
 from __future__ import annotations
-import argparse, json, random
-from datetime import datetime, timedelta, timezone
+import argparse, json, threading
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Tuple, Iterable, Optional
+from typing import IO, Any, Dict, List, NamedTuple, Tuple, Optional
 import http.client
+from functools import lru_cache
 from urllib.parse import urlparse
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+def _dumps(obj, indent: bool = False) -> bytes:
+    """UTF-8 JSON bytes (orjson when installed; http.client sends bytes as-is)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+_loads = orjson.loads if orjson is not None else json.loads  # both accept bytes
+
 DEFAULT_BASE_URL = "http://localhost:8000"
 DEFAULT_CSV = "backend/app/data/sample_metrics.csv"
 
-MetricRow = Tuple[datetime, str, float]  # (ts, metric, value)
+# minute-cadence samples as columns: (ts as datetime64[us] UTC, error_rate_pct, latency_p95_ms)
+Series = Tuple[np.ndarray, np.ndarray, np.ndarray]
 ERR_NAME = "error_rate_pct"
 P95_NAME = "latency_p95_ms"
 
 def _now_utc() -> datetime:
     return datetime.now(timezone.utc)
 
-def _ts_iso_z(dt: datetime) -> str:
-    return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
-
-def _range_minutes(start: datetime, end: datetime, step_min: int = 1) -> Iterable[datetime]:
-    t = start
-    delta = timedelta(minutes=step_min)
-    while t < end:
-        yield t
-        t += delta
-
-def _noise(scale: float) -> float:
-    return (random.random() * 2 - 1) * scale
-
 def _make_series(
     t0: datetime,
     before_min: int,
@@ -39,19 +43,24 @@ def _make_series(
     drop_err_rel: float = 0.0,
     drop_p95_rel: float = 0.0,
     cadence_min: int = 1,
-) -> List[MetricRow]:
-    rows: List[MetricRow] = []
-    t_start = t0 - timedelta(minutes=before_min)
-    t_end   = t0 + timedelta(minutes=after_min)
-    for ts in _range_minutes(t_start, t0, cadence_min):
-        rows.append((ts, ERR_NAME, base_err_pct + _noise(base_err_pct * 0.05)))
-        rows.append((ts, P95_NAME, base_p95_ms + _noise(base_p95_ms * 0.05)))
-    err_after = base_err_pct * (1.0 - drop_err_rel)
-    p95_after = base_p95_ms * (1.0 - drop_p95_rel)
-    for ts in _range_minutes(t0, t_end, cadence_min):
-        rows.append((ts, ERR_NAME, max(0.0, err_after + _noise(base_err_pct * 0.05))))
-        rows.append((ts, P95_NAME, max(0.0, p95_after + _noise(base_p95_ms * 0.05))))
-    return rows
+    rng: Optional[np.random.Generator] = None,
+) -> Series:
+    """Flat +/-5% noise around the baselines before t0, the dropped levels (floored at 0) after."""
+    rng = rng or np.random.default_rng()
+    offs = np.concatenate([np.arange(-before_min, 0, cadence_min), np.arange(0, after_min, cadence_min)])
+    n_before = int((offs < 0).sum())
+    t0_us = np.datetime64(t0.astimezone(timezone.utc).replace(tzinfo=None), "us")
+    ts = t0_us + offs.astype("timedelta64[m]")
+    after = slice(n_before, None)
+    err = np.full(offs.size, float(base_err_pct))
+    p95 = np.full(offs.size, float(base_p95_ms))
+    err[after] *= 1.0 - drop_err_rel
+    p95[after] *= 1.0 - drop_p95_rel
+    err += rng.uniform(-1.0, 1.0, offs.size) * (base_err_pct * 0.05)
+    p95 += rng.uniform(-1.0, 1.0, offs.size) * (base_p95_ms * 0.05)
+    np.maximum(err[after], 0.0, out=err[after])
+    np.maximum(p95[after], 0.0, out=p95[after])
+    return ts, err, p95
 
 # -------------------------- Scenarios (edit freely) --------------------------
 
@@ -85,50 +94,111 @@ SCENARIOS = {
     },
 }
 
+# detect payloads are fixed per scenario: encoded once, POSTed verbatim
+_DETECT_BODIES: Dict[str, bytes] = {
+    k: _dumps({"service": v["service"], "suspected_cause": v["suspected_cause"], "signals": v["signals"]})
+    for k, v in SCENARIOS.items()
+}
+
 # ------------------------------- HTTP helpers --------------------------------
 
-def _http_request(method: str, url: str, body: Optional[dict] = None, headers: Optional[dict] = None) -> dict:
-    """Small stdlib client with verbose error visibility."""
-    p = urlparse(url)
-    conn = http.client.HTTPConnection(p.hostname, p.port or 80, timeout=5)
-    path = (p.path or "/") + (("?" + p.query) if p.query else "")
-    payload = json.dumps(body) if body is not None else None
+# One keep-alive HTTP/1.1 connection per (host, port) and thread, reused across calls
+# (evaluate.py shares them), so the TCP handshake happens once per host instead of once
+# per request. HTTPConnection isn't thread-safe, hence one pool per thread.
+_LOCAL = threading.local()
+
+def _conn_pool() -> Dict[Tuple[str, int], http.client.HTTPConnection]:
+    pool = getattr(_LOCAL, "pool", None)
+    if pool is None:
+        pool = _LOCAL.pool = {}
+    return pool
+# a reused socket the server already closed fails like this; retried once on a fresh one
+_STALE = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError)
+
+@lru_cache(maxsize=8)
+def _split_base(base_url: str) -> Tuple[Tuple[str, int], str]:
+    """((host, port), path prefix) of a base URL; parsed once, not per request."""
+    p = urlparse(base_url)
+    return (p.hostname, p.port or 80), p.path.rstrip("/")
+
+def _send(method: str, base_url: str, path: str, body: Optional[bytes], headers: dict,
+          timeout: float) -> Tuple[int, bytes]:
+    key, prefix = _split_base(base_url)
+    path = prefix + path
+    pool = _conn_pool()
+    for attempt in (0, 1):
+        conn = pool.get(key)
+        if conn is None:
+            conn = pool[key] = http.client.HTTPConnection(*key, timeout=timeout)
+        reused = conn.sock is not None
+        conn.timeout = timeout
+        if reused:
+            conn.sock.settimeout(timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            return resp.status, resp.read()  # read fully so the socket can carry the next request
+        except Exception as e:
+            conn.close()
+            pool.pop(key, None)
+            if not (reused and attempt == 0 and isinstance(e, _STALE)):
+                raise
+    raise AssertionError("unreachable")
+
+class Resp(NamedTuple):
+    status: int
+    json: Any  # parsed body, or {"_raw": text} when it is not JSON
+
+def _parse(data: bytes) -> Any:
+    try:
+        return _loads(data or b"{}")
+    except ValueError:  # json / orjson decode errors (and bad UTF-8) are ValueErrors
+        return {"_raw": data.decode("utf-8", "replace")}
+
+def _http_request(method: str, base_url: str, path: str, body: Optional[dict | bytes] = None,
+                  headers: Optional[dict] = None) -> Resp:
+    """Small stdlib client with verbose error visibility. bytes bodies are sent as-is."""
+    payload = body if body is None or isinstance(body, bytes) else _dumps(body)
     hdrs = {"Content-Type": "application/json"}
     if headers:
         hdrs.update(headers)
-    conn.request(method, path, body=payload, headers=hdrs)
-    resp = conn.getresponse()
-    raw = resp.read().decode("utf-8") or "{}"
-    try:
-        parsed = json.loads(raw)
-    except Exception:
-        parsed = {"_raw": raw}
-    return {"status": resp.status, "json": parsed}
+    status, data = _send(method, base_url, path, payload, hdrs, timeout=5)
+    return Resp(status, _parse(data))
 
-def _detect(base_url: str, service: str, suspected_cause: str, signals: List[dict], api_key: Optional[str]) -> Optional[str]:
+def _detect(base_url: str, body: bytes, api_key: Optional[str]) -> Optional[str]:
     headers = {"x-api-key": api_key} if api_key else None
-    r = _http_request("POST", f"{base_url}/incidents/detect",
-                      {"service": service, "suspected_cause": suspected_cause, "signals": signals},
-                      headers=headers)
-    if r["status"] >= 300:
-        print(f"[detect] HTTP {r['status']} → {r['json']}")
+    r = _http_request("POST", base_url, "/incidents/detect", body, headers=headers)
+    if r.status >= 300:
+        print(f"[detect] HTTP {r.status} → {r.json}")
         return None
-    return (r.get("json") or {}).get("id")
+    return (r.json or {}).get("id")
 
 def _approve(base_url: str, incident_id: str, api_key: Optional[str]) -> None:
     headers = {"x-api-key": api_key} if api_key else None
-    r = _http_request("POST", f"{base_url}/incidents/{incident_id}/approve?approved=true", headers=headers)
-    if r["status"] >= 300:
-        print(f"[approve] HTTP {r['status']} → {r['json']}")
+    r = _http_request("POST", base_url, f"/incidents/{incident_id}/approve?approved=true", headers=headers)
+    if r.status >= 300:
+        print(f"[approve] HTTP {r.status} → {r.json}")
 
 def _run_pipeline(base_url: str, incident_id: str, api_key: Optional[str]) -> None:
     headers = {"x-api-key": api_key} if api_key else None
-    r = _http_request("POST", f"{base_url}/incidents/{incident_id}/run", headers=headers)
-    if r["status"] >= 300:
-        print(f"[run] HTTP {r['status']} → {r['json']}")
+    r = _http_request("POST", base_url, f"/incidents/{incident_id}/run", headers=headers)
+    if r.status >= 300:
+        print(f"[run] HTTP {r.status} → {r.json}")
 
 # ---------------------------------- Driver -----------------------------------
 
+def _csv_body(ts: np.ndarray, err: np.ndarray, p95: np.ndarray) -> str:
+    """All "ts,metric,value" rows of a series as one string (stamps formatted in one numpy pass)."""
+    stamps = np.datetime_as_string(ts, unit="us", timezone="UTC").tolist()
+    return "".join([
+        f"{t},{ERR_NAME},{e:.4f}\n{t},{P95_NAME},{p:.4f}\n"
+        for t, e, p in zip(stamps, err.tolist(), p95.tolist())
+    ])
+
+# The backend validates against the one metrics CSV, so writing a run's series and
+# running its pipeline must not interleave with another run (evaluate.py --concurrency)
+_METRICS_LOCK = threading.Lock()
+
 def run_one(
     base_url: str,
     csv_path: Path,
@@ -137,16 +207,18 @@ def run_one(
     after_min: int,
     mode: str,
     api_key: Optional[str],
+    rng: Optional[np.random.Generator] = None,
+    csv_fh: Optional[IO[str]] = None,
 ) -> str:
     sc = SCENARIOS[scenario_key]
     t0 = _now_utc()
 
-    inc_id = _detect(base_url, sc["service"], sc["suspected_cause"], sc["signals"], api_key=api_key)
+    inc_id = _detect(base_url, _DETECT_BODIES[scenario_key], api_key=api_key)
     if not inc_id:
         raise SystemExit(f"Failed to create incident for scenario '{scenario_key}'")
 
     m = sc["metrics"]
-    rows = _make_series(
+    ts, err, p95 = _make_series(
         t0=t0,
         before_min=before_min,
         after_min=after_min,
@@ -154,19 +226,25 @@ def run_one(
         base_p95_ms=m["base_p95_ms"],
         drop_err_rel=m["drop_err_rel"],
         drop_p95_rel=m["drop_p95_rel"],
+        rng=rng,
     )
 
-    csv_path.parent.mkdir(parents=True, exist_ok=True)
-    exists = csv_path.exists()
-    mode_flag = "a" if (exists and mode == "append") else "w"
-    with csv_path.open(mode_flag, encoding="utf-8", newline="") as f:
-        if mode_flag == "w":
-            f.write("ts,metric,value\n")
-        for ts, metric, value in rows:
-            f.write(f"{_ts_iso_z(ts)},{metric},{value:.4f}\n")
+    with _METRICS_LOCK:
+        if csv_fh is not None:
+            # caller keeps the file open across runs; flushed so the backend sees this run's rows
+            csv_fh.write(_csv_body(ts, err, p95))
+            csv_fh.flush()
+        else:
+            csv_path.parent.mkdir(parents=True, exist_ok=True)
+            exists = csv_path.exists()
+            mode_flag = "a" if (exists and mode == "append") else "w"
+            with csv_path.open(mode_flag, encoding="utf-8", newline="") as f:
+                if mode_flag == "w":
+                    f.write("ts,metric,value\n")
+                f.write(_csv_body(ts, err, p95))
 
-    _approve(base_url, inc_id, api_key=api_key)
-    _run_pipeline(base_url, inc_id, api_key=api_key)
+        _approve(base_url, inc_id, api_key=api_key)
+        _run_pipeline(base_url, inc_id, api_key=api_key)
 
     return inc_id
 
@@ -180,6 +258,7 @@ def main():
     ap.add_argument("--mode", choices=["overwrite","append"], default="overwrite")
     ap.add_argument("--count", type=int, default=1)
     ap.add_argument("--api-key", default=None)
+    ap.add_argument("--seed", type=int, default=None, help="seed the metric noise (reproducible series)")
     args = ap.parse_args()
 
     base_url = args.base_url.rstrip("/")
@@ -191,18 +270,27 @@ def main():
     else:
         scenarios = [args.scenario] * args.count
 
+    rng = np.random.default_rng(args.seed)
     print(f"[simulate] base_url={base_url} csv={csv_path} mode={args.mode}")
-    for i, sk in enumerate(scenarios, 1):
-        inc_id = run_one(
-            base_url=base_url,
-            csv_path=csv_path,
-            scenario_key=sk,
-            before_min=args.before_min,
-            after_min=args.after_min,
-            mode=("append" if i > 1 or args.mode == "append" else args.mode),
-            api_key=args.api_key,
-        )
-        print(f"[simulate] {i}/{len(scenarios)} scenario={sk} → incident_id={inc_id}")
+    # one handle for every run instead of an open/close per scenario
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    mode_flag = "a" if (csv_path.exists() and args.mode == "append") else "w"
+    with csv_path.open(mode_flag, encoding="utf-8", newline="", buffering=1 << 20) as fh:
+        if mode_flag == "w":
+            fh.write("ts,metric,value\n")
+        for i, sk in enumerate(scenarios, 1):
+            inc_id = run_one(
+                base_url=base_url,
+                csv_path=csv_path,
+                scenario_key=sk,
+                before_min=args.before_min,
+                after_min=args.after_min,
+                mode="append",
+                api_key=args.api_key,
+                rng=rng,
+                csv_fh=fh,
+            )
+            print(f"[simulate] {i}/{len(scenarios)} scenario={sk} → incident_id={inc_id}")
 
 if __name__ == "__main__":
     main()